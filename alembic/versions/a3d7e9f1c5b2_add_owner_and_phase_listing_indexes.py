@@ -0,0 +1,61 @@
+"""add_owner_and_phase_listing_indexes
+
+Revision ID: a3d7e9f1c5b2
+Revises: f2a6c9d1b8e4
+Create Date: 2026-10-16 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d7e9f1c5b2"
+down_revision: Union[str, Sequence[str], None] = "f2a6c9d1b8e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add listing indexes for projects by owner and tasks by phase."""
+    # (owner_id, created_at, id) sustituye al índice simple sobre owner_id, que
+    # es su prefijo. CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_projects_owner_id_created_at_id",
+            "projects",
+            ["owner_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_projects_owner_id",
+            table_name="projects",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_phase_id_position",
+            "tasks",
+            ["phase_id", "position"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the listing indexes and restore the owner_id index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_phase_id_position",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_projects_owner_id",
+            "projects",
+            ["owner_id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_projects_owner_id_created_at_id",
+            table_name="projects",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,41 @@
+"""add_extracted_content_to_attachments
+
+Revision ID: b7e4d2a91c3f
+Revises: 3569f95678a2
+Create Date: 2026-10-16 08:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e4d2a91c3f"
+down_revision: Union[str, Sequence[str], None] = "3569f95678a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add precomputed html, pages and text columns to attachments."""
+    # Contenido extraído de los .docx para servirlo sin volver a parsear
+    op.add_column("attachments", sa.Column("html_content", sa.Text(), nullable=True))
+    op.add_column(
+        "attachments",
+        sa.Column(
+            "pages_json",
+            sa.JSON().with_variant(postgresql.JSONB(), "postgresql"),
+            nullable=True,
+        ),
+    )
+    op.add_column("attachments", sa.Column("text_content", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove precomputed content columns from attachments."""
+    op.drop_column("attachments", "text_content")
+    op.drop_column("attachments", "pages_json")
+    op.drop_column("attachments", "html_content")
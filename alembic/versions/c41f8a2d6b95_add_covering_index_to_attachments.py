@@ -0,0 +1,47 @@
+"""add_covering_index_to_attachments
+
+Revision ID: c41f8a2d6b95
+Revises: b7e4d2a91c3f
+Create Date: 2026-10-16 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f8a2d6b95"
+down_revision: Union[str, Sequence[str], None] = "b7e4d2a91c3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a covering index for the minimal attachment lookup."""
+    # Permite resolver la consulta mínima de adjuntos (permisos y ruta) con un
+    # index-only scan. CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_attachments_id_covering",
+            "attachments",
+            ["id"],
+            postgresql_include=[
+                "file_name",
+                "file_type",
+                "file_path",
+                "project_id",
+                "phase_id",
+                "task_id",
+            ],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove the covering index from attachments."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_attachments_id_covering",
+            table_name="attachments",
+            postgresql_concurrently=True,
+        )
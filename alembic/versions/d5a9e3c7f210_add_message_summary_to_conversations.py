@@ -0,0 +1,52 @@
+"""add_message_summary_to_conversations
+
+Revision ID: d5a9e3c7f210
+Revises: c41f8a2d6b95
+Create Date: 2026-10-16 15:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a9e3c7f210"
+down_revision: Union[str, Sequence[str], None] = "c41f8a2d6b95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add denormalized message count and last message preview to conversations."""
+    op.add_column(
+        "conversations",
+        sa.Column("message_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "conversations",
+        sa.Column("last_message_preview", sa.String(length=100), nullable=True),
+    )
+    # Rellenar los valores de las conversaciones existentes
+    op.execute(
+        """
+        UPDATE conversations SET
+            message_count = (
+                SELECT COUNT(*) FROM messages
+                WHERE messages.conversation_id = conversations.id
+            ),
+            last_message_preview = (
+                SELECT SUBSTR(messages.content, 1, 100) FROM messages
+                WHERE messages.conversation_id = conversations.id
+                ORDER BY messages.created_at DESC, messages.id DESC
+                LIMIT 1
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Remove denormalized message summary columns from conversations."""
+    op.drop_column("conversations", "last_message_preview")
+    op.drop_column("conversations", "message_count")
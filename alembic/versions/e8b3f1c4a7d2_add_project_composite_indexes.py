@@ -0,0 +1,61 @@
+"""add_project_composite_indexes
+
+Revision ID: e8b3f1c4a7d2
+Revises: d5a9e3c7f210
+Create Date: 2026-10-16 18:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b3f1c4a7d2"
+down_revision: Union[str, Sequence[str], None] = "d5a9e3c7f210"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add composite (project_id, ...) indexes to bibliographies and phases."""
+    # (project_id, id) sustituye al índice simple sobre project_id, que es su
+    # prefijo. CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_bibliographies_project_id_id",
+            "bibliographies",
+            ["project_id", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_bibliographies_project_id",
+            table_name="bibliographies",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_phases_project_id_position",
+            "phases",
+            ["project_id", "position"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the composite indexes and restore the project_id index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_phases_project_id_position",
+            table_name="phases",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_bibliographies_project_id",
+            "bibliographies",
+            ["project_id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_bibliographies_project_id_id",
+            table_name="bibliographies",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""add_project_name_trigram_index
+
+Revision ID: f2a6c9d1b8e4
+Revises: e8b3f1c4a7d2
+Create Date: 2026-10-16 19:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a6c9d1b8e4"
+down_revision: Union[str, Sequence[str], None] = "e8b3f1c4a7d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a pg_trgm GIN index on projects.name for substring search."""
+    # Un B-tree no sirve para ILIKE '%q%'; el índice de trigramas sí.
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_projects_name_trgm",
+            "projects",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Remove the trigram index from projects.name."""
+    # La extensión se conserva: otras bases de datos u objetos pueden usarla
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_projects_name_trgm",
+            table_name="projects",
+            postgresql_concurrently=True,
+        )
@@ -13,13 +13,19 @@ from app.api.api_v1.endpoints import (
 
 api_router = APIRouter()
 
-# Incluir routers de endpoints
-api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(ai_assistant.project_router, tags=["ai-assistant"])
-api_router.include_router(projects.router, prefix="/proyectos", tags=["projects"])
-api_router.include_router(phases.router, prefix="/fases", tags=["phases"])
-api_router.include_router(tasks.router, prefix="/tareas", tags=["tasks"])
-api_router.include_router(ai_assistant.router, prefix="/ia", tags=["ai-assistant"])
-api_router.include_router(bibliography.router, tags=["bibliography"])
-api_router.include_router(documentos.router, tags=["documentos"])
+# Routers de endpoints: (router, prefijo, tags). El orden es el de montaje, por lo
+# que se mantienen primero los más ligeros y al final la extracción de documentos.
+_ROUTERS = (
+    (auth.router, "/auth", ["authentication"]),
+    (users.router, "/users", ["users"]),
+    (ai_assistant.project_router, "", ["ai-assistant"]),
+    (projects.router, "/proyectos", ["projects"]),
+    (phases.router, "/fases", ["phases"]),
+    (tasks.router, "/tareas", ["tasks"]),
+    (ai_assistant.router, "/ia", ["ai-assistant"]),
+    (bibliography.router, "", ["bibliography"]),
+    (documentos.router, "", ["documentos"]),
+)
+
+for router, prefix, tags in _ROUTERS:
+    api_router.include_router(router, prefix=prefix, tags=tags)
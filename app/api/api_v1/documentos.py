@@ -1,31 +1,177 @@
 """
 Endpoints para extracción y gestión de contenido de documentos
 """
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import anyio
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.core.cache import cache_get, cache_set
+from app.core.config import settings
+from app.core.dependencies import aget_current_user_id, get_current_user_id, get_db
+from app.core.executors import run_in_docx_pool
+from app.database import get_async_db
+from app.models.attachment import Attachment
 from app.repositories.attachment_repository import AttachmentRepository
+from app.schemas.attachment import AttachmentResponse
 from app.schemas.document import (
     DocumentContentResponse,
     DocumentPagesResponse,
     DocumentPreviewResponse,
     DocumentUpdateContent,
 )
+from app.services.attachment_service import attachment_service
 from app.services.document_extraction_service import document_extraction_service
 from app.services.document_generation_service import document_generation_service
 
-router = APIRouter(prefix="/documentos", tags=["documentos"])
+# ORJSONResponse serializa más rápido el HTML y las páginas (payloads grandes)
+router = APIRouter(
+    prefix="/documentos",
+    tags=["documentos"],
+    default_response_class=ORJSONResponse,
+)
 
 attachment_repository = AttachmentRepository()
 
+logger = logging.getLogger(__name__)
+
+# Valores de file_type que corresponden a documentos .docx
+_DOCX_MIME_TYPES = frozenset(
+    {
+        "docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    }
+)
+
+# Caché en memoria del proceso por (ruta, mtime).
+# Solo se accede desde el event loop, por lo que no necesita lock.
+_DOCX_MEM_CACHE: "TTLCache[Tuple[Any, ...], Any]" = TTLCache(maxsize=128, ttl=600)
+
+
+def _authorize(user_id: int, owner_id: Optional[int]) -> None:
+    """
+    Verifica que el usuario sea dueño del proyecto al que pertenece el adjunto
+
+    Args:
+        user_id: ID del usuario autenticado
+        owner_id: owner_id del proyecto padre (obtenido junto con el adjunto)
+
+    Raises:
+        HTTPException 403: Si el usuario no tiene permisos
+    """
+    if owner_id is None or owner_id != user_id:
+        raise HTTPException(
+            status_code=403, detail="No tiene permisos para acceder a este documento"
+        )
+
+
+async def _extract_docx(file_path: str) -> Dict[str, Any]:
+    """
+    Obtiene HTML, páginas y texto de un .docx con una sola extracción cacheada,
+    compartida por los endpoints de contenido, páginas y vista previa.
+
+    Usa dos niveles de caché: uno en memoria indexado por (ruta, mtime) y otro en
+    Redis indexado por el SHA-256 del contenido. El archivo se lee una sola vez de
+    forma asíncrona y sus bytes se envían al pool de procesos para el parseo.
+
+    Args:
+        file_path: Ruta al archivo .docx
+
+    Returns:
+        Dict[str, Any]: {"html": str, "pages": List[str], "text": str}
+
+    Raises:
+        HTTPException: Si el archivo no existe, no es .docx o no se puede parsear
+    """
+    # Validación temprana: sin archivo físico no se lee ni se parsea nada
+    try:
+        mtime_ns = (await anyio.Path(file_path).stat()).st_mtime_ns
+    except OSError:
+        raise HTTPException(status_code=404, detail="Archivo físico no encontrado")
+
+    mem_key = (file_path, mtime_ns)
+    if mem_key in _DOCX_MEM_CACHE:
+        return _DOCX_MEM_CACHE[mem_key]
+
+    data = await document_extraction_service.read_docx_bytes(file_path)
+    file_hash = await run_in_threadpool(_sha256_hex, data)
+
+    key = f"docx:all:{file_hash}"
+    cached = await cache_get(key)
+    if cached is not None:
+        logger.info("docx.cache_hit key=%s", key)
+        _DOCX_MEM_CACHE[mem_key] = cached
+        return cached
+
+    result = await run_in_docx_pool(
+        document_extraction_service.extract_all_from_bytes, data
+    )
+    await cache_set(key, result, settings.DOCX_CACHE_TTL)
+    _DOCX_MEM_CACHE[mem_key] = result
+    return result
+
+
+def _sha256_hex(data: bytes) -> str:
+    """Calcula el SHA-256 del contenido sin copiarlo"""
+    return hashlib.sha256(memoryview(data)).hexdigest()
+
+
+async def _stored_or_extract(
+    attachment: Union[Attachment, Row[Any]],
+    field: str,
+    stored: Any,
+    background_tasks: BackgroundTasks,
+) -> Any:
+    """
+    Devuelve el contenido precalculado del adjunto o, si aún no existe, lo extrae
+    y programa su guardado en segundo plano para las siguientes lecturas.
+
+    Args:
+        attachment: Adjunto .docx (entidad o fila mínima con id y file_path)
+        field: Clave de extract_all a devolver ("html", "pages" o "text")
+        stored: Valor de la columna precalculada correspondiente
+        background_tasks: Tareas en segundo plano de la petición
+
+    Returns:
+        Any: Contenido solicitado
+    """
+    if stored is not None:
+        return stored
+
+    # Firma del archivo antes de extraer: si una edición lo cambia mientras
+    # tanto, el guardado en segundo plano descarta este contenido
+    file_path = str(attachment.file_path)
+    try:
+        stat = await anyio.Path(file_path).stat()
+    except OSError:
+        raise HTTPException(status_code=404, detail="Archivo físico no encontrado")
+
+    extraction = await _extract_docx(file_path)
+    background_tasks.add_task(
+        attachment_service.save_extracted_content,
+        attachment.id,  # type: ignore
+        extraction,
+        (stat.st_mtime_ns, stat.st_size),
+    )
+    return extraction[field]
+
 
 @router.get("/{attachment_id}/extract-content", response_model=DocumentContentResponse)
 async def extract_document_content(
     attachment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Extrae el contenido de un documento .docx y lo convierte a HTML
@@ -33,8 +179,9 @@ async def extract_document_content(
 
     Args:
         attachment_id: ID del adjunto/documento
-        db: Sesión de base de datos
-        current_user: Usuario autenticado
+        background_tasks: Tareas en segundo plano de la petición
+        db: Sesión asíncrona de base de datos
+        user_id: ID del usuario autenticado
 
     Returns:
         Dict con el contenido HTML y metadatos del documento
@@ -46,73 +193,54 @@ async def extract_document_content(
         HTTPException 500: Si hay error en la extracción
     """
     # Obtener el adjunto
-    attachment = attachment_repository.get(db, attachment_id)
+    attachment, owner_id = await attachment_repository.aget_with_parent_owner(
+        db, attachment_id, Attachment.html_content
+    )
 
     if not attachment:
         raise HTTPException(status_code=404, detail="Documento no encontrado")
 
     # Validar permisos (verificar que el usuario es dueño del proyecto padre)
-    from app.services.attachment_service import attachment_service
-
-    parent_type, parent_id = attachment_service._get_parent_info(attachment)
-
-    try:
-        attachment_service._validate_parent_entity(
-            db, parent_type, parent_id, current_user.id
-        )
-    except HTTPException:
-        raise HTTPException(
-            status_code=403, detail="No tiene permisos para acceder a este documento"
-        )
+    _authorize(user_id, owner_id)
 
     # Validar tipo de archivo
-    if attachment.file_type.lower() not in [
-        "docx",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    ]:
+    if attachment.file_type.lower() not in _DOCX_MIME_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Solo se pueden extraer contenidos de archivos .docx",
         )
 
-    # Extraer contenido
-    html_content = document_extraction_service.extract_docx_to_html(
-        str(attachment.file_path)
+    # Usar el contenido precalculado o extraerlo (en el pool de procesos)
+    html_content = await _stored_or_extract(
+        attachment, "html", attachment.html_content, background_tasks
     )
 
-    # Convertir attachment a dict y agregar html_content
-    response_data = {
-        "id": attachment.id,
-        "file_name": attachment.file_name,
-        "file_type": attachment.file_type,
-        "file_size": attachment.file_size,
-        "file_path": attachment.file_path,
-        "project_id": attachment.project_id,
-        "phase_id": attachment.phase_id,
-        "task_id": attachment.task_id,
-        "created_at": attachment.created_at,
-        "updated_at": attachment.updated_at,
-        "html_content": html_content,  # Campo adicional
-    }
+    # Validar el adjunto directamente desde el ORM y agregar html_content sin
+    # volver a validar (todos los valores ya son confiables)
+    attachment_data = AttachmentResponse.model_validate(attachment)
 
-    return DocumentContentResponse(**response_data)
+    return DocumentContentResponse.model_construct(
+        **dict(attachment_data), html_content=html_content
+    )
 
 
 @router.get("/{attachment_id}/preview", response_model=DocumentPreviewResponse)
 async def get_document_preview(
     attachment_id: int,
+    background_tasks: BackgroundTasks,
     max_chars: int = 200,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Obtiene una vista previa en texto plano del documento
 
     Args:
         attachment_id: ID del adjunto/documento
+        background_tasks: Tareas en segundo plano de la petición
         max_chars: Número máximo de caracteres (default: 200)
-        db: Sesión de base de datos
-        current_user: Usuario autenticado
+        db: Sesión asíncrona de base de datos
+        user_id: ID del usuario autenticado
 
     Returns:
         Dict con la vista previa del documento
@@ -121,30 +249,25 @@ async def get_document_preview(
         HTTPException 404: Si el documento no existe
         HTTPException 403: Si el usuario no tiene permisos
     """
-    # Obtener el adjunto
-    attachment = attachment_repository.get(db, attachment_id)
+    # Obtener solo las columnas necesarias del adjunto
+    attachment = await attachment_repository.aget_minimal_with_parent_owner(
+        db, attachment_id, Attachment.text_content
+    )
 
     if not attachment:
         raise HTTPException(status_code=404, detail="Documento no encontrado")
 
     # Validar permisos
-    from app.services.attachment_service import attachment_service
-
-    parent_type, parent_id = attachment_service._get_parent_info(attachment)
+    _authorize(user_id, attachment.owner_id)
 
+    # Obtener vista previa a partir del texto de la extracción combinada
     try:
-        attachment_service._validate_parent_entity(
-            db, parent_type, parent_id, current_user.id
-        )
-    except HTTPException:
-        raise HTTPException(
-            status_code=403, detail="No tiene permisos para acceder a este documento"
+        text = await _stored_or_extract(
+            attachment, "text", attachment.text_content, background_tasks
         )
-
-    # Obtener vista previa
-    preview = document_extraction_service.get_document_preview(
-        str(attachment.file_path), max_chars=max_chars
-    )
+        preview = document_extraction_service.build_preview(text, max_chars)
+    except HTTPException as e:
+        preview = f"Error al obtener vista previa: {e.detail}"
 
     return DocumentPreviewResponse(
         attachment_id=attachment_id,
@@ -157,16 +280,18 @@ async def get_document_preview(
 @router.get("/{attachment_id}/extract-pages", response_model=DocumentPagesResponse)
 async def extract_document_pages(
     attachment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Extrae el contenido de un documento .docx dividido en páginas HTML
 
     Args:
         attachment_id: ID del adjunto/documento
-        db: Sesión de base de datos
-        current_user: Usuario autenticado
+        background_tasks: Tareas en segundo plano de la petición
+        db: Sesión asíncrona de base de datos
+        user_id: ID del usuario autenticado
 
     Returns:
         Dict con las páginas HTML y metadatos del documento
@@ -178,63 +303,106 @@ async def extract_document_pages(
         HTTPException 500: Si hay error en la extracción
     """
     # Obtener el adjunto
-    attachment = attachment_repository.get(db, attachment_id)
+    attachment, owner_id = await attachment_repository.aget_with_parent_owner(
+        db, attachment_id, Attachment.pages_json
+    )
 
     if not attachment:
         raise HTTPException(status_code=404, detail="Documento no encontrado")
 
     # Validar permisos
-    from app.services.attachment_service import attachment_service
-
-    parent_type, parent_id = attachment_service._get_parent_info(attachment)
+    _authorize(user_id, owner_id)
 
-    try:
-        attachment_service._validate_parent_entity(
-            db, parent_type, parent_id, current_user.id
-        )
-    except HTTPException:
+    # Validar tipo de archivo
+    if attachment.file_type.lower() not in _DOCX_MIME_TYPES:
         raise HTTPException(
-            status_code=403, detail="No tiene permisos para acceder a este documento"
+            status_code=400,
+            detail="Solo se pueden extraer contenidos de archivos .docx",
         )
 
+    # Extraer contenido en páginas
+    pages = await _stored_or_extract(
+        attachment, "pages", attachment.pages_json, background_tasks
+    )
+
+    # Validar el adjunto directamente desde el ORM y agregar páginas sin volver
+    # a validar (todos los valores ya son confiables)
+    attachment_data = AttachmentResponse.model_validate(attachment)
+
+    return DocumentPagesResponse.model_construct(
+        **dict(attachment_data), pages=pages, total_pages=len(pages)
+    )
+
+
+@router.get("/{attachment_id}/extract-pages-stream")
+async def stream_document_pages(
+    attachment_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(aget_current_user_id),
+):
+    """
+    Extrae las páginas HTML de un documento .docx y las envía en streaming como
+    NDJSON (una línea JSON por página), a medida que se generan
+
+    Args:
+        attachment_id: ID del adjunto/documento
+        db: Sesión asíncrona de base de datos
+        user_id: ID del usuario autenticado
+
+    Returns:
+        StreamingResponse con líneas {"page_index": int, "html": str}
+
+    Raises:
+        HTTPException 404: Si el documento no existe
+        HTTPException 403: Si el usuario no tiene permisos
+        HTTPException 400: Si el formato no es .docx
+        HTTPException 500: Si hay error al abrir el documento
+    """
+    # Obtener solo las columnas necesarias del adjunto
+    attachment = await attachment_repository.aget_minimal_with_parent_owner(
+        db, attachment_id, Attachment.pages_json
+    )
+
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Documento no encontrado")
+
+    # Validar permisos
+    _authorize(user_id, attachment.owner_id)
+
     # Validar tipo de archivo
-    if attachment.file_type.lower() not in [
-        "docx",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    ]:
+    if attachment.file_type.lower() not in _DOCX_MIME_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Solo se pueden extraer contenidos de archivos .docx",
         )
 
-    # Extraer contenido en páginas
-    pages = document_extraction_service.extract_docx_to_pages(str(attachment.file_path))
-
-    # Convertir attachment a dict y agregar páginas
-    response_data = {
-        "id": attachment.id,
-        "file_name": attachment.file_name,
-        "file_type": attachment.file_type,
-        "file_size": attachment.file_size,
-        "file_path": attachment.file_path,
-        "project_id": attachment.project_id,
-        "phase_id": attachment.phase_id,
-        "task_id": attachment.task_id,
-        "created_at": attachment.created_at,
-        "updated_at": attachment.updated_at,
-        "pages": pages,
-        "total_pages": len(pages),
-    }
+    # Usar las páginas precalculadas o abrir el documento fuera del event loop
+    # y generar las páginas bajo demanda
+    if attachment.pages_json is not None:
+        pages = iter(attachment.pages_json)
+    else:
+        file_path = str(attachment.file_path)
+        if not await anyio.Path(file_path).exists():
+            raise HTTPException(status_code=404, detail="Archivo físico no encontrado")
+        pages = await run_in_threadpool(
+            document_extraction_service.extract_docx_to_pages_iter, file_path
+        )
 
-    return DocumentPagesResponse(**response_data)
+    def _ndjson_lines() -> Iterator[bytes]:
+        for page_index, html in enumerate(pages):
+            yield orjson.dumps({"page_index": page_index, "html": html}) + b"\n"
+
+    # Starlette consume los iteradores síncronos en el threadpool
+    return StreamingResponse(_ndjson_lines(), media_type="application/x-ndjson")
 
 
 @router.put("/{attachment_id}/content")
-async def update_document_content(
+def update_document_content(
     attachment_id: int,
     content_in: DocumentUpdateContent,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
     """
     Actualiza el contenido de un documento .docx a partir de las páginas HTML editadas.
@@ -242,8 +410,9 @@ async def update_document_content(
     Args:
         attachment_id: ID del adjunto/documento
         content_in: Contenido del documento (páginas HTML)
+        background_tasks: Tareas en segundo plano de la petición
         db: Sesión de base de datos
-        current_user: Usuario autenticado
+        user_id: ID del usuario autenticado
 
     Returns:
         Dict con mensaje de éxito
@@ -261,24 +430,17 @@ async def update_document_content(
         raise HTTPException(status_code=404, detail="Documento no encontrado")
 
     # Validar permisos
-    from app.services.attachment_service import attachment_service
-
     parent_type, parent_id = attachment_service._get_parent_info(attachment)
 
     try:
-        attachment_service._validate_parent_entity(
-            db, parent_type, parent_id, current_user.id
-        )
+        attachment_service._validate_parent_entity(db, parent_type, parent_id, user_id)
     except HTTPException:
         raise HTTPException(
             status_code=403, detail="No tiene permisos para modificar este documento"
         )
 
     # Validar tipo de archivo
-    if attachment.file_type.lower() not in [
-        "docx",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    ]:
+    if attachment.file_type.lower() not in _DOCX_MIME_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Solo se puede actualizar el contenido de archivos .docx",
@@ -289,10 +451,14 @@ async def update_document_content(
     document_generation_service.html_pages_to_docx(content_in.pages, file_path)
 
     # Actualizar tamaño en BD y fecha de actualización
-    import os
-
     if os.path.exists(file_path):
         attachment.file_size = os.path.getsize(file_path)
 
+    # Invalidar el contenido precalculado y regenerarlo en segundo plano
+    attachment_service._apply_extracted_content(attachment, None)
     db.commit()
+    background_tasks.add_task(
+        attachment_service.extract_and_store_content, attachment.id  # type: ignore
+    )
+
     return {"message": "Documento actualizado exitosamente"}
@@ -1,12 +1,30 @@
+import asyncio
+import json
 import logging
-
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+import anyio
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
-from app.core.ai_config import UserPlan
+from app.core.ai_config import AIFeature, UserPlan
 from app.core.ai_prompts import format_bibliography_context, format_project_context
-from app.core.dependencies import get_current_user
-from app.database import get_db
+from app.core.dependencies import (
+    get_authorized_project,
+    get_current_user,
+    get_project_user,
+    get_user_plan,
+    require_ai_feature,
+)
+from app.database import SessionLocal, get_db
+from app.models.conversation import Conversation
 from app.models.user import User
 from app.repositories.bibliography_repository import bibliography_repository
 from app.repositories.conversation_repository import (
@@ -15,8 +33,10 @@ from app.repositories.conversation_repository import (
 )
 from app.schemas.ai import (
     AIErrorResponse,
+    BibliographyReference,
     BibliographyRequest,
     BibliographyResponse,
+    BibliographySource,
     CitationRequest,
     CitationResponse,
     SuggestionRequest,
@@ -29,15 +49,108 @@ from app.schemas.conversation import (
     ConversationResponse,
     ConversationUpdate,
 )
+from app.services.ai_cache import ai_cache
 from app.services.ai_service import AIServiceError, ModelNotAvailableError, ai_service
 from app.services.attachment_service import attachment_service
 from app.services.document_extraction_service import document_extraction_service
-from app.services.project_service import project_service
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-project_router = APIRouter()
+# Contextos de proyecto ya formateados para el chat, indexados por la versión del
+# proyecto, de su adjunto y de su bibliografía. Solo se accede desde el event loop.
+_PROJECT_CONTEXT_CACHE: "TTLCache[tuple[Any, ...], str]" = TTLCache(
+    maxsize=1024, ttl=600
+)
+
+# Historial de cada conversación ya convertido al formato del servicio de IA,
+# junto con el id del último mensaje incluido. Solo se accede desde el event loop.
+_HISTORY_CACHE: "TTLCache[int, tuple[int, list[dict[str, str]]]]" = TTLCache(
+    maxsize=1024, ttl=600
+)
+
+# Valores usados cuando el servicio de IA omite un campo de una fuente
+_SOURCE_DEFAULTS: dict[str, Any] = {
+    "titulo": "",
+    "autores": [],
+    "anio": None,
+    "tipo": "",
+    "fuente": "",
+    "doi": None,
+    "url": "",
+    "resumen": "",
+    "relevancia": 3,
+}
+_SOURCES_ADAPTER = TypeAdapter(list[BibliographySource])
+_SOURCE_ADAPTER = TypeAdapter(BibliographySource)
+
+# Serializan las listas de la petición en una sola pasada de pydantic-core
+_REFERENCES_ADAPTER = TypeAdapter(list[BibliographyReference])
+
+# Campos de la petición de cita que describen la obra citada
+_CITATION_FIELDS = frozenset(
+    {
+        "tipo",
+        "autores",
+        "anio",
+        "titulo",
+        "editorial",
+        "revista",
+        "volumen",
+        "numero",
+        "paginas",
+        "doi",
+        "url",
+        "editor",
+        "titulo_libro",
+        "institucion",
+    }
+)
+
+# Cuerpos de error constantes, construidos una sola vez (no se modifican)
+_INTERNAL_ERROR_DETAIL: dict[str, Any] = {
+    "error": "internal_error",
+    "message": "Error interno del servidor",
+    "details": {},
+}
+_BIBLIOGRAPHY_UNAVAILABLE_DETAILS: dict[UserPlan, dict[str, Any]] = {
+    plan: {
+        "error": "feature_not_available",
+        "message": "La búsqueda de bibliografía no está disponible en tu plan actual. Actualiza a plan Investigador o Profesional.",
+        "details": {"feature": "bibliography", "plan": plan.value},
+    }
+    for plan in UserPlan
+}
+
+# Intervalo mínimo (segundos) entre errores inesperados registrados con traceback
+_TRACEBACK_LOG_INTERVAL = 1.0
+_last_traceback_logged = 0.0
+
+
+def _log_unexpected_error(message: str, error: Exception) -> None:
+    """
+    Registra un error inesperado de un endpoint de IA
+
+    El traceback se incluye como máximo una vez por intervalo (siempre en DEBUG),
+    para que una ráfaga de fallos no sature el logging formateando tracebacks.
+
+    Args:
+        message: Descripción del contexto del error
+        error: Excepción capturada
+    """
+    global _last_traceback_logged
+    now = time.monotonic()
+    with_traceback = logger.isEnabledFor(logging.DEBUG) or (
+        now - _last_traceback_logged >= _TRACEBACK_LOG_INTERVAL
+    )
+    if with_traceback:
+        _last_traceback_logged = now
+    logger.error("%s: %s", message, error, exc_info=with_traceback)
+
+
+# orjson serializa más rápido los textos largos (resúmenes, mensajes) de estas
+# respuestas y convierte las fechas de forma nativa
+router = APIRouter(default_response_class=ORJSONResponse)
+project_router = APIRouter(default_response_class=ORJSONResponse)
 
 
 # =============================================================================
@@ -118,7 +231,7 @@ async def generate_suggestion(
 
         # Convertir bibliografía a formato dict
         bibliography_list = (
-            [ref.model_dump() for ref in request.bibliography]
+            _REFERENCES_ADAPTER.dump_python(request.bibliography)
             if request.bibliography
             else None
         )
@@ -164,14 +277,10 @@ async def generate_suggestion(
         )
 
     except Exception as e:
-        logger.error(f"Error inesperado en sugerencias: {str(e)}", exc_info=True)
+        _log_unexpected_error("Error inesperado en sugerencias", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": "internal_error",
-                "message": "Error interno del servidor",
-                "details": {},
-            },
+            detail=_INTERNAL_ERROR_DETAIL,
         )
 
 
@@ -223,7 +332,8 @@ async def generate_suggestion(
 async def format_citation(
     project_id: int,
     request: CitationRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ) -> CitationResponse:
     """
@@ -233,6 +343,7 @@ async def format_citation(
         project_id: ID del proyecto
         request: Datos de la fuente a formatear
         current_user: Usuario autenticado
+        project: Proyecto autorizado para el usuario
         db: Sesión de base de datos
 
     Returns:
@@ -246,53 +357,25 @@ async def format_citation(
             f"Usuario {current_user.email} solicita formateo de cita en proyecto {project_id}"
         )
 
-        # Verificar que el proyecto existe y el usuario tiene acceso
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        if not project:
-            logger.warning(f"Proyecto {project_id} no encontrado o usuario sin acceso")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
-
         # TODO: Determinar el plan del usuario desde la base de datos
         user_plan = UserPlan.ESTUDIANTE  # Plan por defecto para citas
 
         # Formatear contexto del proyecto
         project_context = format_project_context(
-            project_name=project.name,  # type: ignore
-            description=project.description,  # type: ignore
-            research_type=project.research_type,  # type: ignore
+            project_name=project.name,
+            description=project.description,
+            research_type=project.research_type,
         )
 
         # Convertir bibliografía del request a formato dict
         project_bibliography = (
-            [ref.model_dump() for ref in request.project_bibliography]
+            _REFERENCES_ADAPTER.dump_python(request.project_bibliography)
             if request.project_bibliography
             else None
         )
 
         # Preparar datos de la cita
-        citation_data = {
-            "tipo": request.tipo,
-            "autores": [autor.model_dump() for autor in request.autores],
-            "anio": request.anio,
-            "titulo": request.titulo,
-            "editorial": request.editorial,
-            "revista": request.revista,
-            "volumen": request.volumen,
-            "numero": request.numero,
-            "paginas": request.paginas,
-            "doi": request.doi,
-            "url": request.url,
-            "editor": request.editor,
-            "titulo_libro": request.titulo_libro,
-            "institucion": request.institucion,
-        }
+        citation_data = request.model_dump(include=_CITATION_FIELDS)
 
         # Llamar al servicio de IA
         citation, model_used = await ai_service.format_citation(
@@ -338,14 +421,10 @@ async def format_citation(
         )
 
     except Exception as e:
-        logger.error(f"Error inesperado en formateo de citas: {str(e)}", exc_info=True)
+        _log_unexpected_error("Error inesperado en formateo de citas", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": "internal_error",
-                "message": "Error interno del servidor",
-                "details": {},
-            },
+            detail=_INTERNAL_ERROR_DETAIL,
         )
 
 
@@ -354,10 +433,39 @@ async def format_citation(
 # =============================================================================
 
 
+def _to_bibliography_sources(sources: list[Any]) -> list[BibliographySource]:
+    """
+    Valida las fuentes devueltas por el servicio de IA con un único validador para
+    toda la lista. Si alguna no cumple el schema, se validan una a una para
+    descartar solo las inválidas.
+
+    Args:
+        sources: Fuentes como dicts, posiblemente con campos omitidos
+
+    Returns:
+        list[BibliographySource]: Fuentes válidas en el orden original
+    """
+    items = [
+        {**_SOURCE_DEFAULTS, **source} for source in sources if isinstance(source, dict)
+    ]
+    try:
+        return _SOURCES_ADAPTER.validate_python(items)
+    except ValidationError:
+        valid = []
+        for item in items:
+            try:
+                valid.append(_SOURCE_ADAPTER.validate_python(item))
+            except ValidationError as e:
+                logger.warning(f"Error al procesar fuente: {str(e)}")
+        return valid
+
+
 @project_router.post(
     "/proyectos/{project_id}/ia/bibliografias",
     response_model=BibliographyResponse,
     status_code=status.HTTP_200_OK,
+    # Se comprueba el plan antes de resolver (y consultar) el proyecto
+    dependencies=[Depends(require_ai_feature(AIFeature.BIBLIOGRAPHY))],
     summary="Buscar fuentes bibliográficas relevantes",
     description="""
     Busca y sugiere fuentes bibliográficas académicas relevantes usando IA.
@@ -396,7 +504,9 @@ async def format_citation(
 async def search_bibliography(
     project_id: int,
     request: BibliographyRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_project_user),
+    user_plan: UserPlan = Depends(get_user_plan),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ) -> BibliographyResponse:
     """
@@ -406,6 +516,8 @@ async def search_bibliography(
         project_id: ID del proyecto
         request: Consulta de búsqueda y parámetros
         current_user: Usuario autenticado
+        user_plan: Plan del usuario (ya verificado para la búsqueda bibliográfica)
+        project: Proyecto autorizado para el usuario
         db: Sesión de base de datos
 
     Returns:
@@ -419,23 +531,6 @@ async def search_bibliography(
             f"Usuario {current_user.email} busca bibliografía en proyecto {project_id}: '{request.query}'"
         )
 
-        # Verificar que el proyecto existe y el usuario tiene acceso
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        if not project:
-            logger.warning(f"Proyecto {project_id} no encontrado o usuario sin acceso")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
-
-        # TODO: Determinar el plan del usuario desde la base de datos
-        # Por ahora usamos plan investigador (tiene acceso a bibliografía)
-        user_plan = UserPlan.INVESTIGADOR
-
         # Formatear contexto del proyecto si se proporciona en el request
         project_context_str = None
         if request.project_context:
@@ -452,41 +547,36 @@ async def search_bibliography(
                 research_type=project.research_type or "",
             )
 
-        # Llamar al servicio de IA
-        sources, model_used = await ai_service.search_bibliography(
-            query=request.query,
-            max_results=request.max_results,
-            plan=user_plan,
-            project_context=project_context_str,
-            search_context=request.search_context,
-        )
+        # Llamar al servicio de IA (o reutilizar la respuesta de una búsqueda idéntica)
+        cache_key = {
+            "query": request.query,
+            "max_results": request.max_results,
+            "plan": user_plan.value,
+            "project_context": project_context_str,
+            "search_context": request.search_context,
+        }
+        cached = await ai_cache.get("bibliography", cache_key)
+        if cached is not None:
+            sources, model_used = cached
+        else:
+            sources, model_used = await ai_service.search_bibliography(
+                query=request.query,
+                max_results=request.max_results,
+                plan=user_plan,
+                project_context=project_context_str,
+                search_context=request.search_context,
+            )
+            await ai_cache.set("bibliography", cache_key, [sources, model_used])
 
         # Convertir sources a formato de schema
-        bibliography_sources = []
-        for source in sources:
-            try:
-                bibliography_sources.append(
-                    {
-                        "titulo": source.get("titulo", ""),
-                        "autores": source.get("autores", []),
-                        "anio": source.get("anio"),  # Puede ser None
-                        "tipo": source.get("tipo", ""),
-                        "fuente": source.get("fuente", ""),
-                        "doi": source.get("doi"),
-                        "url": source.get("url", ""),
-                        "resumen": source.get("resumen", ""),
-                        "relevancia": source.get("relevancia", 3),
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Error al procesar fuente: {str(e)}")
-                continue
+        bibliography_sources = _to_bibliography_sources(sources)
 
         logger.info(
             f"Búsqueda bibliográfica completada: {len(bibliography_sources)} fuentes encontradas"
         )
 
-        return BibliographyResponse(
+        # Las fuentes ya están validadas: no repetir la validación del response
+        return BibliographyResponse.model_construct(
             sources=bibliography_sources,
             model_used=model_used,
             total_found=len(bibliography_sources),
@@ -502,11 +592,7 @@ async def search_bibliography(
         )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error": "feature_not_available",
-                "message": "La búsqueda de bibliografía no está disponible en tu plan actual. Actualiza a plan Investigador o Profesional.",
-                "details": {"feature": "bibliography", "plan": user_plan.value},
-            },
+            detail=_BIBLIOGRAPHY_UNAVAILABLE_DETAILS[user_plan],
         )
 
     except AIServiceError as e:
@@ -521,16 +607,10 @@ async def search_bibliography(
         )
 
     except Exception as e:
-        logger.error(
-            f"Error inesperado en búsqueda bibliográfica: {str(e)}", exc_info=True
-        )
+        _log_unexpected_error("Error inesperado en búsqueda bibliográfica", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "error": "internal_error",
-                "message": "Error interno del servidor",
-                "details": {},
-            },
+            detail=_INTERNAL_ERROR_DETAIL,
         )
 
 
@@ -549,56 +629,48 @@ async def search_bibliography(
 
     Las conversaciones se retornan ordenadas por última actualización (más recientes primero).
     Incluye un preview del último mensaje y el contador de mensajes.
+
+    Para obtener la siguiente página, enviar como `cursor` el `updated_at` de la
+    última conversación recibida.
     """,
 )
 async def list_conversations(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200, description="Máximo de conversaciones"),
+    cursor: datetime
+    | None = Query(
+        None, description="Devolver conversaciones actualizadas antes de esta fecha"
+    ),
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ) -> list[ConversationListResponse]:
     """Lista todas las conversaciones del usuario en un proyecto."""
     try:
-        # Verificar acceso al proyecto
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
-
-        # Obtener conversaciones
-        conversations = conversation_repository.get_by_project_and_user(
+        # Obtener conversaciones con su metadata (conteo y último mensaje)
+        conversations = await run_in_threadpool(
+            conversation_repository.get_list_with_metadata,
             db,
             project_id=project_id,
             user_id=current_user.id,  # type: ignore
+            limit=limit,
+            before=cursor,
         )
 
         # Construir respuesta con metadata
-        response = []
-        for conv in conversations:
-            message_count = conversation_repository.get_message_count(db, conv.id)
-            last_message = message_repository.get_last_message(db, conv.id)
-
-            response.append(
-                ConversationListResponse(
-                    id=conv.id,
-                    project_id=conv.project_id,
-                    user_id=conv.user_id,
-                    title=conv.title,
-                    created_at=conv.created_at,
-                    updated_at=conv.updated_at,
-                    message_count=message_count,
-                    last_message_preview=last_message.content[:100]
-                    if last_message
-                    else None,
-                )
+        return [
+            ConversationListResponse(
+                id=conv.id,
+                project_id=conv.project_id,
+                user_id=conv.user_id,
+                title=conv.title,
+                created_at=conv.created_at,
+                updated_at=conv.updated_at,
+                message_count=message_count,
+                last_message_preview=last_message_preview,
             )
-
-        return response
+            for conv, message_count, last_message_preview in conversations
+        ]
 
     except HTTPException:
         raise
@@ -619,25 +691,15 @@ async def list_conversations(
 async def get_conversation(
     project_id: int,
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ) -> ConversationResponse:
     """Obtiene una conversación específica con todo su historial de mensajes."""
     try:
-        # Verificar acceso al proyecto
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
-
         # Obtener conversación con mensajes
-        conversation = conversation_repository.get_with_messages(
+        conversation = await run_in_threadpool(
+            conversation_repository.get_with_messages,
             db,
             conversation_id=conversation_id,
             user_id=current_user.id,  # type: ignore
@@ -671,7 +733,8 @@ async def update_conversation(
     project_id: int,
     conversation_id: int,
     data: ConversationUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ) -> ConversationResponse:
     """Actualiza el título de una conversación."""
@@ -682,20 +745,9 @@ async def update_conversation(
                 detail="El título no puede estar vacío",
             )
 
-        # Verificar acceso al proyecto
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
-
-        # Actualizar conversación
-        conversation = conversation_repository.update_title(
+        # Actualizar conversación (se devuelve ya con sus mensajes)
+        conversation = await run_in_threadpool(
+            conversation_repository.update_title,
             db,
             conversation_id=conversation_id,
             user_id=current_user.id,
@@ -708,13 +760,6 @@ async def update_conversation(
                 detail="Conversación no encontrada",
             )
 
-        # Recargar con mensajes
-        conversation = conversation_repository.get_with_messages(
-            db,
-            conversation_id=conversation_id,
-            user_id=current_user.id,  # type: ignore
-        )
-
         return ConversationResponse.model_validate(conversation)
 
     except HTTPException:
@@ -735,31 +780,23 @@ async def update_conversation(
 async def delete_conversation(
     project_id: int,
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ):
     """Elimina una conversación y todos sus mensajes."""
     try:
-        # Verificar acceso al proyecto
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
-
         # Eliminar conversación
-        deleted = conversation_repository.delete(db, id=conversation_id)
+        deleted = await run_in_threadpool(
+            conversation_repository.delete, db, id=conversation_id
+        )
 
         if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Conversación no encontrada",
             )
+        _HISTORY_CACHE.pop(conversation_id, None)
 
         return None
 
@@ -773,6 +810,238 @@ async def delete_conversation(
         )
 
 
+async def _load_history(db: Session, conversation_id: int) -> list[dict[str, str]]:
+    """
+    Obtiene el historial de una conversación para el servicio de IA, leyendo de la
+    base de datos solo los mensajes posteriores a los ya cacheados.
+
+    Args:
+        db: Sesión de base de datos
+        conversation_id: ID de la conversación
+
+    Returns:
+        list: Mensajes como dicts {"role", "content"} en orden cronológico
+    """
+    last_id, history = _HISTORY_CACHE.get(conversation_id, (0, []))
+    rows = await run_in_threadpool(
+        message_repository.get_history, db, conversation_id, after_id=last_id
+    )
+    if rows:
+        # Lista nueva: otras peticiones pueden estar usando la anterior
+        history = history + [
+            {"role": role, "content": content} for _, role, content in rows
+        ]
+        _HISTORY_CACHE[conversation_id] = (rows[-1][0], history)
+    return history
+
+
+async def _save_user_message(
+    db: Session, conversation: Conversation, content: str
+) -> None:
+    """
+    Guarda el mensaje del usuario (y la conversación, si es nueva) en un hilo
+
+    Args:
+        db: Sesión de base de datos
+        conversation: Conversación a la que pertenece el mensaje
+        content: Contenido del mensaje
+    """
+    await run_in_threadpool(
+        message_repository.create_message,
+        db,
+        conversation_id=conversation.id,
+        role="user",
+        content=content,
+    )
+
+
+async def _prepare_chat(
+    project: Row[Any],
+    request: ChatWithHistoryRequest,
+    current_user: User,
+    db: Session,
+) -> tuple[Conversation, list[dict[str, str]], str]:
+    """
+    Prepara una petición de chat: obtiene o crea la conversación, carga su
+    historial y construye el contexto. El mensaje del usuario no se guarda aquí
+    para que el endpoint pueda hacerlo en paralelo con la llamada al modelo.
+
+    Args:
+        project: Proyecto ya autorizado para el usuario
+        request: Mensaje del usuario y conversación opcional
+        current_user: Usuario autenticado
+        db: Sesión de base de datos
+
+    Returns:
+        tuple: (conversación, historial para la IA, contexto del proyecto)
+
+    Raises:
+        HTTPException: Si la conversación no existe
+    """
+    project_id: int = project.id
+    project_info: dict[str, Any] = {
+        "project_name": project.name,
+        "description": project.description,
+        "research_type": project.research_type,
+    }
+
+    # Obtener o crear conversación
+    if request.conversation_id:
+        # Continuar conversación existente
+        conversation = await run_in_threadpool(
+            conversation_repository.get_owned,
+            db,
+            conversation_id=request.conversation_id,
+            user_id=current_user.id,  # type: ignore
+        )
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversación no encontrada",
+            )
+        # Historial previo al mensaje actual para el servicio de IA
+        history_for_ai = await _load_history(db, request.conversation_id)
+    else:
+        # Crear nueva conversación
+        title = request.title or "Nueva conversación"
+        # Se confirma junto con el primer mensaje del usuario
+        conversation = await run_in_threadpool(
+            conversation_repository.create_conversation,
+            db,
+            project_id=project_id,
+            user_id=current_user.id,
+            title=title,  # type: ignore
+            commit=False,
+        )
+        history_for_ai = []
+
+    # Obtener el adjunto del proyecto. Junto con la fecha de actualización del
+    # proyecto y la firma de su bibliografía identifica el contexto formateado.
+    context_key: tuple[Any, ...] | None = None
+    attachment = None
+    try:
+        attachment = await run_in_threadpool(
+            attachment_service.get_attachment_by_parent,
+            db,
+            parent_type="project",
+            parent_id=project_id,
+            user_id=current_user.id,
+        )
+        bibliography_revision = await run_in_threadpool(
+            bibliography_repository.get_revision, db, project_id=project_id
+        )
+        context_key = (
+            project_id,
+            project.updated_at,
+            attachment.id if attachment else None,
+            attachment.updated_at if attachment else None,
+            bibliography_revision,
+        )
+    except Exception as e:
+        logger.warning(f"Error al obtener contenido del documento para chat: {e}")
+
+    project_context: str | None = None
+    if context_key is not None:
+        project_context = _PROJECT_CONTEXT_CACHE.get(context_key)
+
+    # Obtener contenido del documento adjunto. Si el .docx aún no tiene texto
+    # precalculado, se parsea en un hilo mientras continúa el trabajo de BD.
+    document_content = None
+    document_task: asyncio.Task[str] | None = None
+    if (
+        project_context is None
+        and attachment
+        and attachment.file_path
+        and str(attachment.file_path).endswith(".docx")
+    ):
+        # Primeros 10000 caracteres del documento para contexto. El texto
+        # precalculado es una columna diferida: se recorta y lee en un hilo
+        document_content = await run_in_threadpool(
+            attachment_service.get_text_preview,
+            db,
+            attachment_id=attachment.id,
+            max_chars=10000,
+        )
+        if document_content is None:
+            document_task = asyncio.create_task(
+                run_in_threadpool(
+                    document_extraction_service.get_document_preview,
+                    str(attachment.file_path),
+                    max_chars=10000,
+                )
+            )
+
+    if project_context is None:
+        project_context, complete = await _build_project_context(
+            project_info, project_id, document_content, document_task, db
+        )
+        # Un contexto incompleto por un error puntual no se reutiliza
+        if complete and context_key is not None:
+            _PROJECT_CONTEXT_CACHE[context_key] = project_context
+
+    return conversation, history_for_ai, project_context
+
+
+async def _build_project_context(
+    project_info: dict[str, Any],
+    project_id: int,
+    document_content: str | None,
+    document_task: asyncio.Task[str] | None,
+    db: Session,
+) -> tuple[str, bool]:
+    """
+    Formatea el contexto del proyecto con su documento y su bibliografía.
+
+    Args:
+        project_info: Nombre, descripción y tipo de investigación del proyecto
+        project_id: ID del proyecto
+        document_content: Preview del documento ya disponible, si lo hay
+        document_task: Tarea que extrae el preview del .docx, si está en curso
+        db: Sesión de base de datos
+
+    Returns:
+        tuple: (contexto formateado, si se obtuvieron todas sus partes sin errores)
+    """
+    complete = True
+
+    # Obtener bibliografías del proyecto
+    bibliographies_summary = None
+    try:
+        bibliographies = await run_in_threadpool(
+            bibliography_repository.get_by_project, db, project_id=project_id
+        )
+        if bibliographies:
+            # Convertir a lista de dicts para el formateador
+            bib_list = [
+                {
+                    "autores": b.author,
+                    "anio": b.year,
+                    "titulo": b.title,
+                    "tipo": b.type,
+                }
+                for b in bibliographies
+            ]
+            bibliographies_summary = format_bibliography_context(bib_list)
+    except Exception as e:
+        complete = False
+        logger.warning(f"Error al obtener bibliografías para chat: {e}")
+
+    if document_task is not None:
+        try:
+            document_content = await document_task
+        except Exception as e:
+            complete = False
+            logger.warning(f"Error al obtener contenido del documento para chat: {e}")
+
+    # Formatear contexto del proyecto
+    project_context = format_project_context(
+        documents_summary=document_content,
+        bibliographies_summary=bibliographies_summary,
+        **project_info,
+    )
+    return project_context, complete
+
+
 @project_router.post(
     "/proyectos/{project_id}/chat",
     response_model=ChatWithHistoryResponse,
@@ -790,7 +1059,8 @@ async def delete_conversation(
 async def chat_with_persistent_history(  # noqa: C901
     project_id: int,
     request: ChatWithHistoryRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
     db: Session = Depends(get_db),
 ) -> ChatWithHistoryResponse:
     """
@@ -801,140 +1071,68 @@ async def chat_with_persistent_history(  # noqa: C901
             f"Usuario {current_user.email} envía mensaje en proyecto {project_id}"
         )
 
-        # Verificar acceso al proyecto
-        project = project_service.get_user_project_by_id(
-            db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
+        conversation, history_for_ai, project_context = await _prepare_chat(
+            project, request, current_user, db
         )
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Proyecto no encontrado o sin acceso",
-            )
 
-        # Obtener o crear conversación
-        if request.conversation_id:
-            # Continuar conversación existente
-            conversation = conversation_repository.get_with_messages(
-                db,
-                conversation_id=request.conversation_id,
-                user_id=current_user.id,  # type: ignore
-            )
-            if not conversation:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Conversación no encontrada",
-                )
+        # Llamar al servicio de IA (o reutilizar la respuesta para un estado de
+        # conversación idéntico)
+        user_plan = UserPlan.PROFESIONAL  # TODO: Obtener del usuario
+        cache_key = {
+            "message": request.message,
+            "history": history_for_ai,
+            "project_context": project_context,
+            "plan": user_plan.value,
+        }
+        cached = await ai_cache.get("chat", cache_key)
+        if cached is not None:
+            await _save_user_message(db, conversation, request.message)
+            response_text, model_used = cached
         else:
-            # Crear nueva conversación
-            title = request.title or "Nueva conversación"
-            conversation = conversation_repository.create_conversation(
-                db,
-                project_id=project_id,
-                user_id=current_user.id,
-                title=title,  # type: ignore
-            )
-
-        # Guardar mensaje del usuario
-        user_message = message_repository.create_message(
-            db,
-            conversation_id=conversation.id,
-            role="user",
-            content=request.message,
-        )
-
-        # Construir historial para el servicio de IA
-        history_for_ai = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation.messages
-            if msg.id != user_message.id  # Excluir el mensaje recién creado
-        ]
-
-        # Obtener contenido del documento adjunto
-        document_content = None
-        try:
-            attachment = attachment_service.get_attachment_by_parent(
-                db, parent_type="project", parent_id=project_id, user_id=current_user.id
-            )
-            if (
-                attachment
-                and attachment.file_path
-                and str(attachment.file_path).endswith(".docx")
-            ):
-                # Extraer contenido del documento (primeros 10000 caracteres para contexto)
-                document_content = document_extraction_service.get_document_preview(
-                    str(attachment.file_path), max_chars=10000
+            # Lanzar la llamada al modelo y guardar el mensaje del usuario mientras
+            # tanto. El mensaje se guarda aunque la llamada falle después.
+            ai_task = asyncio.create_task(
+                ai_service.chat(
+                    message=request.message,
+                    history=history_for_ai,
+                    project_context=project_context,
+                    plan=user_plan,
                 )
-        except Exception as e:
-            logger.warning(f"Error al obtener contenido del documento para chat: {e}")
-
-        # Obtener bibliografías del proyecto
-        bibliographies_summary = None
-        try:
-            bibliographies = bibliography_repository.get_by_project(
-                db, project_id=project_id
             )
-            if bibliographies:
-                # Convertir a lista de dicts para el formateador
-                bib_list = [
-                    {
-                        "autores": b.author,
-                        "anio": b.year,
-                        "titulo": b.title,
-                        "tipo": b.type,
-                    }
-                    for b in bibliographies
-                ]
-                bibliographies_summary = format_bibliography_context(bib_list)
-        except Exception as e:
-            logger.warning(f"Error al obtener bibliografías para chat: {e}")
-
-        # Formatear contexto del proyecto
-        project_context = format_project_context(
-            project_name=project.name,  # type: ignore
-            description=project.description,  # type: ignore
-            research_type=project.research_type,  # type: ignore
-            documents_summary=document_content,
-            bibliographies_summary=bibliographies_summary,
-        )
-
-        # Llamar al servicio de IA
-        user_plan = UserPlan.PROFESIONAL  # TODO: Obtener del usuario
-        response_text, model_used = await ai_service.chat(
-            message=request.message,
-            history=history_for_ai,
-            project_context=project_context,
-            plan=user_plan,
-        )
-
-        # Guardar respuesta del asistente
-        assistant_message = message_repository.create_message(
-            db,
-            conversation_id=conversation.id,
-            role="model",
-            content=response_text,
-            model_used=model_used,
-        )
+            try:
+                await _save_user_message(db, conversation, request.message)
+            except BaseException:
+                ai_task.cancel()
+                raise
+            response_text, model_used = await ai_task
+            await ai_cache.set("chat", cache_key, [response_text, model_used])
 
         # Generar título para conversaciones nuevas si no se proporcionó uno
         if not request.conversation_id and not request.title:
             try:
-                new_title = ai_service.generate_conversation_title(
-                    message=request.message, response=response_text
+                new_title = await run_in_threadpool(
+                    ai_service.generate_conversation_title,
+                    message=request.message,
+                    response=response_text,
                 )
                 if new_title:
-                    conversation_repository.update_title(
-                        db,
-                        conversation_id=conversation.id,
-                        title=new_title,
-                        user_id=current_user.id,  # type: ignore
-                    )
+                    # Se confirma junto con la respuesta del asistente
+                    conversation.title = new_title  # type: ignore
             except Exception as e:
                 logger.warning(
                     f"Error al generar/actualizar título de conversación: {e}"
                 )
 
+        # Guardar respuesta del asistente (y el título) en una sola transacción
+        assistant_message = await run_in_threadpool(
+            message_repository.create_message,
+            db,
+            conversation_id=conversation.id,
+            role="model",
+            content=response_text,
+            model_used=model_used,
+        )
+
         logger.info(
             f"Chat completado: conversación {conversation.id}, modelo {model_used}"
         )
@@ -969,12 +1167,143 @@ async def chat_with_persistent_history(  # noqa: C901
             },
         )
     except Exception as e:
-        logger.error(f"Error inesperado en chat: {str(e)}", exc_info=True)
+        _log_unexpected_error("Error inesperado en chat", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=_INTERNAL_ERROR_DETAIL,
+        )
+
+
+def _sse_event(data: dict[str, Any]) -> str:
+    """Formatea un evento Server-Sent Events con datos JSON"""
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _save_assistant_message(conversation_id: int, content: str, model_used: str) -> int:
+    """
+    Guarda la respuesta del asistente con una sesión propia (la sesión de la
+    petición ya se cerró cuando se transmite la respuesta)
+
+    Returns:
+        int: ID del mensaje creado
+    """
+    with SessionLocal() as db:
+        message = message_repository.create_message(
+            db,
+            conversation_id=conversation_id,
+            role="model",
+            content=content,
+            model_used=model_used,
+        )
+        return message.id  # type: ignore
+
+
+@project_router.post(
+    "/proyectos/{project_id}/chat/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Chat con historial persistente (streaming)",
+    description="""
+    Igual que `/chat`, pero transmite la respuesta como Server-Sent Events a
+    medida que el modelo la genera.
+
+    - Cada evento `data` contiene `{"delta": "..."}` con un fragmento de texto.
+    - El último evento contiene `{"done": true, "conversation_id", "message_id",
+      "model_used"}`, o `{"error": "..."}` si la generación falla.
+    - La respuesta se guarda en el historial aunque el cliente se desconecte.
+    """,
+)
+async def chat_with_persistent_history_stream(
+    project_id: int,
+    request: ChatWithHistoryRequest,
+    current_user: User = Depends(get_project_user),
+    project: Row[Any] = Depends(get_authorized_project),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Chat con el asistente IA con historial persistente, transmitido por SSE.
+    """
+    try:
+        logger.info(
+            f"Usuario {current_user.email} envía mensaje (streaming) en proyecto {project_id}"
+        )
+
+        conversation, history_for_ai, project_context = await _prepare_chat(
+            project, request, current_user, db
+        )
+        await _save_user_message(db, conversation, request.message)
+        conversation_id: int = conversation.id  # type: ignore
+
+        user_plan = UserPlan.PROFESIONAL  # TODO: Obtener del usuario
+        deltas, model_used = await ai_service.chat_stream(
+            message=request.message,
+            history=history_for_ai,
+            project_context=project_context,
+            plan=user_plan,
+        )
+
+    except HTTPException:
+        raise
+    except ModelNotAvailableError as e:
+        logger.warning(f"Modelo no disponible: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
             detail={
-                "error": "internal_error",
-                "message": "Error interno del servidor",
-                "details": {},
+                "error": "feature_not_available",
+                "message": str(e),
+                "details": {"feature": "chat"},
             },
         )
+    except Exception as e:
+        _log_unexpected_error("Error inesperado en chat", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=_INTERNAL_ERROR_DETAIL,
+        )
+
+    async def _event_stream() -> AsyncIterator[str]:
+        parts: list[str] = []
+        saved = False
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield _sse_event({"delta": delta})
+
+            # Protegido de la cancelación: si el cliente se desconecta durante
+            # el guardado, el bloque finally no debe repetirlo
+            with anyio.CancelScope(shield=True):
+                message_id = await run_in_threadpool(
+                    _save_assistant_message,
+                    conversation_id,
+                    "".join(parts),
+                    model_used,
+                )
+            saved = True
+            logger.info(
+                f"Chat completado: conversación {conversation_id}, modelo {model_used}"
+            )
+            yield _sse_event(
+                {
+                    "done": True,
+                    "conversation_id": conversation_id,
+                    "message_id": message_id,
+                    "model_used": model_used,
+                }
+            )
+        except AIServiceError as e:
+            logger.error(f"Error del servicio de IA: {str(e)}")
+            yield _sse_event(
+                {"error": "Error al generar respuesta. Intenta nuevamente."}
+            )
+        finally:
+            # Guardar lo generado aunque el cliente se desconecte a mitad, en un
+            # hilo y sin que la cancelación de la desconexión lo interrumpa
+            if not saved and parts:
+                with anyio.CancelScope(shield=True):
+                    await run_in_threadpool(
+                        _save_assistant_message,
+                        conversation_id,
+                        "".join(parts),
+                        model_used,
+                    )
+
+    return StreamingResponse(_event_stream(), media_type="text/event-stream")
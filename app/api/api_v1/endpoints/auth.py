@@ -3,6 +3,7 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -12,7 +13,7 @@ from app.core.security import (
     oauth2_scheme,
     verify_token,
 )
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse
 from app.services.user_service import user_service
@@ -20,8 +21,13 @@ from app.services.user_service import user_service
 router = APIRouter()
 
 
+# Sin response_model: el usuario se valida una sola vez dentro del endpoint y
+# FastAPI no repite la validación al serializar la respuesta
 @router.post(
-    "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
+    "/register",
+    response_model=None,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"model": UserResponse}},
 )
 def register_user(
     *, db: Session = Depends(get_db), user_in: UserCreate
@@ -39,7 +45,7 @@ def register_user(
     """
     try:
         user = user_service.create_user(db=db, user_create=user_in)
-        return user
+        return UserResponse.model_validate(user)
     except HTTPException:
         raise
     except Exception as e:
@@ -50,13 +56,16 @@ def register_user(
 
 
 @router.post("/login", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = user_service.authenticate_user_by_identifier(
+    # Consulta asíncrona y bcrypt en el threadpool: el login no ocupa un hilo
+    # (ni una conexión del pool síncrono) durante toda la petición
+    user = await user_service.aauthenticate_user_by_identifier(
         db, identifier=form_data.username, password=form_data.password
     )
     if not user:
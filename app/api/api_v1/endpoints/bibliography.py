@@ -1,13 +1,14 @@
 import os
-import shutil
-from typing import List, Optional
+from typing import Iterator, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+import orjson
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_current_user
-from app.database import get_db
-from app.models.user import User
+from app.core.dependencies import get_current_user_id
+from app.database import SessionLocal, get_db
+from app.models.bibliography import Bibliography as BibliographyModel
 from app.repositories.bibliography_repository import bibliography_repository
 from app.schemas.bibliography import (
     Bibliography,
@@ -15,19 +16,26 @@ from app.schemas.bibliography import (
     BibliographyUpdate,
 )
 from app.services.project_service import project_service
+from app.utils.file_utils import FileUtils, FileValidationError
 
 router = APIRouter()
 
+# El directorio se crea al arrancar la aplicación (lifespan en main.py)
 UPLOAD_DIR = "uploads/bibliographies"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+ALLOWED_UPLOAD_TYPES = frozenset(
+    {
+        "application/pdf",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    }
+)
 
 
-async def verify_project_access(project_id: int, current_user: User, db: Session):
+def verify_project_access(project_id: int, user_id: int, db: Session):
     """Verifica que el proyecto exista y el usuario tenga acceso."""
     project = project_service.get_user_project_by_id(
         db=db,
         project_id=project_id,
-        owner_id=current_user.id,  # type: ignore
+        owner_id=user_id,
     )
     if not project:
         raise HTTPException(
@@ -37,21 +45,73 @@ async def verify_project_access(project_id: int, current_user: User, db: Session
     return project
 
 
+def get_owned_bibliography(
+    project_id: int, bibliography_id: int, user_id: int, db: Session
+) -> BibliographyModel:
+    """
+    Obtiene una referencia de un proyecto del usuario en una sola consulta.
+
+    Solo si la consulta no devuelve nada se averigua el motivo, para conservar
+    las respuestas de error (proyecto sin acceso, referencia inexistente o de
+    otro proyecto).
+    """
+    bibliography = bibliography_repository.get_for_owner(
+        db,
+        bibliography_id=bibliography_id,
+        project_id=project_id,
+        owner_id=user_id,
+    )
+    if bibliography is not None:
+        return bibliography
+
+    verify_project_access(project_id, user_id, db)
+
+    if not bibliography_repository.get_by_id(db, bibliography_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Bibliografía no encontrada"
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="La bibliografía no pertenece a este proyecto",
+    )
+
+
 @router.get(
     "/proyectos/{project_id}/bibliografias",
     response_model=List[Bibliography],
     summary="Listar bibliografías de un proyecto",
 )
-async def list_bibliographies(
+def list_bibliographies(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
-    """Obtiene todas las referencias bibliográficas de un proyecto."""
+    """
+    Obtiene todas las referencias bibliográficas de un proyecto.
+
+    Con `?format=ndjson` las referencias se envían en streaming, una línea JSON
+    por referencia, leyéndolas de la base de datos por lotes.
+    """
     # Verificar acceso al proyecto
-    await verify_project_access(project_id, current_user, db)
+    verify_project_access(project_id, user_id, db)
+
+    if response_format == "json":
+        return bibliography_repository.get_by_project(db, project_id=project_id)
 
-    return bibliography_repository.get_by_project(db, project_id=project_id)
+    def _ndjson_lines() -> Iterator[bytes]:
+        # Sesión propia: la de la petición ya se cerró al transmitir la respuesta
+        with SessionLocal() as stream_db:
+            for bibliography in bibliography_repository.iter_by_project(
+                stream_db, project_id=project_id
+            ):
+                yield orjson.dumps(
+                    Bibliography.model_validate(bibliography).model_dump()
+                ) + b"\n"
+
+    # Starlette consume los iteradores síncronos en el threadpool
+    return StreamingResponse(_ndjson_lines(), media_type="application/x-ndjson")
 
 
 @router.post(
@@ -60,15 +120,15 @@ async def list_bibliographies(
     status_code=status.HTTP_201_CREATED,
     summary="Crear nueva referencia bibliográfica",
 )
-async def create_bibliography(
+def create_bibliography(
     project_id: int,
     bibliography_in: BibliographyCreate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """Crea una nueva referencia bibliográfica en el proyecto."""
     # Verificar acceso al proyecto
-    await verify_project_access(project_id, current_user, db)
+    verify_project_access(project_id, user_id, db)
 
     return bibliography_repository.create(
         db, project_id=project_id, obj_in=bibliography_in
@@ -80,28 +140,15 @@ async def create_bibliography(
     response_model=Bibliography,
     summary="Actualizar referencia bibliográfica",
 )
-async def update_bibliography(
+def update_bibliography(
     project_id: int,
     bibliography_id: int,
     bibliography_in: BibliographyUpdate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """Actualiza una referencia bibliográfica existente."""
-    # Verificar acceso al proyecto
-    await verify_project_access(project_id, current_user, db)
-
-    bibliography = bibliography_repository.get_by_id(db, bibliography_id)
-    if not bibliography:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Bibliografía no encontrada"
-        )
-
-    if bibliography.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La bibliografía no pertenece a este proyecto",
-        )
+    bibliography = get_owned_bibliography(project_id, bibliography_id, user_id, db)
 
     return bibliography_repository.update(
         db, db_obj=bibliography, obj_in=bibliography_in
@@ -113,27 +160,14 @@ async def update_bibliography(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Eliminar referencia bibliográfica",
 )
-async def delete_bibliography(
+def delete_bibliography(
     project_id: int,
     bibliography_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """Elimina una referencia bibliográfica."""
-    # Verificar acceso al proyecto
-    await verify_project_access(project_id, current_user, db)
-
-    bibliography = bibliography_repository.get_by_id(db, bibliography_id)
-    if not bibliography:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Bibliografía no encontrada"
-        )
-
-    if bibliography.project_id != project_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La bibliografía no pertenece a este proyecto",
-        )
+    get_owned_bibliography(project_id, bibliography_id, user_id, db)
 
     bibliography_repository.delete(db, bibliography_id)
     return None
@@ -144,35 +178,32 @@ async def delete_bibliography(
     response_model=Bibliography,
     summary="Subir documento asociado a bibliografía",
 )
-async def upload_bibliography_document(
+def upload_bibliography_document(
     project_id: int,
     bibliography_id: int,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ):
     """Sube un documento (PDF, DOCX) asociado a una referencia bibliográfica."""
-    # Verificar acceso al proyecto
-    await verify_project_access(project_id, current_user, db)
+    get_owned_bibliography(project_id, bibliography_id, user_id, db)
 
-    bibliography = bibliography_repository.get_by_id(db, bibliography_id)
-    if not bibliography:
+    # Rechazar por tamaño declarado antes de leer nada
+    if file.size is not None and file.size > FileUtils.MAX_FILE_SIZE:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Bibliografía no encontrada"
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="El archivo es demasiado grande",
         )
 
-    if bibliography.project_id != project_id:
+    # Validar tipo de archivo (cabecera declarada y primeros bytes del contenido)
+    if file.content_type not in ALLOWED_UPLOAD_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La bibliografía no pertenece a este proyecto",
+            detail="Solo se permiten archivos PDF y DOCX",
         )
-
-    # Validar tipo de archivo
-    allowed_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    ]
-    if file.content_type not in allowed_types:
+    try:
+        FileUtils.validate_file_signature(file)
+    except FileValidationError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se permiten archivos PDF y DOCX",
@@ -182,8 +213,13 @@ async def upload_bibliography_document(
     file_ext = os.path.splitext(file.filename)[1]
     file_path = os.path.join(UPLOAD_DIR, f"{project_id}_{bibliography_id}{file_ext}")
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Copiar por bloques, cortando si supera el límite
+    try:
+        FileUtils.save_upload(file, file_path, max_size=FileUtils.MAX_FILE_SIZE)
+    except FileValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
 
     return bibliography_repository.update_file(
         db, bibliography_id, file_path, file.filename
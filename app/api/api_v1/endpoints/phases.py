@@ -1,18 +1,29 @@
-from pathlib import Path
-from typing import List, Optional
-from urllib.parse import quote
-
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+from typing import Any, List, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_current_user
-from app.database import get_db
-from app.models.user import User
+from app.core.dependencies import aget_current_user_id, get_current_user_id
+from app.database import get_async_db, get_db
+from app.models.attachment import FileType
 from app.schemas.attachment import AttachmentResponse
 from app.schemas.phase import PhaseCreate, PhaseListResponse, PhaseOrder, PhaseUpdate
 from app.services.attachment_service import attachment_service
 from app.services.phase_service import phase_service
+from app.services.project_cache import project_phases_cache
+from app.utils.file_utils import FileUtils
 
 router = APIRouter()
 
@@ -22,94 +33,99 @@ async def create_phase(
     *,
     db: Session = Depends(get_db),
     phase_in: PhaseCreate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    user_id = current_user.id
-    return phase_service.create_phase(
+    phase = await run_in_threadpool(
+        phase_service.create_phase,
         db=db,
         phase_in=phase_in,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
+    await project_phases_cache.invalidate(phase_in.project_id)
+    return phase
 
 
-@router.post("/{phase_id}/documentos", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{phase_id}/documentos",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED,
+)
 async def upload_document(
     *,
     db: Session = Depends(get_db),
     phase_id: int,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-) -> AttachmentResponse:
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user_id),
+) -> Any:
     """
     Subir un nuevo documento a la fase.
 
     Solo el propietario del proyecto al que pertenece la fase puede subir documentos.
     """
-    try:
-        document = attachment_service.create_attachment(
-            db=db,
-            file=file,
-            parent_type="phase",
-            parent_id=phase_id,
-            user_id=current_user.id,  # type: ignore
-        )
+    # Guarda el archivo en disco: fuera del event loop
+    document = await run_in_threadpool(
+        attachment_service.create_attachment,
+        db=db,
+        file=file,
+        parent_type="phase",
+        parent_id=phase_id,
+        user_id=user_id,
+    )
 
-        return AttachmentResponse.model_validate(document)
+    # Precalcular el contenido del .docx sin retrasar la respuesta
+    if document.file_type == FileType.DOCX:
+        background_tasks.add_task(
+            attachment_service.extract_and_store_content,
+            document.id,  # type: ignore
+        )
 
-    except Exception:
-        raise
+    return document
 
 
-@router.get("/{phase_id}/documentos")
+@router.get("/{phase_id}/documentos", response_model=Optional[AttachmentResponse])
 async def get_phase_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     phase_id: int,
-    current_user: User = Depends(get_current_user),
-) -> Optional[AttachmentResponse]:
+    user_id: int = Depends(aget_current_user_id),
+) -> Any:
     """
     Obtener el documento adjunto de la fase.
 
     Solo el propietario del proyecto al que pertenece la fase puede acceder al documento.
     Retorna None si no hay documento adjunto.
     """
-    try:
-        attachment = attachment_service.get_attachment_by_parent(
-            db=db,
-            parent_type="phase",
-            parent_id=phase_id,
-            user_id=current_user.id,  # type: ignore
-        )
-
-        if attachment:
-            return AttachmentResponse.model_validate(attachment)
-        return None
+    attachment = await attachment_service.aget_attachment_by_parent(
+        db=db,
+        parent_type="phase",
+        parent_id=phase_id,
+        user_id=user_id,
+    )
 
-    except Exception:
-        raise
+    return attachment
 
 
 @router.get("/{phase_id}", response_model=PhaseListResponse)
-async def get_phase_by_id(
+def get_phase_by_id(
     *,
     db: Session = Depends(get_db),
     phase_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    user_id = current_user.id
     return phase_service.get_phase_by_id(
         db=db,
         phase_id=phase_id,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
 
 
 @router.get("/{phase_id}/tareas")
-async def get_phase_tasks(
+def get_phase_tasks(
     *,
     db: Session = Depends(get_db),
     phase_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
     return phase_service.get_phase_tasks(
         db=db,
@@ -123,15 +139,17 @@ async def update_phase(
     db: Session = Depends(get_db),
     phase_id: int,
     phase_in: PhaseUpdate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    user_id = current_user.id
-    return phase_service.update_phase(
+    phase = await run_in_threadpool(
+        phase_service.update_phase,
         db=db,
         phase_id=phase_id,
         phase_in=phase_in,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
+    await project_phases_cache.invalidate(phase.project_id)  # type: ignore[arg-type]
+    return phase
 
 
 @router.delete("/{phase_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -139,14 +157,20 @@ async def delete_phase(
     *,
     db: Session = Depends(get_db),
     phase_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    user_id = current_user.id
-    phase_service.delete_phase(
+    # El project_id se necesita para invalidar la caché tras eliminar la fase
+    phase = await run_in_threadpool(
+        phase_service.get_phase_by_id, db=db, phase_id=phase_id, owner_id=user_id
+    )
+    project_id = phase.project_id
+    await run_in_threadpool(
+        phase_service.delete_phase,
         db=db,
         phase_id=phase_id,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
+    await project_phases_cache.invalidate(project_id)  # type: ignore[arg-type]
 
 
 @router.put("/project/{project_id}/reorder", response_model=List[PhaseListResponse])
@@ -155,84 +179,59 @@ async def reorder_project_phases(
     db: Session = Depends(get_db),
     project_id: int,
     phase_orders: List[PhaseOrder],
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
     """
     Reordena las fases de un proyecto.
     """
-    user_id = current_user.id
     phase_orders_dict = [order.model_dump() for order in phase_orders]
-    return phase_service.reorder_phases(
+    phases = await run_in_threadpool(
+        phase_service.reorder_phases,
         db=db,
         project_id=project_id,
         phase_orders=phase_orders_dict,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
+    await project_phases_cache.invalidate(project_id)
+    return phases
 
 
 @router.get("/{phase_id}/descargar-documento")
 async def download_phase_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     phase_id: int,
-    current_user: User = Depends(get_current_user),
-) -> FileResponse:
+    user_id: int = Depends(aget_current_user_id),
+    request: Request,
+) -> Response:
     """
     Descargar el documento adjunto de la fase.
 
     Solo el propietario del proyecto al que pertenece la fase puede descargar el documento.
     """
-    try:
-        attachment = attachment_service.get_attachment_by_parent(
-            db=db,
-            parent_type="phase",
-            parent_id=phase_id,
-            user_id=current_user.id,  # type: ignore
-        )
+    attachment = await attachment_service.aget_attachment_by_parent(
+        db=db,
+        parent_type="phase",
+        parent_id=phase_id,
+        user_id=user_id,
+    )
 
-        if not attachment:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="La fase no tiene un documento adjunto",
-            )
-
-        file_path = Path(str(attachment.file_path))
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="El archivo no se encuentra en el sistema",
-            )
-
-        media_type_map = {
-            ".pdf": "application/pdf",
-            ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            ".doc": "application/msword",
-        }
-
-        file_extension = file_path.suffix.lower()
-        media_type = media_type_map.get(file_extension, "application/octet-stream")
-
-        filename = str(attachment.file_name)
-        filename_encoded = quote(filename)
-
-        content_disposition = (
-            f"attachment; "
-            f'filename="{filename.encode("ascii", "ignore").decode("ascii")}"; '
-            f"filename*=UTF-8''{filename_encoded}"
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="La fase no tiene un documento adjunto",
         )
 
-        return FileResponse(
-            path=str(file_path),
-            filename=filename,
-            media_type=media_type,
-            headers={"Content-Disposition": content_disposition},
+    try:
+        # El stat del archivo se hace fuera del event loop
+        return await run_in_threadpool(
+            FileUtils.build_download_response,
+            file_path=str(attachment.file_path),
+            filename=str(attachment.file_name),
+            if_none_match=request.headers.get("If-None-Match"),
         )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error al descargar el documento: {e}")
+    except FileNotFoundError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error al descargar el documento",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El archivo no se encuentra en el sistema",
         )
@@ -1,26 +1,31 @@
+import calendar
 import hashlib
-import json
-from datetime import datetime
-from pathlib import Path
-from typing import Any, List, Optional
-from urllib.parse import quote
+import struct
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterable, List, Literal, Optional, Tuple
 
+import orjson
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     File,
     HTTPException,
+    Query,
     Request,
     Response,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_current_user
-from app.database import get_db
-from app.models.user import User
+from app.core.dependencies import aget_current_user_id, get_current_user_id
+from app.database import AsyncSessionLocal, get_async_db, get_db
+from app.models.attachment import FileType
 from app.schemas.attachment import AttachmentResponse
 from app.schemas.project import (
     ProjectCreate,
@@ -30,17 +35,141 @@ from app.schemas.project import (
     ProjectWithPhasesResponse,
 )
 from app.services.attachment_service import attachment_service
+from app.services.project_cache import project_phases_cache
 from app.services.project_service import project_service
+from app.utils.file_utils import FileUtils
 
 router = APIRouter()
 
+# Valida y serializa la lista completa en una sola pasada de pydantic-core
+_PROJECT_LIST_ADAPTER = TypeAdapter(List[ProjectListResponse])
+
+# Nombres fijos en inglés para las fechas HTTP: strftime depende del locale
+_HTTP_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_HTTP_MONTHS = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+# Pares de enteros de 64 bits para el ETag del proyecto con fases:
+# (id, updated_at en microsegundos) del proyecto y (id, posición) de cada fase
+_ETAG_ENTRY = struct.Struct("<qq")
+
+# Respuesta por usuario: el navegador reutiliza el cuerpo guardado de inmediato
+# y lo revalida con el ETag en segundo plano durante el minuto siguiente
+_PROJECT_PHASES_CACHE_CONTROL = "private, max-age=0, stale-while-revalidate=60"
+
+
+def _http_date(value: datetime) -> str:
+    """
+    Formatear una fecha para cabeceras HTTP (RFC 7231, IMF-fixdate)
+
+    Usa tablas fijas de días y meses en lugar de strftime, que consulta el
+    locale en cada llamada y podría producir nombres no ingleses.
+
+    Args:
+        value: Fecha en UTC (naive) o con zona horaria
+
+    Returns:
+        str: Fecha de la forma "Fri, 16 Oct 2026 12:00:00 GMT"
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return (
+        f"{_HTTP_DAYS[value.weekday()]}, {value.day:02d} "
+        f"{_HTTP_MONTHS[value.month - 1]} {value.year:04d} "
+        f"{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT"
+    )
+
+
+def _project_phases_etag(
+    project_id: int, updated_at: datetime, phase_positions: Iterable[Tuple[int, int]]
+) -> str:
+    """
+    Calcular el ETag de un proyecto con sus fases
+
+    Combina el id y updated_at del proyecto con el (id, posición) de cada fase
+    ordenado por id, así que cambia al crear, eliminar o reordenar fases. Los
+    valores se empaquetan como enteros en un único buffer y se resumen con
+    BLAKE2b en una sola pasada, sin serializar a JSON ni pasar por float.
+
+    Args:
+        project_id: ID del proyecto
+        updated_at: Fecha de última modificación del proyecto
+        phase_positions: Pares (id, posición) de las fases, en cualquier orden
+
+    Returns:
+        str: ETag en hexadecimal (sin comillas)
+    """
+    updated_at_us = (
+        calendar.timegm(updated_at.utctimetuple()) * 1_000_000 + updated_at.microsecond
+    )
+    payload = _ETAG_ENTRY.pack(project_id, updated_at_us) + b"".join(
+        _ETAG_ENTRY.pack(phase_id, position)
+        for phase_id, position in sorted(phase_positions)
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _project_phases_headers(etag: str, last_modified: str) -> dict[str, str]:
+    """
+    Construir las cabeceras de caché HTTP del proyecto con fases
+
+    Se envían tanto en el 200 como en el 304 para que el navegador renueve la
+    ventana de stale-while-revalidate tras cada revalidación.
+
+    Args:
+        etag: ETag en hexadecimal (sin comillas)
+        last_modified: Fecha HTTP de la última modificación
+
+    Returns:
+        dict[str, str]: Cabeceras ETag, Cache-Control, Last-Modified y Vary
+    """
+    return {
+        "ETag": f'"{etag}"',
+        "Cache-Control": _PROJECT_PHASES_CACHE_CONTROL,
+        "Last-Modified": last_modified,
+        "Vary": "Authorization",
+    }
+
+
+def _project_list_response(projects: Any) -> Response:
+    """
+    Construir la respuesta JSON de una lista de proyectos
+
+    La lista se valida y se serializa a bytes con un único TypeAdapter en lugar
+    de un modelo por proyecto; response_model se conserva para la documentación.
+
+    Args:
+        projects: Proyectos (entidades o filas) a serializar
+
+    Returns:
+        Response: Lista de proyectos en JSON
+    """
+    return Response(
+        content=_PROJECT_LIST_ADAPTER.dump_json(
+            _PROJECT_LIST_ADAPTER.validate_python(projects, from_attributes=True)
+        ),
+        media_type="application/json",
+    )
+
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     project_in: ProjectCreate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ) -> ProjectResponse:
     """
     Crear un nuevo proyecto.
@@ -53,80 +182,91 @@ def create_project(
     - **category**: Categoría del proyecto (opcional)
     - **status**: Estado del proyecto (opcional, por defecto: planning)
     """
-    try:
-        project = project_service.create_project(
-            db=db,
-            project_in=project_in,
-            owner_id=current_user.id,  # type: ignore
-        )
-        return project
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error interno del servidor: {str(e)}",
-        )
+    project = await project_service.acreate_project(
+        db=db,
+        project_in=project_in,
+        owner_id=user_id,
+    )
+    return project
 
 
-@router.post("/{project_id}/documentos", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{project_id}/documentos",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED,
+)
 async def upload_document(
     *,
     db: Session = Depends(get_db),
     project_id: int,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-) -> AttachmentResponse:
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user_id),
+) -> Any:
     """
     Subir un nuevo documento al proyecto.
 
     Solo el propietario del proyecto puede subir documentos.
     """
-    try:
-        document = attachment_service.create_attachment(
-            db=db,
-            file=file,
-            parent_type="project",
-            parent_id=project_id,
-            user_id=current_user.id,  # type: ignore
-        )
+    # Guarda el archivo en disco: fuera del event loop
+    document = await run_in_threadpool(
+        attachment_service.create_attachment,
+        db=db,
+        file=file,
+        parent_type="project",
+        parent_id=project_id,
+        user_id=user_id,
+    )
 
-        return AttachmentResponse.model_validate(document)
+    # Precalcular el contenido del .docx sin retrasar la respuesta
+    if document.file_type == FileType.DOCX:
+        background_tasks.add_task(
+            attachment_service.extract_and_store_content,
+            document.id,  # type: ignore
+        )
 
-    except Exception:
-        raise
+    return document
 
 
 @router.get("/", response_model=List[ProjectListResponse])
-def list_projects(
+async def list_projects(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    user_id: int = Depends(aget_current_user_id),
 ) -> Any:
     """
     Listar todos los proyectos del usuario autenticado.
 
     Retorna una lista con todos los proyectos creados por el usuario actual,
     ordenados por fecha de creación (más recientes primero).
+    Con `?format=ndjson` los proyectos se envían en streaming, una línea JSON
+    por proyecto, leyéndolos de la base de datos por lotes.
     """
-    try:
-        projects = project_service.get_user_projects(db=db, owner_id=current_user.id)  # type: ignore
-        return projects
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error interno del servidor: {str(e)}",
-        )
+    if response_format == "ndjson":
+
+        async def _ndjson_lines() -> AsyncIterator[bytes]:
+            # Sesión propia: la de la petición ya se cerró al transmitir la respuesta
+            async with AsyncSessionLocal() as stream_db:
+                async for project in project_service.astream_user_projects(
+                    stream_db, owner_id=user_id
+                ):
+                    yield orjson.dumps(
+                        ProjectListResponse.model_validate(project).model_dump()
+                    ) + b"\n"
+
+        return StreamingResponse(_ndjson_lines(), media_type="application/x-ndjson")
+
+    projects = await project_service.aget_user_projects(db=db, owner_id=user_id)
+    return _project_list_response(projects)
 
 
 @router.get("/search", response_model=List[ProjectListResponse])
-async def list_user_projects_by_search(
+def list_user_projects_by_search(
     *,
     db: Session = Depends(get_db),
     query: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ) -> Any:
     """
     Listar todos los proyectos del usuario autenticado que coincidan con la búsqueda.
@@ -135,40 +275,35 @@ async def list_user_projects_by_search(
     cuyo nombre contenga la subcadena de búsqueda, ordenados por fecha de creación (más recientes primero).
     Si no se proporciona una cadena de búsqueda, se retornan todos los proyectos del usuario.
     """
-    return project_service.search_user_projects_by_name(
+    projects = project_service.search_user_projects_by_name(
         db=db,
         query=query,  # type: ignore
-        owner_id=current_user.id,  # type: ignore
+        owner_id=user_id,
     )
+    return _project_list_response(projects)
 
 
-@router.get("/{project_id}/documentos")
+@router.get("/{project_id}/documentos", response_model=Optional[AttachmentResponse])
 async def get_project_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     project_id: int,
-    current_user: User = Depends(get_current_user),
-) -> Optional[AttachmentResponse]:
+    user_id: int = Depends(aget_current_user_id),
+) -> Any:
     """
     Obtener el documento adjunto del proyecto.
 
     Solo el propietario del proyecto puede acceder al documento.
     Retorna None si no hay documento adjunto.
     """
-    try:
-        attachment = attachment_service.get_attachment_by_parent(
-            db=db,
-            parent_type="project",
-            parent_id=project_id,
-            user_id=current_user.id,  # type: ignore
-        )
-
-        if attachment:
-            return AttachmentResponse.model_validate(attachment)
-        return None
+    attachment = await attachment_service.aget_attachment_by_parent(
+        db=db,
+        parent_type="project",
+        parent_id=project_id,
+        user_id=user_id,
+    )
 
-    except Exception:
-        raise
+    return attachment
 
 
 @router.get("/{project_id}/phases", response_model=ProjectWithPhasesResponse)
@@ -176,21 +311,48 @@ async def get_project_with_phases(
     *,
     db: Session = Depends(get_db),
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     request: Request,
-    response: Response,
-):
+) -> Any:
     """
     Obtener proyecto con fases, implementando caché HTTP con ETags.
 
     El cliente puede enviar 'If-None-Match' header con el ETag previo.
-    Si el contenido no ha cambiado, retorna 304 Not Modified.
+    Si el contenido no ha cambiado, retorna 304 Not Modified. La respuesta se
+    guarda en Redis y se invalida al modificar el proyecto o sus fases, así
+    que las lecturas repetidas no consultan la base de datos. Sin entrada en
+    caché, el ETag se revalida con una consulta de columnas antes de cargar
+    el proyecto y sus fases. Con stale-while-revalidate el navegador muestra
+    la copia guardada al instante y revalida en segundo plano.
     """
-    try:
-        project_data = project_service.get_project_with_phases(
+    client_etag = request.headers.get("If-None-Match")
+    # La versión se lee antes de consultar la BD: si una escritura la incrementa
+    # mientras tanto, lo guardado abajo queda bajo una versión que nadie lee
+    cache_version = await project_phases_cache.get_version(project_id)
+    cached = await project_phases_cache.get(project_id, cache_version, owner_id=user_id)
+    if cached is None and client_etag:
+        current = await run_in_threadpool(
+            project_service.get_project_phase_positions,
+            db=db,
+            project_id=project_id,
+            owner_id=user_id,
+        )
+        if current is not None:
+            current_etag = _project_phases_etag(project_id, *current)
+            if client_etag.strip('"') == current_etag:
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=_project_phases_headers(
+                        current_etag, _http_date(current[0])
+                    ),
+                )
+
+    if cached is None:
+        project_data = await run_in_threadpool(
+            project_service.get_project_with_phases,
             db=db,
             project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
+            owner_id=user_id,
         )
 
         if not project_data:
@@ -198,84 +360,58 @@ async def get_project_with_phases(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Proyecto no encontrado"
             )
 
-        # Generar ETag basado en updated_at del proyecto y el estado de las fases
-        # Como las fases no tienen updated_at, usamos una combinación robusta de sus propiedades
-        phases_info = ""
-        if project_data.phases:
-            # Ordenar por ID para consistencia y crear un string único basado en IDs y posiciones
-            # Esto detectará cambios en orden, creación y eliminación
-            phase_details = sorted([(p.id, p.position) for p in project_data.phases])
-            phases_str = json.dumps(phase_details, separators=(",", ":"))
-            phases_info = f"-phases-{hashlib.md5(phases_str.encode()).hexdigest()}"
-
-        etag_value = (
-            f"{project_data.id}-{project_data.updated_at.timestamp()}{phases_info}"
-        )
-        etag = hashlib.md5(etag_value.encode()).hexdigest()
-
-        # Verificar si el cliente tiene la versión cacheada
-        client_etag = request.headers.get("If-None-Match")
-        if client_etag and client_etag.strip('"') == etag:
-            # El contenido no ha cambiado
-            return Response(status_code=status.HTTP_304_NOT_MODIFIED)
-
-        # Agregar headers de caché
-        response.headers["ETag"] = f'"{etag}"'
-        response.headers[
-            "Cache-Control"
-        ] = "no-cache, must-revalidate"  # Forzar revalidación siempre
-        response.headers["Last-Modified"] = project_data.updated_at.strftime(
-            "%a, %d %b %Y %H:%M:%S GMT"
+        cached = {
+            "etag": _project_phases_etag(
+                project_data.id,
+                project_data.updated_at,
+                ((phase.id, phase.position) for phase in project_data.phases),
+            ),
+            "last_modified": _http_date(project_data.updated_at),
+            "body": ProjectWithPhasesResponse.model_validate(project_data).model_dump(
+                mode="json"
+            ),
+        }
+        await project_phases_cache.set(
+            project_id, cache_version, owner_id=user_id, **cached
         )
 
-        return project_data
+    headers = _project_phases_headers(cached["etag"], cached["last_modified"])
 
-    except HTTPException:
-        raise
+    # Verificar si el cliente tiene la versión cacheada
+    if client_etag and client_etag.strip('"') == cached["etag"]:
+        # El contenido no ha cambiado
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    except Exception as e:
-        print(f"Error in get_project_with_phases: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al obtener el proyecto: {str(e)}",
-        )
+    return ORJSONResponse(cached["body"], headers=headers)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(
+async def get_project(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ) -> ProjectResponse:
     """
     Obtener los detalles de un proyecto específico.
 
     Solo el propietario del proyecto puede acceder a sus detalles.
     """
-    try:
-        project = project_service.get_user_project_by_id(
-            db=db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-        return project
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error interno del servidor: {str(e)}",
-        )
+    project = await project_service.aget_user_project_by_id(
+        db=db,
+        project_id=project_id,
+        owner_id=user_id,
+    )
+    return project
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
-def update_project(
+async def update_project(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     project_id: int,
     project_in: ProjectUpdate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ) -> ProjectResponse:
     """
     Actualizar un proyecto existente.
@@ -283,29 +419,22 @@ def update_project(
     Solo el propietario del proyecto puede actualizarlo.
     Todos los campos son opcionales, solo se actualizarán los campos proporcionados.
     """
-    try:
-        project = project_service.update_user_project(
-            db=db,
-            project_id=project_id,
-            project_in=project_in,
-            owner_id=current_user.id,  # type: ignore
-        )
-        return project
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error interno del servidor: {str(e)}",
-        )
+    project = await project_service.aupdate_user_project(
+        db=db,
+        project_id=project_id,
+        project_in=project_in,
+        owner_id=user_id,
+    )
+    await project_phases_cache.invalidate(project_id)
+    return project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
+async def delete_project(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ) -> None:
     """
     Eliminar un proyecto.
@@ -314,28 +443,22 @@ def delete_project(
     Esta acción es irreversible y eliminará también todos los documentos,
     tareas y bibliografías asociadas al proyecto.
     """
-    try:
-        project_service.delete_user_project(
-            db=db,
-            project_id=project_id,
-            owner_id=current_user.id,  # type: ignore
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error interno del servidor: {str(e)}",
-        )
+    await project_service.adelete_user_project(
+        db=db,
+        project_id=project_id,
+        owner_id=user_id,
+    )
+    await project_phases_cache.invalidate(project_id)
 
 
 @router.get("/{project_id}/descargar-documento")
 async def download_project_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     project_id: int,
-    current_user: User = Depends(get_current_user),
-) -> FileResponse:
+    user_id: int = Depends(aget_current_user_id),
+    request: Request,
+) -> Response:
     """
     Descargar el documento adjunto del proyecto.
 
@@ -344,74 +467,37 @@ async def download_project_document(
     iniciará automáticamente la descarga.
 
     Returns:
-        FileResponse: Archivo para descargar
+        Response: Archivo para descargar, o 304 si el cliente ya lo tiene
 
     Raises:
         HTTPException 404: Si el proyecto no existe o no tiene documento adjunto
         HTTPException 403: Si el usuario no tiene permisos
         HTTPException 500: Si hay un error al acceder al archivo
     """
-    try:
-        # Obtener el documento adjunto del proyecto
-        attachment = attachment_service.get_attachment_by_parent(
-            db=db,
-            parent_type="project",
-            parent_id=project_id,
-            user_id=current_user.id,  # type: ignore
-        )
-
-        if not attachment:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="El proyecto no tiene un documento adjunto",
-            )
-
-        # Verificar que el archivo existe en el sistema de archivos
-        file_path = Path(str(attachment.file_path))
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="El archivo no se encuentra en el sistema",
-            )
-
-        # Determinar el tipo MIME según la extensión del archivo
-        media_type_map = {
-            ".pdf": "application/pdf",
-            ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            ".doc": "application/msword",
-        }
-
-        file_extension = file_path.suffix.lower()
-        media_type = media_type_map.get(file_extension, "application/octet-stream")
-
-        # Obtener el nombre del archivo como string
-        filename = str(attachment.file_name)
-
-        # Encodear el nombre del archivo para el header según RFC 5987
-        # Esto maneja correctamente caracteres especiales (acentos, ñ, etc.)
-        filename_encoded = quote(filename)
+    # Obtener el documento adjunto del proyecto
+    attachment = await attachment_service.aget_attachment_by_parent(
+        db=db,
+        parent_type="project",
+        parent_id=project_id,
+        user_id=user_id,
+    )
 
-        # Crear el header Content-Disposition con ambos formatos para máxima compatibilidad
-        # filename* es el estándar RFC 5987 para caracteres no-ASCII
-        content_disposition = (
-            f"attachment; "
-            f'filename="{filename.encode("ascii", "ignore").decode("ascii")}"; '
-            f"filename*=UTF-8''{filename_encoded}"
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El proyecto no tiene un documento adjunto",
         )
 
-        # Retornar el archivo para descarga
-        return FileResponse(
-            path=str(file_path),
-            filename=filename,
-            media_type=media_type,
-            headers={"Content-Disposition": content_disposition},
+    try:
+        # El stat del archivo se hace fuera del event loop
+        return await run_in_threadpool(
+            FileUtils.build_download_response,
+            file_path=str(attachment.file_path),
+            filename=str(attachment.file_name),
+            if_none_match=request.headers.get("If-None-Match"),
         )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error al descargar el documento: {e}")
+    except FileNotFoundError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error al descargar el documento",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El archivo no se encuentra en el sistema",
         )
@@ -1,283 +1,275 @@
-from pathlib import Path
-from typing import Optional
-from urllib.parse import quote
-
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+from typing import Any, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.dependencies import get_current_user
-from app.database import get_db
-from app.models.user import User
+from app.core.dependencies import aget_current_user_id, get_current_user_id
+from app.database import get_async_db, get_db
+from app.models.attachment import FileType
 from app.schemas.attachment import AttachmentResponse
 from app.schemas.task import TaskCreate, TaskDataToMovePhase, TaskResponse, TaskUpdate
 from app.services import task_service
 from app.services.attachment_service import attachment_service
+from app.utils.file_utils import FileUtils
 
 router = APIRouter()
 
+# Valida y serializa la lista completa en una sola pasada de pydantic-core
+_TASK_LIST_ADAPTER = TypeAdapter(list[TaskResponse])
+
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_in: TaskCreate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Crea una nueva tarea para el usuario autenticado.
 
     Args:
-        db (Session): Sesión de base de datos proporcionada por la dependencia.
+        db (AsyncSession): Sesión asíncrona de base de datos proporcionada por la dependencia.
         task_in (TaskCreate): Datos requeridos para crear una nueva tarea.
-        current_user (User): El usuario actualmente autenticado.
+        user_id (int): ID del usuario actualmente autenticado.
 
     Returns:
         TaskResponse: Los datos de la tarea creada.
     """
-    user_id = current_user.id
-    return task_service.create_task(
+    return await task_service.acreate_task(
         db=db,
         task_in=task_in,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
 
 
-@router.post("/{task_id}/documentos", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{task_id}/documentos",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED,
+)
 async def upload_document(
     *,
     db: Session = Depends(get_db),
     task_id: int,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-) -> AttachmentResponse:
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user_id),
+) -> Any:
     """
     Subir un nuevo documento a la tarea.
 
     Solo el propietario del proyecto al que pertenece la tarea puede subir documentos.
     """
-    try:
-        document = attachment_service.create_attachment(
-            db=db,
-            file=file,
-            parent_type="task",
-            parent_id=task_id,
-            user_id=current_user.id,  # type: ignore
-        )
+    # Guarda el archivo en disco: fuera del event loop
+    document = await run_in_threadpool(
+        attachment_service.create_attachment,
+        db=db,
+        file=file,
+        parent_type="task",
+        parent_id=task_id,
+        user_id=user_id,
+    )
 
-        return AttachmentResponse.model_validate(document)
+    # Precalcular el contenido del .docx sin retrasar la respuesta
+    if document.file_type == FileType.DOCX:
+        background_tasks.add_task(
+            attachment_service.extract_and_store_content,
+            document.id,  # type: ignore
+        )
 
-    except Exception:
-        raise
+    return document
 
 
-@router.get("/{task_id}/documentos")
+@router.get("/{task_id}/documentos", response_model=Optional[AttachmentResponse])
 async def get_task_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: int,
-    current_user: User = Depends(get_current_user),
-) -> Optional[AttachmentResponse]:
+    user_id: int = Depends(aget_current_user_id),
+) -> Any:
     """
     Obtener el documento adjunto de la tarea.
 
     Solo el propietario del proyecto al que pertenece la tarea puede acceder al documento.
     Retorna None si no hay documento adjunto.
     """
-    try:
-        attachment = attachment_service.get_attachment_by_parent(
-            db=db,
-            parent_type="task",
-            parent_id=task_id,
-            user_id=current_user.id,  # type: ignore
-        )
-
-        if attachment:
-            return AttachmentResponse.model_validate(attachment)
-        return None
+    attachment = await attachment_service.aget_attachment_by_parent(
+        db=db,
+        parent_type="task",
+        parent_id=task_id,
+        user_id=user_id,
+    )
 
-    except Exception:
-        raise
+    return attachment
 
 
 @router.get("/", response_model=list[TaskResponse])
 async def get_tasks_by_phase(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     phase_id: int,
-    current_user: User = Depends(get_current_user),
-):
+    user_id: int = Depends(aget_current_user_id),
+) -> Response:
     """
     Obtiene todas las tareas asociadas a una fase específica para el usuario autenticado.
 
     Args:
-        db (Session): Sesión de base de datos proporcionada por la dependencia.
+        db (AsyncSession): Sesión asíncrona de base de datos proporcionada por la dependencia.
         phase_id (int): ID de la fase para la cual se desean obtener las tareas.
-        current_user (User): El usuario actualmente autenticado.
+        user_id (int): ID del usuario actualmente autenticado.
 
     Returns:
-        list[TaskResponse]: Una lista de tareas asociadas a la fase especificada.
+        Response: Lista de tareas (list[TaskResponse]) de la fase en JSON,
+            validada y serializada en una sola pasada.
     """
-    user_id = current_user.id
-    return task_service.get_phase_tasks(
+    tasks = await task_service.aget_phase_tasks(
         db=db,
         phase_id=phase_id,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
+    )
+    return Response(
+        content=_TASK_LIST_ADAPTER.dump_json(
+            _TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)
+        ),
+        media_type="application/json",
     )
 
 
 @router.put("/{task_id}/mover")
 async def move_task_to_phase(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: int,
     data_to_update: TaskDataToMovePhase,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Mueve una tarea a una nueva fase y posición dentro de esa fase.
 
     Args:
-        db (Session): Sesión de base de datos proporcionada por la dependencia.
+        db (AsyncSession): Sesión asíncrona de base de datos proporcionada por la dependencia.
         task_id (int): ID de la tarea que se desea mover.
         data_to_update (TaskDataToMovePhase): Objeto que contiene los datos para mover la tarea, incluyendo:
             - new_phase_id (int): ID de la nueva fase a la que se moverá la tarea.
             - new_position (Optional[int]): Posición en la que se va a ubicar en la nueva fase (opcional).
-        current_user (User): El usuario actualmente autenticado.
+        user_id (int): ID del usuario actualmente autenticado.
 
     Returns:
         TaskResponse: Los datos de la tarea movida.
     """
-    user_id = current_user.id
     new_phase_id = data_to_update.new_phase_id
     new_position = data_to_update.new_position
-    return task_service.move_task_to_phase(
+    return await task_service.amove_task_to_phase(
         db=db,
         task_id=task_id,
         new_phase_id=new_phase_id,
         new_position=new_position,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: int,
     task_in: TaskUpdate,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Actualiza una tarea existente para el usuario autenticado.
 
     Args:
-        db (Session): Sesión de base de datos proporcionada por la dependencia.
+        db (AsyncSession): Sesión asíncrona de base de datos proporcionada por la dependencia.
         task_id (int): ID de la tarea que se desea actualizar.
         task_in (TaskUpdate): Datos para actualizar la tarea.
-        current_user (User): El usuario actualmente autenticado.
+        user_id (int): ID del usuario actualmente autenticado.
     Returns:
         TaskResponse: Los datos de la tarea actualizada.
     """
-    user_id = current_user.id
-    return task_service.update_task(
+    return await task_service.aupdate_task(
         db=db,
         task_id=task_id,
         task_in=task_in,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(aget_current_user_id),
 ):
     """
     Elimina una tarea existente para el usuario autenticado.
 
     Args:
-        db (Session): Sesión de base de datos proporcionada por la dependencia.
+        db (AsyncSession): Sesión asíncrona de base de datos proporcionada por la dependencia.
         task_id (int): ID de la tarea que se desea eliminar.
-        current_user (User): El usuario actualmente autenticado.
+        user_id (int): ID del usuario actualmente autenticado.
 
     Returns:
         None
     """
-    user_id = current_user.id
-    user_id = current_user.id
-    return task_service.delete_task(
+    return await task_service.adelete_task(
         db=db,
         task_id=task_id,
-        owner_id=user_id,  # type: ignore
+        owner_id=user_id,
     )
 
 
 @router.get("/{task_id}/descargar-documento")
 async def download_task_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: int,
-    current_user: User = Depends(get_current_user),
-) -> FileResponse:
+    user_id: int = Depends(aget_current_user_id),
+    request: Request,
+) -> Response:
     """
     Descargar el documento adjunto de la tarea.
 
     Solo el propietario del proyecto al que pertenece la tarea puede descargar el documento.
     """
-    try:
-        attachment = attachment_service.get_attachment_by_parent(
-            db=db,
-            parent_type="task",
-            parent_id=task_id,
-            user_id=current_user.id,  # type: ignore
-        )
+    attachment = await attachment_service.aget_attachment_by_parent(
+        db=db,
+        parent_type="task",
+        parent_id=task_id,
+        user_id=user_id,
+    )
 
-        if not attachment:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="La tarea no tiene un documento adjunto",
-            )
-
-        file_path = Path(str(attachment.file_path))
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="El archivo no se encuentra en el sistema",
-            )
-
-        media_type_map = {
-            ".pdf": "application/pdf",
-            ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            ".doc": "application/msword",
-        }
-
-        file_extension = file_path.suffix.lower()
-        media_type = media_type_map.get(file_extension, "application/octet-stream")
-
-        filename = str(attachment.file_name)
-        filename_encoded = quote(filename)
-
-        content_disposition = (
-            f"attachment; "
-            f'filename="{filename.encode("ascii", "ignore").decode("ascii")}"; '
-            f"filename*=UTF-8''{filename_encoded}"
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="La tarea no tiene un documento adjunto",
         )
 
-        return FileResponse(
-            path=str(file_path),
-            filename=filename,
-            media_type=media_type,
-            headers={"Content-Disposition": content_disposition},
+    try:
+        # El stat del archivo se hace fuera del event loop
+        return await run_in_threadpool(
+            FileUtils.build_download_response,
+            file_path=str(attachment.file_path),
+            filename=str(attachment.file_name),
+            if_none_match=request.headers.get("If-None-Match"),
         )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error al descargar el documento: {e}")
+    except FileNotFoundError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error al descargar el documento",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El archivo no se encuentra en el sistema",
         )
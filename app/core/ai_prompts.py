@@ -5,6 +5,7 @@ Este módulo contiene todos los prompts del sistema utilizados en los diferentes
 endpoints de IA. Cada prompt está optimizado para su caso de uso específico y
 define claramente el formato de respuesta esperado.
 """
+from functools import lru_cache
 
 # =============================================================================
 # PROMPT PARA CHAT CONTEXTUAL
@@ -101,18 +102,12 @@ Responde siempre en el idioma del texto proporcionado.
 # =============================================================================
 # PROMPT PARA FORMATEO DE CITAS APA 7
 # =============================================================================
+# Las instrucciones fijas van primero y los datos variables al final, de menor a
+# mayor frecuencia de cambio, para que el prefijo común aproveche la caché
+# implícita de prompts del modelo.
 CITATIONS_SYSTEM_PROMPT = """Eres un experto en formateo de citas bibliográficas según el estilo APA 7ma edición.
 Tu función es generar citas perfectamente formateadas a partir de los datos proporcionados, considerando el contexto del proyecto de investigación.
 
-CONTEXTO DEL PROYECTO:
-{project_context}
-
-BIBLIOGRAFÍA EXISTENTE DEL PROYECTO:
-{bibliography_context}
-
-DATOS DE LA FUENTE A FORMATEAR:
-{citation_data}
-
 INSTRUCCIONES:
 - Genera ÚNICAMENTE el texto de la cita en formato APA 7
 - NO incluyas explicaciones, notas, comentarios ni texto introductorio
@@ -152,6 +147,15 @@ Documento web:
 Organización Mundial de la Salud. (2023, 15 de marzo). *Guías de salud mental*. https://www.who.int/es/guidelines
 
 Responde SOLO con la(s) cita(s) formateada(s), sin ningún texto adicional.
+
+CONTEXTO DEL PROYECTO:
+{project_context}
+
+BIBLIOGRAFÍA EXISTENTE DEL PROYECTO:
+{bibliography_context}
+
+DATOS DE LA FUENTE A FORMATEAR:
+{citation_data}
 """
 
 BIBLIOGRAPHY_SYSTEM_PROMPT = """Eres un asistente de investigación académica especializado en encontrar fuentes científicas verificables EN ESPAÑOL.
@@ -255,6 +259,31 @@ def format_project_context(
     Returns:
         str: Contexto formateado
     """
+    args = (
+        project_name,
+        description,
+        research_type,
+        objectives,
+        documents_summary,
+        bibliographies_summary,
+    )
+    try:
+        # El mismo contexto se reutiliza entre peticiones consecutivas
+        return _format_project_context_cached(*args)
+    except TypeError:
+        # Valores no hashables (p. ej. listas en project_info): sin caché
+        return _format_project_context(*args)
+
+
+def _format_project_context(
+    project_name: str,
+    description: str | None,
+    research_type: str | None,
+    objectives: str | None,
+    documents_summary: str | None,
+    bibliographies_summary: str | None,
+) -> str:
+    """Construye el contexto del proyecto (ver format_project_context)"""
     context_parts = [f"**Proyecto**: {project_name}"]
 
     if research_type:
@@ -277,6 +306,9 @@ def format_project_context(
     return "\n\n".join(context_parts)
 
 
+_format_project_context_cached = lru_cache(maxsize=256)(_format_project_context)
+
+
 def format_bibliography_context(bibliography_list: list[dict] | None = None) -> str:
     """
     Formatea la bibliografía del proyecto para incluirla en los prompts.
@@ -0,0 +1,99 @@
+"""
+Caché compartida en Redis con degradación a "sin caché" si Redis no está disponible
+"""
+import logging
+import time
+from typing import Any, Optional
+
+import orjson
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Segundos que se espera antes de reintentar conectar tras un fallo de Redis
+_RETRY_AFTER_SECONDS = 30.0
+
+_redis_client: Optional[aioredis.Redis] = None
+_redis_disabled_until = 0.0
+
+
+def _get_client() -> Optional[aioredis.Redis]:
+    """
+    Obtiene el cliente Redis (creándolo de forma perezosa)
+
+    Returns:
+        Optional[Redis]: Cliente o None si Redis no está configurado o falló hace poco
+    """
+    global _redis_client
+    if not settings.REDIS_URL or time.monotonic() < _redis_disabled_until:
+        return None
+    if _redis_client is None:
+        _redis_client = aioredis.Redis.from_url(
+            settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5
+        )
+    return _redis_client
+
+
+def _mark_unavailable(error: Exception) -> None:
+    """Desactiva temporalmente la caché tras un error de conexión"""
+    global _redis_disabled_until
+    _redis_disabled_until = time.monotonic() + _RETRY_AFTER_SECONDS
+    logger.warning("Redis no disponible, se continúa sin caché: %s", error)
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    """
+    Obtiene un valor JSON de la caché
+
+    Args:
+        key: Clave de la caché
+
+    Returns:
+        Optional[Any]: Valor deserializado o None si no existe o Redis no responde
+    """
+    client = _get_client()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def cache_set(key: str, value: Any, ttl: int) -> None:
+    """
+    Guarda un valor serializable a JSON en la caché con expiración
+
+    Args:
+        key: Clave de la caché
+        value: Valor a guardar
+        ttl: Tiempo de vida en segundos
+    """
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        await client.setex(key, ttl, orjson.dumps(value))
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+
+
+async def cache_incr(key: str) -> None:
+    """
+    Incrementa un contador de la caché (lo crea a 1 si no existe, sin expiración)
+
+    Args:
+        key: Clave del contador
+    """
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        await client.incr(key)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
@@ -19,6 +19,12 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = "investi_flow_db"
     DATABASE_USER: str = "investi_flow_user"
     DATABASE_PASSWORD: str = ""
+    DB_POOL_SIZE: int = 10  # Conexiones persistentes por engine
+    DB_MAX_OVERFLOW: int = 10  # Conexiones extra temporales por engine
+    DB_POOL_TIMEOUT: int = 30  # Segundos de espera por una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # Renovar conexiones con más de 30 minutos
+    WEB_CONCURRENCY: int = 1  # Procesos de uvicorn que comparten el servidor de BD
+    DB_PGBOUNCER: bool = False  # DATABASE_URL apunta a PgBouncer (modo transaction)
 
     # JWT Security
     SECRET_KEY: Optional[str] = None  # Set via environment variable or .env file
@@ -32,8 +38,15 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 10485760  # 10MB
     UPLOAD_FOLDER: str = "uploads"
+    # Prefijo de la location interna de nginx que sirve las descargas con
+    # X-Accel-Redirect (sendfile); None = las sirve la propia aplicación
+    DOWNLOAD_ACCEL_REDIRECT_PREFIX: Optional[str] = None
     ALLOWED_EXTENSIONS: str = "pdf,doc,docx,txt,md"
 
+    # Document processing
+    DOCX_POOL_MAX_WORKERS: Optional[int] = None  # None = os.cpu_count()
+    DOCX_CACHE_TTL: int = 86400  # 24 horas
+
     # AI Services
     OPENAI_API_KEY: Optional[str] = None
     GOOGLE_AI_API_KEY: Optional[str] = None
@@ -43,9 +56,12 @@ class Settings(BaseSettings):
     AI_MODEL_SUGGESTIONS: str = "gemini-2.5-flash-lite"
     AI_MODEL_CITATIONS: str = "gemini-2.5-flash-lite"
     AI_MODEL_BIBLIOGRAPHY: str = "gemini-3.1-pro-preview"
+    AI_CACHE_TTL: int = 86400  # 24 horas
+    AI_HTTP_MAX_CONNECTIONS: int = 100  # Conexiones (y keep-alive) hacia Gemini
 
     # Redis
     REDIS_URL: Optional[str] = "redis://localhost:6379/0"
+    PROJECT_PHASES_CACHE_TTL: int = 3600  # Proyecto con fases (1 hora)
 
     # Email
     SMTP_TLS: bool = True
@@ -1,30 +1,50 @@
 """Dependencias comunes de la aplicación"""
 
+from typing import Any, Callable, TypeVar
+
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.ai_config import AIFeature, UserPlan, is_feature_available
 from app.core.security import oauth2_scheme, verify_token
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.user import User
+from app.services.project_service import project_service
 from app.services.user_service import user_service
 
+# Usuario completo o fila con al menos las columnas id e is_active
+_UserLike = TypeVar("_UserLike", User, Row[Any])
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """Dependencia para obtener el usuario actual"""
-    credential_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    # Obtener email del token
+
+def get_token_email(token: str = Depends(oauth2_scheme)) -> str:
+    """
+    Dependencia para obtener el email del usuario a partir del token de acceso
+
+    Al ser una subdependencia, FastAPI la resuelve una sola vez por petición y
+    el JWT se decodifica una única vez aunque varias dependencias la usen.
+
+    Raises:
+        HTTPException: Si el token no es válido
+    """
     email = verify_token(token)
     if email is None:
-        raise credential_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudieron validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return email
 
-    user = user_service.get_user_by_email(db, email=email)
+
+def _ensure_active_user(user: _UserLike | None) -> _UserLike:
+    """
+    Verificar que el usuario existe y está activo
+
+    Raises:
+        HTTPException: Si el usuario no existe o está inactivo
+    """
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
@@ -36,3 +56,160 @@ def get_current_user(
         )
 
     return user
+
+
+def get_current_user(
+    email: str = Depends(get_token_email),
+    db: Session = Depends(get_db),
+) -> User:
+    """Dependencia para obtener el usuario actual"""
+    user = user_service.get_user_by_email(db, email=email)
+    return _ensure_active_user(user)
+
+
+def get_current_user_id(
+    email: str = Depends(get_token_email),
+    db: Session = Depends(get_db),
+) -> int:
+    """
+    Dependencia para obtener solo el ID del usuario actual
+
+    Para los endpoints que solo necesitan el ID como owner_id: consulta el id y
+    el estado del usuario en lugar de cargar la entidad User completa.
+
+    Raises:
+        HTTPException: Si el token no es válido o el usuario no existe o está inactivo
+    """
+    user = user_service.get_user_id_and_status_by_email(db, email=email)
+    return int(_ensure_active_user(user).id)
+
+
+async def aget_current_user_id(
+    email: str = Depends(get_token_email),
+    db: AsyncSession = Depends(get_async_db),
+) -> int:
+    """Dependencia para obtener solo el ID del usuario actual (sesión asíncrona)"""
+    user = await user_service.aget_user_id_and_status_by_email(db, email=email)
+    return int(_ensure_active_user(user).id)
+
+
+def get_project_access(
+    project_id: int,
+    email: str = Depends(get_token_email),
+    db: Session = Depends(get_db),
+) -> Row[Any]:
+    """
+    Dependencia que autentica al usuario y autoriza su proyecto en una sola consulta
+
+    FastAPI resuelve cada dependencia una sola vez por petición, así que
+    get_project_user y get_authorized_project comparten esta misma consulta.
+
+    Args:
+        project_id: ID del proyecto tomado de la ruta
+        email: Email del usuario extraído del token
+        db: Sesión de base de datos
+
+    Returns:
+        Row: Usuario (User) e id, name, description, research_type y updated_at
+        del proyecto
+
+    Raises:
+        HTTPException: Si el token no es válido, el usuario no existe o está
+            inactivo, o el proyecto no existe o no pertenece al usuario
+    """
+    access = project_service.get_project_fields_with_owner(
+        db, project_id=project_id, owner_email=email
+    )
+    _ensure_active_user(access.User if access is not None else None)
+
+    if access.id is None:  # type: ignore[union-attr]
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Proyecto no encontrado o no tienes permisos para acceder a él",
+        )
+
+    return access  # type: ignore[return-value]
+
+
+def get_project_user(access: Row[Any] = Depends(get_project_access)) -> User:
+    """
+    Dependencia para obtener el usuario actual en rutas de un proyecto
+
+    Args:
+        access: Usuario y proyecto autorizados
+
+    Returns:
+        User: Usuario autenticado
+    """
+    return access.User
+
+
+def get_authorized_project(access: Row[Any] = Depends(get_project_access)) -> Row[Any]:
+    """
+    Dependencia para obtener un proyecto del usuario actual
+
+    Solo se cargan los campos que usan los endpoints, no la entidad completa.
+
+    Args:
+        access: Usuario y proyecto autorizados
+
+    Returns:
+        Row: id, name, description, research_type y updated_at del proyecto
+    """
+    return access
+
+
+def get_user_plan(user_id: int = Depends(get_current_user_id)) -> UserPlan:
+    """
+    Dependencia para obtener el plan del usuario actual
+
+    Mientras el plan no se lea del usuario basta con autenticarlo consultando
+    su id y estado, sin cargar la entidad User completa.
+
+    Args:
+        user_id: ID del usuario autenticado
+
+    Returns:
+        UserPlan: Plan del usuario
+    """
+    # TODO: Determinar el plan del usuario desde la base de datos
+    # Por ahora usamos plan investigador (tiene acceso a bibliografía)
+    return UserPlan.INVESTIGADOR
+
+
+def require_ai_feature(feature: AIFeature) -> Callable[..., UserPlan]:
+    """
+    Crea una dependencia que rechaza la petición si el plan no incluye la funcionalidad
+
+    Declarada en el decorador de la ruta, se resuelve antes que las dependencias
+    del endpoint, por lo que la petición se rechaza sin consultar el proyecto.
+
+    Args:
+        feature: Funcionalidad de IA requerida por el endpoint
+
+    Returns:
+        Callable: Dependencia que devuelve el plan del usuario
+    """
+
+    # Cuerpos de error construidos una sola vez por plan
+    unavailable_details = {
+        plan: {
+            "error": "feature_not_available",
+            "message": (
+                f"La funcionalidad '{feature.value}' no está disponible en "
+                "tu plan actual. Actualiza a plan Investigador o Profesional."
+            ),
+            "details": {"feature": feature.value, "plan": plan.value},
+        }
+        for plan in UserPlan
+    }
+
+    def dependency(user_plan: UserPlan = Depends(get_user_plan)) -> UserPlan:
+        if not is_feature_available(feature, user_plan):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=unavailable_details[user_plan],
+            )
+        return user_plan
+
+    return dependency
@@ -0,0 +1,85 @@
+"""
+Ejecutores compartidos para trabajo CPU-bound fuera del event loop
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_docx_pool: Optional[ProcessPoolExecutor] = None
+
+
+class _WorkerHTTPError(Exception):
+    """
+    HTTPException serializable entre procesos.
+
+    La HTTPException de Starlette no se puede deserializar (su __init__ exige
+    argumentos que no guarda en `args`), así que se transporta con esta clase y
+    se reconstruye en el proceso principal.
+    """
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _call_in_worker(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta `func` en el proceso hijo traduciendo HTTPException a un tipo serializable"""
+    try:
+        return func(*args, **kwargs)
+    except HTTPException as e:
+        raise _WorkerHTTPError(e.status_code, e.detail)
+
+
+def get_docx_pool() -> ProcessPoolExecutor:
+    """
+    Obtiene (creándolo si es necesario) el pool de procesos para parseo de .docx
+
+    Returns:
+        ProcessPoolExecutor: Pool acotado a DOCX_POOL_MAX_WORKERS procesos
+    """
+    global _docx_pool
+    if _docx_pool is None:
+        max_workers = settings.DOCX_POOL_MAX_WORKERS or os.cpu_count() or 1
+        _docx_pool = ProcessPoolExecutor(max_workers=max_workers)
+    return _docx_pool
+
+
+async def run_in_docx_pool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta una función CPU-bound en el pool de procesos sin bloquear el event loop
+
+    Args:
+        func: Función a nivel de módulo (serializable con pickle)
+        *args: Argumentos posicionales de la función
+        **kwargs: Argumentos con nombre de la función
+
+    Returns:
+        T: Resultado de la función
+
+    Raises:
+        HTTPException: Si la función lanzó una HTTPException en el proceso hijo
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            get_docx_pool(), functools.partial(_call_in_worker, func, *args, **kwargs)
+        )
+    except _WorkerHTTPError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+def shutdown_docx_pool() -> None:
+    """Cierra el pool de procesos de .docx (usado al apagar la aplicación)"""
+    global _docx_pool
+    if _docx_pool is not None:
+        _docx_pool.shutdown(wait=True, cancel_futures=True)
+        _docx_pool = None
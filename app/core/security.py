@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Union
 
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from passlib.context import CryptContext
 
 from app.core.config import settings
@@ -13,6 +15,28 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+@lru_cache(maxsize=4)
+def _construct_key(secret_key: str, algorithm: str) -> Key:
+    """Construir (una sola vez por clave y algoritmo) la clave de firma de jose"""
+    return jwk.construct(secret_key, algorithm)
+
+
+def _get_signing_key() -> Key:
+    """
+    Obtener la clave de firma JWT ya construida
+
+    jose construye la clave (y parsea el PEM en algoritmos asimétricos) en cada
+    encode/decode si recibe el secreto en texto; se le pasa la clave cacheada.
+
+    Raises:
+        ValueError: Si SECRET_KEY no está configurada
+    """
+    secret_key = settings.SECRET_KEY
+    if secret_key is None:
+        raise ValueError("SECRET_KEY is not set in the configuration.")
+    return _construct_key(secret_key, settings.ALGORITHM)
+
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta | None = None
 ) -> str:
@@ -25,11 +49,9 @@ def create_access_token(
         )
     to_encode = {"exp": expire, "sub": str(subject)}
 
-    secret_key = settings.SECRET_KEY
-    if secret_key is None:
-        raise ValueError("SECRET_KEY is not set in the configuration.")
-
-    encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(
+        to_encode, _get_signing_key(), algorithm=settings.ALGORITHM
+    )
     return encoded_jwt
 
 
@@ -40,22 +62,16 @@ def create_refresh_token(subject: Union[str, Any]) -> str:
     )
     to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
 
-    secret_key = settings.SECRET_KEY
-    if secret_key is None:
-        raise ValueError("SECRET_KEY is not set in the configuration.")
-
-    encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(
+        to_encode, _get_signing_key(), algorithm=settings.ALGORITHM
+    )
     return encoded_jwt
 
 
 def verify_token(token: str) -> str | None:
     """Verificar y decodificar un token JWT"""
     try:
-        secret_key = settings.SECRET_KEY
-        if secret_key is None:
-            raise ValueError("SECRET_KEY is not set in the configuration.")
-
-        payload = jwt.decode(token, secret_key, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, _get_signing_key(), algorithms=[settings.ALGORITHM])
         email = payload.get("sub")
         if email is None:
             return None
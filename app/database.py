@@ -1,19 +1,145 @@
-from typing import Generator
+import logging
+from typing import Any, AsyncGenerator, Dict, Generator, Tuple
+from uuid import uuid4
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 if settings.DATABASE_URL is None:
     raise ValueError("DATABASE_URL is not set in the configuration.")
 
-engine = create_engine(settings.DATABASE_URL)
+_backend_name = make_url(settings.DATABASE_URL).get_backend_name()
+
+# Configuración de los pools de conexiones. pre_ping descarta las conexiones que el
+# servidor cerró mientras estaban ociosas (p. ej. Neon al suspender el cómputo) y
+# recycle las renueva antes de que caduquen, en lugar de fallar la petición.
+_pool_kwargs: Dict[str, Any] = {
+    "pool_pre_ping": True,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+}
+# SQLite (pruebas/desarrollo) usa pools propios que no aceptan el tamaño ni el
+# tiempo de espera
+if _backend_name != "sqlite":
+    _pool_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+
+# Engine síncrono: se mantiene para Alembic, scripts CLI y endpoints síncronos
+engine = create_engine(settings.DATABASE_URL, **_pool_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _unique_prepared_statement_name() -> str:
+    """Nombre de sentencia preparada que no choca entre conexiones de PgBouncer"""
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _build_async_url(
+    database_url: str, behind_pgbouncer: bool = False
+) -> Tuple[URL, Dict[str, Any]]:
+    """
+    Convierte la URL síncrona de la base de datos a su equivalente asíncrono.
+
+    asyncpg no acepta los parámetros libpq `sslmode`/`channel_binding` en la URL,
+    por lo que `sslmode` se traslada a `connect_args["ssl"]`.
+
+    Con PgBouncer en modo transaction cada transacción puede ir a una conexión
+    distinta del servidor, así que se desactivan las cachés de sentencias
+    preparadas de asyncpg y SQLAlchemy y se les da nombres únicos.
+
+    Args:
+        database_url: URL síncrona (postgresql:// o sqlite://)
+        behind_pgbouncer: Si la URL apunta a PgBouncer en modo transaction
+
+    Returns:
+        Tuple[URL, Dict[str, Any]]: (URL asíncrona, connect_args para el engine)
+    """
+    url = make_url(database_url)
+    connect_args: Dict[str, Any] = {}
+
+    if url.get_backend_name() == "postgresql":
+        query = dict(url.query)
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+        if behind_pgbouncer:
+            connect_args.update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=_unique_prepared_statement_name,
+            )
+        return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite"), connect_args
+
+    return url, connect_args
+
+
+_async_url, _async_connect_args = _build_async_url(
+    settings.DATABASE_URL, behind_pgbouncer=settings.DB_PGBOUNCER
+)
+
+# Engine asíncrono para endpoints async (I/O no bloqueante del event loop)
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    **_pool_kwargs,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
+def check_pool_capacity() -> None:
+    """
+    Avisar si los pools pueden abrir más conexiones de las que admite PostgreSQL
+
+    Cada proceso tiene dos engines (síncrono y asíncrono) y cada uno puede abrir
+    hasta DB_POOL_SIZE + DB_MAX_OVERFLOW conexiones. Si la suma de todos los
+    procesos supera max_connections, las peticiones fallan con "too many
+    clients" en lugar de esperar en el pool. Detrás de PgBouncer no aplica:
+    es PgBouncer quien limita las conexiones reales al servidor.
+    """
+    if _backend_name != "postgresql" or settings.DB_PGBOUNCER:
+        return
+
+    try:
+        with engine.connect() as conn:
+            max_connections = int(
+                conn.exec_driver_sql("SHOW max_connections").scalar_one()
+            )
+    except SQLAlchemyError:
+        logger.warning("No se pudo consultar max_connections de la base de datos")
+        return
+
+    required = 2 * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    required *= settings.WEB_CONCURRENCY
+    if required > max_connections:
+        logger.warning(
+            "Los pools pueden abrir %d conexiones (%d procesos) y el servidor "
+            "admite %d: reduce DB_POOL_SIZE/DB_MAX_OVERFLOW o usa un pooler",
+            required,
+            settings.WEB_CONCURRENCY,
+            max_connections,
+        )
+
+
 def get_db() -> Generator[Session, None, None]:
     """Dependency para obtener una sesión de base de datos"""
     db = SessionLocal()
@@ -21,3 +147,9 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency para obtener una sesión asíncrona de base de datos"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,10 +1,11 @@
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import CheckConstraint, Column, DateTime
+from sqlalchemy import JSON, CheckConstraint, Column, DateTime
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
@@ -24,6 +25,14 @@ class Attachment(Base):
     file_path = Column(String, nullable=False)
     file_type = Column(SqlEnum(FileType), nullable=False)
     file_size = Column(Integer, nullable=False)  # Tamaño en bytes
+
+    # Contenido extraído de los .docx, precalculado al subir/editar el archivo.
+    # Diferido para no cargarlo en las consultas que solo necesitan metadatos.
+    html_content = deferred(Column(Text, nullable=True))
+    pages_json = deferred(
+        Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    )
+    text_content = deferred(Column(Text, nullable=True))
     created_at = Column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -53,4 +62,17 @@ class Attachment(Base):
             "(project_id IS NULL AND phase_id IS NULL AND task_id IS NOT NULL)",
             name="ck_attachment_parent_exclusive",
         ),
+        # Índice cubriente para la consulta mínima de permisos y ruta del archivo
+        Index(
+            "ix_attachments_id_covering",
+            "id",
+            postgresql_include=[
+                "file_name",
+                "file_type",
+                "file_path",
+                "project_id",
+                "phase_id",
+                "task_id",
+            ],
+        ),
     )
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -10,7 +10,7 @@ class Bibliography(Base):
     __tablename__ = "bibliographies"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
 
     # Campos básicos APA 7
     type = Column(String(50), nullable=False)  # libro, articulo, web, tesis, etc.
@@ -44,3 +44,8 @@ class Bibliography(Base):
 
     # Relaciones
     project = relationship("Project", back_populates="bibliographies")
+
+    __table_args__ = (
+        # Listado por proyecto y comprobación de pertenencia con index-only scan
+        Index("ix_bibliographies_project_id_id", "project_id", "id"),
+    )
@@ -8,6 +8,9 @@ from sqlalchemy.orm import relationship
 
 from app.database import Base
 
+# Longitud del preview del último mensaje guardado en cada conversación
+PREVIEW_CHARS = 100
+
 
 class Conversation(Base):
     """
@@ -29,6 +32,10 @@ class Conversation(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # Desnormalizados para listar conversaciones sin consultar sus mensajes;
+    # se actualizan al crear cada mensaje
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_preview = Column(String(PREVIEW_CHARS), nullable=True)
 
     # Relaciones
     project = relationship("Project", back_populates="conversations")
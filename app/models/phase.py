@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -25,3 +25,8 @@ class Phase(Base):
         cascade="all, delete-orphan",
         uselist=False,
     )
+
+    __table_args__ = (
+        # Fases de un proyecto ya ordenadas por posición
+        Index("ix_phases_project_id_position", "project_id", "position"),
+    )
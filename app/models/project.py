@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -31,11 +31,23 @@ class ResearchType(str, Enum):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Búsqueda por subcadena (ILIKE '%q%') con índice de trigramas (pg_trgm)
+        Index(
+            "ix_projects_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # Proyectos de un usuario ya ordenados por fecha (recorrido inverso para
+        # DESC); sustituye al índice simple sobre owner_id, que es su prefijo
+        Index("ix_projects_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     research_type = Column(
         String(50), nullable=True
     )  # Almacenar como string en lugar de Enum
@@ -1,8 +1,13 @@
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, undefer
 
 from app.models.attachment import Attachment
+from app.models.phase import Phase
+from app.models.project import Project
+from app.models.task import Task
 from app.repositories.base import BaseRepository
 from app.schemas.attachment import AttachmentCreate, AttachmentUpdate
 
@@ -15,6 +20,143 @@ class AttachmentRepository(
     def __init__(self) -> None:
         super().__init__(Attachment)
 
+    @staticmethod
+    def _select_with_parent_owner(*entities: Any) -> Select[Any]:
+        """
+        Construir un SELECT de `entities` junto con el owner_id del proyecto al que
+        pertenece el adjunto (directamente o a través de su fase/tarea)
+
+        Args:
+            *entities: Entidad o columnas de Attachment a seleccionar
+
+        Returns:
+            Select: Consulta con el owner_id como última columna ("owner_id")
+        """
+        project = aliased(Project)
+        phase = aliased(Phase)
+        phase_project = aliased(Project)
+        task_phase = aliased(Phase)
+        task_project = aliased(Project)
+
+        owner_id = func.coalesce(
+            project.owner_id, phase_project.owner_id, task_project.owner_id
+        ).label("owner_id")
+        return (
+            select(*entities, owner_id)
+            .select_from(Attachment)
+            .outerjoin(project, Attachment.project_id == project.id)
+            .outerjoin(phase, Attachment.phase_id == phase.id)
+            .outerjoin(phase_project, phase.project_id == phase_project.id)
+            .outerjoin(Task, Attachment.task_id == Task.id)
+            .outerjoin(task_phase, Task.phase_id == task_phase.id)
+            .outerjoin(task_project, task_phase.project_id == task_project.id)
+        )
+
+    async def aget_with_parent_owner(
+        self, db: AsyncSession, attachment_id: int, *columns: Any
+    ) -> Tuple[Optional[Attachment], Optional[int]]:
+        """
+        Obtener un adjunto junto con el owner_id del proyecto al que pertenece
+        (directamente o a través de su fase/tarea) en una sola consulta
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            attachment_id: ID del adjunto
+            *columns: Columnas diferidas a cargar (p. ej. Attachment.html_content)
+
+        Returns:
+            Tuple[Optional[Attachment], Optional[int]]: (adjunto, owner_id) o
+            (None, None) si el adjunto no existe
+        """
+        stmt = (
+            self._select_with_parent_owner(Attachment)
+            .where(Attachment.id == attachment_id)
+            .options(*(undefer(c) for c in columns))
+        )
+
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+
+    async def aget_minimal_with_parent_owner(
+        self, db: AsyncSession, attachment_id: int, *columns: Any
+    ) -> Optional[Row[Any]]:
+        """
+        Obtener solo las columnas del adjunto necesarias para autorizar y leer su
+        contenido, sin cargar la fila completa ni construir la entidad ORM
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            attachment_id: ID del adjunto
+            *columns: Columnas adicionales a seleccionar (p. ej. Attachment.pages_json)
+
+        Returns:
+            Optional[Row]: Fila con id, file_name, file_type, file_path, las columnas
+            adicionales y owner_id, o None si el adjunto no existe
+        """
+        stmt = self._select_with_parent_owner(
+            Attachment.id,
+            Attachment.file_name,
+            Attachment.file_type,
+            Attachment.file_path,
+            *columns,
+        ).where(Attachment.id == attachment_id)
+
+        return (await db.execute(stmt)).first()
+
+    async def aget_by_parent_with_owner(
+        self, db: AsyncSession, parent_type: str, parent_id: int
+    ) -> Optional[Row[Any]]:
+        """
+        Obtener en una sola consulta el owner_id de la entidad padre y su adjunto
+
+        Sustituye las consultas encadenadas de padre, fase, proyecto y adjunto
+        por un único SELECT con outer joins.
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            parent_type: Tipo de padre ('project', 'phase' o 'task')
+            parent_id: ID del padre
+
+        Returns:
+            Optional[Row]: Fila (adjunto o None, owner_id o None), o None si la
+            entidad padre no existe
+
+        Raises:
+            ValueError: Si el tipo de padre no es válido
+        """
+        if parent_type == "project":
+            stmt = (
+                select(Attachment, Project.owner_id)
+                .select_from(Project)
+                .outerjoin(Attachment, Attachment.project_id == Project.id)
+                .where(Project.id == parent_id)
+            )
+        elif parent_type == "phase":
+            stmt = (
+                select(Attachment, Project.owner_id)
+                .select_from(Phase)
+                .outerjoin(Project, Phase.project_id == Project.id)
+                .outerjoin(Attachment, Attachment.phase_id == Phase.id)
+                .where(Phase.id == parent_id)
+            )
+        elif parent_type == "task":
+            stmt = (
+                select(Attachment, Project.owner_id)
+                .select_from(Task)
+                .outerjoin(Phase, Task.phase_id == Phase.id)
+                .outerjoin(Project, Phase.project_id == Project.id)
+                .outerjoin(Attachment, Attachment.task_id == Task.id)
+                .where(Task.id == parent_id)
+            )
+        else:
+            raise ValueError(
+                "Tipo de padre no válido. Use: 'project', 'phase' o 'task'"
+            )
+
+        return (await db.execute(stmt)).first()
+
     def get_attachment_by_parent(
         self, db: Session, parent_id: int, parent_type: str
     ) -> Optional[Attachment]:
@@ -45,6 +187,57 @@ class AttachmentRepository(
                 "Tipo de padre no válido. Use: 'project', 'phase' o 'task'"
             )
 
+    def get_text_content_prefix(
+        self, db: Session, attachment_id: int, length: int
+    ) -> Optional[str]:
+        """
+        Obtener los primeros caracteres del texto precalculado de un adjunto
+
+        El recorte se hace en la base de datos para no cargar la columna
+        diferida completa, que puede contener todo el documento.
+
+        Args:
+            db: Sesión de base de datos
+            attachment_id: ID del adjunto
+            length: Número máximo de caracteres a devolver
+
+        Returns:
+            Optional[str]: Prefijo del texto o None si no está precalculado
+        """
+        return db.scalar(
+            select(func.substr(Attachment.text_content, 1, length)).where(
+                Attachment.id == attachment_id
+            )
+        )
+
+    def fill_extracted_content(
+        self, db: Session, attachment_id: int, extraction: Dict[str, Any]
+    ) -> bool:
+        """
+        Guardar el contenido extraído solo si el adjunto aún no tiene contenido
+
+        La condición va en el propio UPDATE, así que una extracción antigua no
+        sobrescribe la que guardó una edición posterior del documento.
+
+        Args:
+            db: Sesión de base de datos
+            attachment_id: ID del adjunto
+            extraction: Resultado de extract_all
+
+        Returns:
+            bool: True si se guardó el contenido
+        """
+        result = db.execute(
+            update(Attachment)
+            .where(Attachment.id == attachment_id, Attachment.html_content.is_(None))
+            .values(
+                html_content=extraction.get("html"),
+                pages_json=extraction.get("pages"),
+                text_content=extraction.get("text"),
+            )
+        )
+        return result.rowcount > 0
+
     def create_attachment(
         self, db: Session, attachment_in: AttachmentCreate
     ) -> Attachment:
@@ -1,19 +1,100 @@
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Tuple
 
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from app.models.bibliography import Bibliography
+from app.models.project import Project
 from app.schemas.bibliography import BibliographyCreate, BibliographyUpdate
 
 
 class BibliographyRepository:
     def get_by_project(self, db: Session, project_id: int) -> List[Bibliography]:
-        return (
-            db.query(Bibliography).filter(Bibliography.project_id == project_id).all()
+        # lambda_stmt: la sentencia se construye una vez y se reutiliza desde la
+        # caché; en cada llamada solo cambia el parámetro project_id
+        stmt = lambda_stmt(
+            lambda: select(Bibliography)
+            .where(Bibliography.project_id == project_id)
+            .order_by(Bibliography.id)
+        )
+        return list(db.scalars(stmt).all())
+
+    def iter_by_project(
+        self, db: Session, project_id: int, batch_size: int = 500
+    ) -> Iterator[Bibliography]:
+        """
+        Recorre las referencias de un proyecto trayéndolas por lotes
+
+        Con yield_per el resultado no se materializa completo en memoria.
+
+        Args:
+            db: Sesión de base de datos (debe seguir abierta mientras se itera)
+            project_id: ID del proyecto
+            batch_size: Filas por lote
+
+        Returns:
+            Iterator[Bibliography]: Referencias del proyecto
+        """
+        return iter(
+            db.scalars(
+                select(Bibliography)
+                .where(Bibliography.project_id == project_id)
+                .execution_options(yield_per=batch_size)
+            )
+        )
+
+    def get_revision(self, db: Session, project_id: int) -> Tuple[Any, ...]:
+        """
+        Obtiene una firma de la bibliografía del proyecto que cambia al crear,
+        editar o eliminar referencias, sin cargar las filas.
+
+        Args:
+            db: Sesión de base de datos
+            project_id: ID del proyecto
+
+        Returns:
+            Tuple[Any, ...]: (número de referencias, id máximo, última actualización)
+        """
+        return tuple(
+            db.query(
+                func.count(Bibliography.id),
+                func.max(Bibliography.id),
+                func.max(Bibliography.updated_at),
+            )
+            .filter(Bibliography.project_id == project_id)
+            .one()
         )
 
     def get_by_id(self, db: Session, id: int) -> Optional[Bibliography]:
-        return db.query(Bibliography).filter(Bibliography.id == id).first()
+        stmt = lambda_stmt(lambda: select(Bibliography).where(Bibliography.id == id))
+        return db.scalars(stmt).first()
+
+    def get_for_owner(
+        self, db: Session, bibliography_id: int, project_id: int, owner_id: int
+    ) -> Optional[Bibliography]:
+        """
+        Obtiene una referencia de un proyecto del usuario en una sola consulta
+
+        Args:
+            db: Sesión de base de datos
+            bibliography_id: ID de la referencia
+            project_id: ID del proyecto al que debe pertenecer
+            owner_id: ID del propietario del proyecto
+
+        Returns:
+            Optional[Bibliography]: La referencia, o None si no existe, no
+            pertenece al proyecto o el proyecto no es del usuario
+        """
+        stmt = lambda_stmt(
+            lambda: select(Bibliography)
+            .join(Project, Project.id == Bibliography.project_id)
+            .where(
+                Bibliography.id == bibliography_id,
+                Bibliography.project_id == project_id,
+                Project.owner_id == owner_id,
+            )
+        )
+        return db.scalars(stmt).first()
 
     def create(
         self, db: Session, project_id: int, obj_in: BibliographyCreate
@@ -2,12 +2,13 @@
 Repositorio para gestión de conversaciones y mensajes de chat
 """
 import logging
+from datetime import datetime
 from typing import Sequence
 
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, select, update
 from sqlalchemy.orm import Session, joinedload
 
-from app.models.conversation import Conversation, Message
+from app.models.conversation import PREVIEW_CHARS, Conversation, Message
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationUpdate,
@@ -55,6 +56,49 @@ class ConversationRepository:
             .all()
         )
 
+    def get_list_with_metadata(
+        self,
+        db: Session,
+        project_id: int,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        before: datetime | None = None,
+    ) -> list[tuple[Conversation, int, str | None]]:
+        """
+        Obtiene las conversaciones de un proyecto junto con su número de mensajes
+        y el inicio del último mensaje, guardados en la propia conversación.
+
+        Args:
+            db: Sesión de base de datos
+            project_id: ID del proyecto
+            user_id: ID del usuario
+            skip: Número de registros a saltar (paginación)
+            limit: Número máximo de registros a retornar
+            before: Cursor de paginación; solo se incluyen conversaciones
+                actualizadas antes de esta fecha
+
+        Returns:
+            Lista de tuplas (conversación, número de mensajes, preview del último
+            mensaje o None) ordenadas por última actualización
+        """
+        query = db.query(Conversation).filter(
+            Conversation.project_id == project_id, Conversation.user_id == user_id
+        )
+        if before is not None:
+            query = query.filter(Conversation.updated_at < before)
+
+        conversations = (
+            query.order_by(desc(Conversation.updated_at), desc(Conversation.id))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return [
+            (conv, conv.message_count or 0, conv.last_message_preview)  # type: ignore
+            for conv in conversations
+        ]
+
     def get_with_messages(
         self, db: Session, conversation_id: int, user_id: int
     ) -> Conversation | None:
@@ -76,12 +120,33 @@ class ConversationRepository:
             .first()
         )
 
+    def get_owned(
+        self, db: Session, conversation_id: int, user_id: int
+    ) -> Conversation | None:
+        """
+        Obtiene una conversación del usuario sin cargar sus mensajes.
+
+        Args:
+            db: Sesión de base de datos
+            conversation_id: ID de la conversación
+            user_id: ID del usuario (para validar permisos)
+
+        Returns:
+            Conversación o None si no existe o no pertenece al usuario
+        """
+        return (
+            db.query(Conversation)
+            .filter(Conversation.id == conversation_id, Conversation.user_id == user_id)
+            .first()
+        )
+
     def create_conversation(
         self,
         db: Session,
         project_id: int,
         user_id: int,
         title: str = "Nueva conversación",
+        commit: bool = True,
     ) -> Conversation:
         """
         Crea una nueva conversación.
@@ -91,14 +156,19 @@ class ConversationRepository:
             project_id: ID del proyecto
             user_id: ID del usuario propietario
             title: Título de la conversación
+            commit: Si es False solo se hace flush, para confirmarla en la misma
+                transacción que otras escrituras
 
         Returns:
             Conversación creada
         """
         conversation = Conversation(project_id=project_id, user_id=user_id, title=title)
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        if commit:
+            db.commit()
+            db.refresh(conversation)
+        else:
+            db.flush()
         logger.info(
             f"Conversación creada: ID={conversation.id}, proyecto={project_id}, usuario={user_id}"
         )
@@ -117,7 +187,8 @@ class ConversationRepository:
             new_title: Nuevo título
 
         Returns:
-            Conversación actualizada o None si no existe o no pertenece al usuario
+            Conversación actualizada (con sus mensajes cargados) o None si no existe
+            o no pertenece al usuario
         """
         conversation = (
             db.query(Conversation)
@@ -130,11 +201,12 @@ class ConversationRepository:
 
         conversation.title = new_title
         db.commit()
-        db.refresh(conversation)
         logger.info(
             f"Título de conversación {conversation_id} actualizado a '{new_title}'"
         )
-        return conversation
+        # El commit expira la instancia: recargarla junto con sus mensajes en una
+        # sola consulta en lugar de refrescarla y cargar los mensajes aparte
+        return self.get_with_messages(db, conversation_id, user_id)
 
     def delete(self, db: Session, *, id: int) -> bool:
         """
@@ -188,6 +260,7 @@ class MessageRepository:
         role: str,
         content: str,
         model_used: str | None = None,
+        commit: bool = True,
     ) -> Message:
         """
         Crea un nuevo mensaje en una conversación.
@@ -198,6 +271,8 @@ class MessageRepository:
             role: Rol del mensaje ('user' o 'model')
             content: Contenido del mensaje
             model_used: Modelo de IA utilizado (solo para mensajes del asistente)
+            commit: Si es False solo se hace flush, para confirmarlo en la misma
+                transacción que otras escrituras
 
         Returns:
             Mensaje creado
@@ -209,8 +284,22 @@ class MessageRepository:
             model_used=model_used,
         )
         db.add(message)
-        db.commit()
-        db.refresh(message)
+        # Mantener el resumen desnormalizado de la conversación en la misma
+        # transacción que el mensaje
+        db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(
+                message_count=Conversation.message_count + 1,
+                last_message_preview=content[:PREVIEW_CHARS],
+                updated_at=datetime.utcnow(),
+            )
+        )
+        if commit:
+            db.commit()
+            db.refresh(message)
+        else:
+            db.flush()
         logger.info(
             f"Mensaje creado: ID={message.id}, conversación={conversation_id}, rol={role}"
         )
@@ -236,6 +325,28 @@ class MessageRepository:
             .all()
         )
 
+    def get_history(
+        self, db: Session, conversation_id: int, after_id: int = 0
+    ) -> list[tuple[int, str, str]]:
+        """
+        Obtiene solo el id, el rol y el contenido de los mensajes de una
+        conversación, en orden de creación.
+
+        Args:
+            db: Sesión de base de datos
+            conversation_id: ID de la conversación
+            after_id: Devolver solo los mensajes con id mayor que este
+
+        Returns:
+            Lista de tuplas (id, rol, contenido)
+        """
+        rows = db.execute(
+            select(Message.id, Message.role, Message.content)
+            .where(Message.conversation_id == conversation_id, Message.id > after_id)
+            .order_by(Message.id)
+        ).all()
+        return [(row.id, row.role, row.content) for row in rows]
+
     def get_last_message(self, db: Session, conversation_id: int) -> Message | None:
         """
         Obtiene el último mensaje de una conversación.
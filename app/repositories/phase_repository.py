@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 
 from app.models.phase import Phase
@@ -23,6 +24,28 @@ class PhaseRepository(BaseRepository[Phase, PhaseCreate, PhaseUpdate]):
             .all()
         )
 
+    def update_positions(
+        self, db: Session, project_id: int, positions: Dict[int, int]
+    ) -> int:
+        """
+        Actualizar la posición de varias fases de un proyecto en una sola sentencia
+
+        Args:
+            db: Sesión de base de datos
+            project_id: ID del proyecto
+            positions: Nueva posición indexada por ID de fase
+
+        Returns:
+            int: Número de fases del proyecto actualizadas
+        """
+        result = db.execute(
+            update(Phase)
+            .where(Phase.project_id == project_id, Phase.id.in_(positions))
+            .values(position=case(positions, value=Phase.id))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount  # type: ignore[attr-defined]
+
     def get_phase_by_project_and_id(
         self, db: Session, phase_id: int, project_id: int
     ) -> Optional[Phase]:
@@ -1,11 +1,18 @@
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, List, Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, and_, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload, selectinload
 
+from app.models.phase import Phase
 from app.models.project import Project
+from app.models.user import User
 from app.repositories.base import BaseRepository
 from app.schemas.project import ProjectCreate, ProjectUpdate
 
+# Más recientes primero; coincide con ix_projects_owner_id_created_at_id
+_NEWEST_FIRST = (Project.created_at.desc(), Project.id.desc())
+
 
 class ProjectRepository(BaseRepository[Project, ProjectCreate, ProjectUpdate]):
     """Repositorio para gestión de proyectos"""
@@ -15,18 +22,94 @@ class ProjectRepository(BaseRepository[Project, ProjectCreate, ProjectUpdate]):
 
     def get_projects_by_owner(self, db: Session, owner_id: int) -> List[Project]:
         """Obtener todos los proyectos de un usuario específico"""
-        return db.query(self.model).filter(Project.owner_id == owner_id).all()
+        return (
+            db.query(self.model)
+            .filter(Project.owner_id == owner_id)
+            .order_by(*_NEWEST_FIRST)
+            .all()
+        )
 
     def get_project_by_owner_and_id(
         self, db: Session, project_id: int, owner_id: int
     ) -> Optional[Project]:
         """Obtener un proyecto específico de un usuario"""
+        # Sentencia cacheada: solo cambian los parámetros entre llamadas
+        stmt = lambda_stmt(
+            lambda: select(Project).where(
+                Project.id == project_id, Project.owner_id == owner_id
+            )
+        )
+        return db.scalars(stmt).first()
+
+    def is_owned_by(self, db: Session, project_id: int, owner_id: int) -> bool:
+        """Verificar que un proyecto pertenece a un usuario sin cargar la entidad"""
         return (
-            db.query(self.model)
-            .filter(Project.id == project_id, Project.owner_id == owner_id)
-            .first()
+            db.scalar(
+                select(Project.id).where(
+                    Project.id == project_id, Project.owner_id == owner_id
+                )
+            )
+            is not None
         )
 
+    async def aget_projects_by_owner(
+        self, db: AsyncSession, owner_id: int
+    ) -> List[Project]:
+        """Obtener todos los proyectos de un usuario usando una sesión asíncrona"""
+        result = await db.scalars(
+            select(Project).where(Project.owner_id == owner_id).order_by(*_NEWEST_FIRST)
+        )
+        return list(result)
+
+    async def astream_projects_by_owner(
+        self, db: AsyncSession, owner_id: int, batch_size: int = 500
+    ) -> AsyncIterator[Project]:
+        """Recorrer los proyectos de un usuario por lotes, sin materializarlos"""
+        result = await db.stream_scalars(
+            select(Project)
+            .where(Project.owner_id == owner_id)
+            .order_by(*_NEWEST_FIRST)
+            .execution_options(yield_per=batch_size)
+        )
+        async for project in result:
+            yield project
+
+    async def aget_project_by_owner_and_id(
+        self, db: AsyncSession, project_id: int, owner_id: int
+    ) -> Optional[Project]:
+        """Obtener un proyecto específico de un usuario usando una sesión asíncrona"""
+        return await db.scalar(
+            select(Project).where(
+                Project.id == project_id, Project.owner_id == owner_id
+            )
+        )
+
+    def get_project_fields_with_owner(
+        self, db: Session, project_id: int, owner_email: str
+    ) -> Optional[Row[Any]]:
+        """
+        Obtener en una sola consulta el usuario y los campos del proyecto que usa
+        el asistente de IA
+
+        La fila trae el usuario (User) y id, name, description, research_type y
+        updated_at del proyecto; estos campos son None si el proyecto no existe o
+        no pertenece al usuario. Devuelve None si el usuario no existe.
+        """
+        return db.execute(
+            select(
+                User,
+                Project.id,
+                Project.name,
+                Project.description,
+                Project.research_type,
+                Project.updated_at,
+            )
+            .outerjoin(
+                Project, and_(Project.owner_id == User.id, Project.id == project_id)
+            )
+            .where(User.email == owner_email)
+        ).first()
+
     def create_project(
         self, db: Session, project_in: ProjectCreate, owner_id: int
     ) -> Project:
@@ -54,28 +137,56 @@ class ProjectRepository(BaseRepository[Project, ProjectCreate, ProjectUpdate]):
         return project
 
     def get_project_with_phases(
-        self, db: Session, project_id: int
+        self, db: Session, project_id: int, owner_id: int
     ) -> Optional[Project]:
-        """Obtener todas las fases asociadas a un proyecto"""
-        return (
-            db.query(Project)
-            .filter(Project.id == project_id)
-            .options(joinedload(Project.phases))
-            .first()
+        """
+        Obtener un proyecto de un usuario junto con sus fases
+
+        Las fases se cargan en una segunda consulta con IN (selectinload) y
+        cualquier otra relación lanza error en vez de cargarse de forma perezosa.
+        """
+        return db.scalar(
+            select(Project)
+            .where(Project.id == project_id, Project.owner_id == owner_id)
+            .options(selectinload(Project.phases), raiseload("*"))
+        )
+
+    def get_phase_positions(
+        self, db: Session, project_id: int, owner_id: int
+    ) -> List[Row[Any]]:
+        """
+        Obtener el updated_at de un proyecto de un usuario y el (id, posición) de
+        sus fases, sin cargar las entidades
+
+        Returns:
+            List[Row]: Una fila por fase con updated_at, phase_id y position
+            (phase_id None si no tiene fases); vacía si el proyecto no existe o
+            no pertenece al usuario
+        """
+        return list(
+            db.execute(
+                select(
+                    Project.updated_at,
+                    Phase.id.label("phase_id"),
+                    Phase.position,
+                )
+                .outerjoin(Phase, Phase.project_id == Project.id)
+                .where(Project.id == project_id, Project.owner_id == owner_id)
+            ).all()
         )
 
     def search_projects_by_name(
         self, db: Session, query: str, owner_id: int
     ) -> list[type[Project]]:
         """Buscar proyectos por nombre que contengan una subcadena específica"""
-        return (
-            db.query(self.model)
-            .filter(
-                Project.name.ilike(f"%{query}%"),
-                Project.owner_id == owner_id,
-            )
-            .all()
+        # En PostgreSQL el ILIKE '%q%' se resuelve con ix_projects_name_trgm
+        pattern = f"%{query}%"
+        stmt = lambda_stmt(
+            lambda: select(Project)
+            .where(Project.name.ilike(pattern), Project.owner_id == owner_id)
+            .order_by(*_NEWEST_FIRST)
         )
+        return list(db.scalars(stmt).all())
 
 
 # Instancia global del repositorio
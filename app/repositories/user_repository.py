@@ -1,5 +1,8 @@
-from typing import Optional
+from typing import Any, Optional
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash, verify_password
@@ -14,6 +17,14 @@ class UserRepository:
         """Obtener un usuario por email"""
         return db.query(User).filter(User.email == email).first()  # type: ignore
 
+    def get_id_and_status_by_email(
+        self, db: Session, *, email: str
+    ) -> Optional[Row[Any]]:
+        """Obtener solo el id y el estado (is_active) de un usuario por email"""
+        return db.execute(
+            select(User.id, User.is_active).where(User.email == email)
+        ).first()
+
     def get_by_id(self, db: Session, *, user_id: int) -> Optional[User]:
         """Obtener un usuario por ID"""
         return db.query(User).filter(User.id == user_id).first()  # type: ignore
@@ -56,6 +67,33 @@ class UserRepository:
             return None
         return user
 
+    async def aget_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        """Obtener un usuario por email usando una sesión asíncrona"""
+        return await db.scalar(select(User).where(User.email == email))
+
+    async def aget_id_and_status_by_email(
+        self, db: AsyncSession, *, email: str
+    ) -> Optional[Row[Any]]:
+        """Obtener solo el id y el estado de un usuario por email (sesión asíncrona)"""
+        result = await db.execute(
+            select(User.id, User.is_active).where(User.email == email)
+        )
+        return result.first()
+
+    async def aauthenticate(
+        self, db: AsyncSession, *, email: str, password: str
+    ) -> Optional[User]:
+        """Autenticar un usuario con email y contraseña usando una sesión asíncrona"""
+        user = await self.aget_by_email(db, email=email)
+        if not user:
+            return None
+        # bcrypt es costoso a propósito: se verifica fuera del event loop
+        if not await run_in_threadpool(
+            verify_password, password, user.hashed_password  # type: ignore
+        ):
+            return None
+        return user
+
     def is_active(self, user: User) -> bool:
         """Verificar si un usuario está activo"""
         return bool(user.is_active)
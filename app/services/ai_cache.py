@@ -0,0 +1,92 @@
+"""
+Caché de respuestas del asistente de IA indexada por el hash exacto de la petición
+"""
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+import orjson
+
+from app.core.cache import cache_get, cache_set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AICache:
+    """Caché en Redis para respuestas de IA ante peticiones idénticas"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(namespace: str, key_data: Dict[str, Any]) -> str:
+        """
+        Construye la clave de caché a partir de los datos que determinan la respuesta
+
+        Args:
+            namespace: Tipo de operación (p. ej. "chat" o "bibliography")
+            key_data: Parámetros de la petición que afectan a la respuesta
+
+        Returns:
+            str: Clave de la forma "ai:{namespace}:{sha256}"
+        """
+        payload = orjson.dumps(
+            key_data,
+            default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+        digest = hashlib.sha256(payload).hexdigest()
+        return f"ai:{namespace}:{digest}"
+
+    async def get(self, namespace: str, key_data: Dict[str, Any]) -> Optional[Any]:
+        """
+        Obtiene una respuesta cacheada
+
+        Args:
+            namespace: Tipo de operación
+            key_data: Parámetros de la petición que afectan a la respuesta
+
+        Returns:
+            Optional[Any]: Respuesta cacheada o None si no existe
+        """
+        value = await cache_get(self.build_key(namespace, key_data))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        logger.info(
+            "ai_cache.%s namespace=%s hits=%d misses=%d",
+            "hit" if value is not None else "miss",
+            namespace,
+            self.hits,
+            self.misses,
+        )
+        return value
+
+    async def set(
+        self,
+        namespace: str,
+        key_data: Dict[str, Any],
+        value: Any,
+        ttl: Optional[int] = None,
+    ) -> None:
+        """
+        Guarda una respuesta en la caché
+
+        Args:
+            namespace: Tipo de operación
+            key_data: Parámetros de la petición que afectan a la respuesta
+            value: Respuesta serializable a JSON
+            ttl: Tiempo de vida en segundos (por defecto AI_CACHE_TTL)
+        """
+        await cache_set(
+            self.build_key(namespace, key_data),
+            value,
+            ttl if ttl is not None else settings.AI_CACHE_TTL,
+        )
+
+
+# Instancia global de la caché de IA
+ai_cache = AICache()
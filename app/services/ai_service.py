@@ -1,7 +1,9 @@
+import asyncio
 import json
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 
+import httpx
 from google import genai
 from google.genai import types
 
@@ -48,8 +50,21 @@ class AIService:
                 "GOOGLE_AI_API_KEY no está configurada en las variables de entorno"
             )
 
-        # Inicializar el cliente de Gemini con la nueva API
-        self.client = genai.Client(api_key=settings.GOOGLE_AI_API_KEY)
+        # Inicializar el cliente de Gemini con la nueva API. El cliente (y su pool
+        # httpx) es único por proceso; se amplía el keep-alive (20 por defecto en
+        # httpx) para que las llamadas concurrentes reutilicen conexiones TLS
+        # en lugar de abrir y cerrar una por petición
+        self.client = genai.Client(
+            api_key=settings.GOOGLE_AI_API_KEY,
+            http_options=types.HttpOptions(
+                async_client_args={
+                    "limits": httpx.Limits(
+                        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                    )
+                }
+            ),
+        )
 
         # Configuración de seguridad usando la nueva API
         self.safety_settings = [
@@ -71,6 +86,10 @@ class AIService:
             ),
         ]
 
+        # Búsquedas bibliográficas en curso, indexadas por sus parámetros, para que
+        # las peticiones idénticas simultáneas compartan una sola llamada al modelo
+        self._bibliography_inflight: dict[tuple[Any, ...], asyncio.Task] = {}
+
         logger.info("AIService inicializado correctamente con google-genai")
 
     def _get_config(
@@ -137,6 +156,59 @@ class AIService:
                 f"Error al inicializar la configuración de IA: {str(e)}"
             )
 
+    def _build_chat_request(
+        self,
+        message: str,
+        history: list[dict[str, str]],
+        project_context: str | None,
+        plan: UserPlan,
+    ) -> tuple[str, list[str], types.GenerateContentConfig]:
+        """
+        Construye el modelo, el contenido y la configuración de una petición de chat.
+
+        Args:
+            message: El mensaje del usuario
+            history: Historial de mensajes previos
+            project_context: Contexto del proyecto formateado
+            plan: Plan del usuario
+
+        Returns:
+            tuple: (nombre del modelo, contenidos, configuración de generación)
+
+        Raises:
+            ModelNotAvailableError: Si el chat no está disponible para el plan
+        """
+        model_name, config = self._get_config(AIFeature.CHAT, plan)
+
+        # Formatear el prompt del sistema con el contexto del proyecto
+        system_prompt = CHAT_SYSTEM_PROMPT.format(
+            project_context=project_context
+            or "No hay información específica del proyecto disponible."
+        )
+
+        # Construir el contenido con historial y mensaje actual
+        contents = []
+
+        # Agregar historial formateado
+        for msg in history:
+            contents.append(msg.get("content", ""))
+
+        # Agregar mensaje actual
+        contents.append(message)
+
+        return (
+            model_name,
+            contents,
+            types.GenerateContentConfig(
+                temperature=config.temperature,
+                top_p=config.top_p,
+                top_k=config.top_k,
+                max_output_tokens=config.max_output_tokens,
+                safety_settings=config.safety_settings,
+                system_instruction=system_prompt,
+            ),
+        )
+
     async def chat(
         self,
         message: str,
@@ -160,36 +232,15 @@ class AIService:
             AIServiceError: Si hay un error en la comunicación con la API
         """
         try:
-            model_name, config = self._get_config(AIFeature.CHAT, plan)
-
-            # Formatear el prompt del sistema con el contexto del proyecto
-            system_prompt = CHAT_SYSTEM_PROMPT.format(
-                project_context=project_context
-                or "No hay información específica del proyecto disponible."
+            model_name, contents, generation_config = self._build_chat_request(
+                message, history, project_context, plan
             )
 
-            # Construir el contenido con historial y mensaje actual
-            contents = []
-
-            # Agregar historial formateado
-            for msg in history:
-                contents.append(msg.get("content", ""))
-
-            # Agregar mensaje actual
-            contents.append(message)
-
             # Generar respuesta usando system_instruction
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=model_name,
                 contents=contents,
-                config=types.GenerateContentConfig(
-                    temperature=config.temperature,
-                    top_p=config.top_p,
-                    top_k=config.top_k,
-                    max_output_tokens=config.max_output_tokens,
-                    safety_settings=config.safety_settings,
-                    system_instruction=system_prompt,
-                ),
+                config=generation_config,
             )
 
             logger.info(f"Chat completado exitosamente con {model_name}")
@@ -205,6 +256,55 @@ class AIService:
             logger.error(f"Error en chat: {str(e)}")
             raise AIServiceError(f"Error al procesar la conversación: {str(e)}")
 
+    async def chat_stream(
+        self,
+        message: str,
+        history: list[dict[str, str]],
+        project_context: str | None = None,
+        plan: UserPlan = UserPlan.PROFESIONAL,
+    ) -> tuple[AsyncIterator[str], str]:
+        """
+        Igual que `chat`, pero devuelve la respuesta en fragmentos a medida que el
+        modelo los genera.
+
+        La disponibilidad del modelo se valida antes de devolver el iterador, de
+        modo que los errores de plan se detectan antes de empezar a transmitir.
+
+        Args:
+            message: El mensaje del usuario
+            history: Historial de mensajes previos
+            project_context: Contexto del proyecto formateado
+            plan: Plan del usuario (por defecto PROFESIONAL)
+
+        Returns:
+            tuple[AsyncIterator[str], str]: (fragmentos de texto, nombre del modelo)
+
+        Raises:
+            ModelNotAvailableError: Si el chat no está disponible para el plan
+            AIServiceError: Si hay un error en la comunicación con la API
+        """
+        model_name, contents, generation_config = self._build_chat_request(
+            message, history, project_context, plan
+        )
+
+        async def _deltas() -> AsyncIterator[str]:
+            try:
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=model_name,
+                    contents=contents,
+                    config=generation_config,
+                )
+                async for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
+            except Exception as e:
+                logger.error(f"Error en chat (streaming): {str(e)}")
+                raise AIServiceError(f"Error al procesar la conversación: {str(e)}")
+
+            logger.info(f"Chat (streaming) completado exitosamente con {model_name}")
+
+        return _deltas(), model_name
+
     async def suggest_text(
         self,
         text: str,
@@ -252,7 +352,7 @@ class AIService:
             # Agregar el texto actual al final
             prompt += f"\n\nTEXTO DONDE CONTINUAR:\n{text}\n\nTU SUGERENCIA:"
 
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=model_name,
                 contents=prompt,
                 config=config,
@@ -311,7 +411,7 @@ class AIService:
                 citation_data=citation_json,
             )
 
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=model_name,
                 contents=prompt,
                 config=config,
@@ -341,6 +441,9 @@ class AIService:
         """
         Busca fuentes bibliográficas relevantes usando Grounding con Google Search.
 
+        Si ya hay en curso una búsqueda con los mismos parámetros, espera su
+        resultado en lugar de lanzar otra llamada al modelo.
+
         Args:
             query: Consulta de búsqueda
             max_results: Número máximo de resultados
@@ -354,6 +457,38 @@ class AIService:
         Raises:
             AIServiceError: Si hay un error en la comunicación con la API
         """
+        key = (query, max_results, plan, project_context, search_context)
+        task = self._bibliography_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._search_bibliography(
+                    query, max_results, plan, project_context, search_context
+                )
+            )
+            self._bibliography_inflight[key] = task
+            task.add_done_callback(
+                lambda done: self._bibliography_inflight.pop(key, None)
+            )
+        else:
+            logger.info("Reutilizando búsqueda bibliográfica en curso")
+
+        # shield: si un cliente cancela, la búsqueda sigue para los demás
+        sources, model_name = await asyncio.shield(task)
+        # Cada petición recibe su propia lista (el endpoint no debe compartirla)
+        copies = [dict(source) for source in sources if isinstance(source, dict)]
+        return copies, model_name
+
+    async def _search_bibliography(
+        self,
+        query: str,
+        max_results: int,
+        plan: UserPlan,
+        project_context: str | None,
+        search_context: str | None,
+    ) -> tuple[list[dict[str, Any]], str]:
+        """
+        Realiza la búsqueda bibliográfica contra el modelo (ver search_bibliography)
+        """
         try:
             # ACTIVAR GROUNDING para búsqueda bibliográfica
             model_name, config = self._get_config(
@@ -384,7 +519,7 @@ class AIService:
             FUENTES EN ESPAÑOL ENCONTRADAS (JSON):"""
 
             # Generar contenido con Grounding habilitado
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=model_name,
                 contents=prompt,
                 config=config,
@@ -520,7 +655,10 @@ class AIService:
             if not isinstance(sources, list):
                 raise ValueError("La respuesta no es una lista válida")
 
-            return sources[:max_results]
+            # Descartar los elementos que no son objetos (p. ej. ["a", 1])
+            return [source for source in sources if isinstance(source, dict)][
+                :max_results
+            ]
 
         except (json.JSONDecodeError, ValueError) as e:
             logger.warning(
@@ -1,22 +1,35 @@
+import logging
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.attachment import Attachment
+from app.database import SessionLocal
+from app.models.attachment import Attachment, FileType
 from app.repositories.attachment_repository import AttachmentRepository
 from app.repositories.phase_repository import PhaseRepository
 from app.repositories.project_repository import ProjectRepository
 from app.repositories.task_repository import TaskRepository
 from app.schemas.attachment import AttachmentCreate, AttachmentUpdate
 from app.services.base import BaseService
+from app.services.document_extraction_service import document_extraction_service
 from app.utils.file_utils import FileUtils, FileValidationError
 
+logger = logging.getLogger(__name__)
+
 
 class AttachmentService(BaseService[Attachment, AttachmentCreate, AttachmentUpdate]):
     """Servicio para gestión de adjuntos con validaciones de negocio"""
 
+    # Nombre de la entidad padre y destino del mensaje de permisos
+    _PARENT_NAMES = {
+        "project": ("Proyecto", "este proyecto"),
+        "phase": ("Fase", "esta fase"),
+        "task": ("Tarea", "esta tarea"),
+    }
+
     def __init__(self):
         self.attachment_repository = AttachmentRepository()
         self.project_repository = ProjectRepository()
@@ -117,11 +130,11 @@ class AttachmentService(BaseService[Attachment, AttachmentCreate, AttachmentUpda
             db.refresh(attachment)
             return attachment
 
-        except Exception as e:
+        except Exception:
             # Si falla la creación en BD, eliminar el archivo
             FileUtils.delete_file(file_path)
             db.rollback()
-            print(f"Error al crear el registro del adjunto: {str(e)}")
+            logger.exception("Error al crear el registro del adjunto")
             raise HTTPException(
                 status_code=500,
                 detail="Error al crear el registro del adjunto",
@@ -156,6 +169,75 @@ class AttachmentService(BaseService[Attachment, AttachmentCreate, AttachmentUpda
             db, parent_id, parent_type
         )
 
+    async def aget_attachment_by_parent(
+        self,
+        db: AsyncSession,
+        parent_type: str,
+        parent_id: int,
+        user_id: int,
+    ) -> Optional[Attachment]:
+        """
+        Obtener el adjunto de una entidad padre usando una sesión asíncrona
+
+        La existencia del padre, el propietario y el adjunto se resuelven en
+        una sola consulta en lugar de una por nivel (tarea, fase, proyecto).
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            parent_type: Tipo de padre ('project', 'phase', 'task')
+            parent_id: ID del padre
+            user_id: ID del usuario
+
+        Returns:
+            Optional[Attachment]: El adjunto o None si no existe
+
+        Raises:
+            HTTPException: Si hay errores de validación o permisos
+        """
+        if parent_type not in self._PARENT_NAMES:
+            raise HTTPException(
+                status_code=400,
+                detail="Tipo de entidad padre no válido. Use: 'project', 'phase' o 'task'",
+            )
+
+        entity_name, permission_target = self._PARENT_NAMES[parent_type]
+        row = await self.attachment_repository.aget_by_parent_with_owner(
+            db, parent_type, parent_id
+        )
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"{entity_name} no encontrado")
+
+        attachment, owner_id = row
+        if owner_id != user_id:
+            raise HTTPException(
+                status_code=403,
+                detail=f"No tiene permisos para acceder a {permission_target}",
+            )
+
+        return attachment
+
+    def get_text_preview(
+        self, db: Session, attachment_id: int, max_chars: int
+    ) -> Optional[str]:
+        """
+        Obtener la vista previa del texto precalculado de un adjunto
+
+        Args:
+            db: Sesión de base de datos
+            attachment_id: ID del adjunto
+            max_chars: Número máximo de caracteres de la vista previa
+
+        Returns:
+            Optional[str]: Vista previa o None si el texto no está precalculado
+        """
+        # Un carácter de más para que build_preview sepa si debe añadir "..."
+        prefix = self.attachment_repository.get_text_content_prefix(
+            db, attachment_id, max_chars + 1
+        )
+        if prefix is None:
+            return None
+        return document_extraction_service.build_preview(prefix, max_chars=max_chars)
+
     def update_attachment(
         self,
         db: Session,
@@ -305,6 +387,86 @@ class AttachmentService(BaseService[Attachment, AttachmentCreate, AttachmentUpda
             db.rollback()
             raise e
 
+    def extract_and_store_content(self, attachment_id: int) -> None:
+        """
+        Extraer el contenido de un .docx y guardarlo en el adjunto.
+
+        Pensado para ejecutarse como tarea en segundo plano tras subir o editar
+        el documento, por lo que abre su propia sesión y no propaga errores.
+
+        Args:
+            attachment_id: ID del adjunto
+        """
+        with SessionLocal() as db:
+            attachment = self.attachment_repository.get(db, attachment_id)
+            if not attachment or attachment.file_type != FileType.DOCX:
+                return
+
+            try:
+                extraction = document_extraction_service.extract_all(
+                    attachment.file_path  # type: ignore
+                )
+            except Exception as e:
+                logger.warning(
+                    "No se pudo extraer el contenido del adjunto %s: %s",
+                    attachment_id,
+                    e,
+                )
+                return
+
+            self._apply_extracted_content(attachment, extraction)
+            db.commit()
+
+    def save_extracted_content(
+        self,
+        attachment_id: int,
+        extraction: Dict[str, Any],
+        file_signature: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """
+        Guardar en el adjunto un contenido ya extraído (tarea en segundo plano)
+
+        No se guarda si el archivo cambió desde la extracción ni si el adjunto
+        ya tiene contenido: una edición concurrente (PUT /content) limpia las
+        columnas y las regenera, y la extracción previa no debe pisarla.
+
+        Args:
+            attachment_id: ID del adjunto
+            extraction: Resultado de document_extraction_service.extract_all
+            file_signature: Firma (mtime en ns, tamaño) del archivo extraído
+        """
+        with SessionLocal() as db:
+            attachment = self.attachment_repository.get(db, attachment_id)
+            if not attachment:
+                return
+
+            if (
+                file_signature is not None
+                and FileUtils.file_signature(str(attachment.file_path))
+                != file_signature
+            ):
+                return
+
+            if self.attachment_repository.fill_extracted_content(
+                db, attachment_id, extraction
+            ):
+                db.commit()
+
+    def _apply_extracted_content(
+        self, attachment: Attachment, extraction: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Asignar (o limpiar con None) las columnas de contenido precalculado
+
+        Args:
+            attachment: Adjunto a actualizar
+            extraction: Resultado de extract_all o None para invalidar
+        """
+        extraction = extraction or {}
+        attachment.html_content = extraction.get("html")  # type: ignore
+        attachment.pages_json = extraction.get("pages")  # type: ignore
+        attachment.text_content = extraction.get("text")  # type: ignore
+
     def _validate_parent_entity(
         self, db: Session, parent_type: str, parent_id: int, user_id: int
     ) -> None:
@@ -428,10 +590,8 @@ class AttachmentService(BaseService[Attachment, AttachmentCreate, AttachmentUpda
             # Crear directorios si no existen
             Path(file_path).parent.mkdir(parents=True, exist_ok=True)
 
-            # Guardar el archivo
-            with open(file_path, "wb") as buffer:
-                file.file.seek(0)  # Asegurar que estamos al inicio del archivo
-                buffer.write(file.file.read())
+            # Guardar el archivo por bloques, sin leerlo entero en memoria
+            FileUtils.save_upload(file, file_path)
         except Exception as e:
             raise Exception(f"Error al guardar archivo: {str(e)}")
 
@@ -2,21 +2,95 @@
 Servicio para extracción de contenido de documentos .docx a HTML
 Compatible con TipTap editor
 """
+import hashlib
+import importlib.util
+import io
+import os
 import re
+import threading
 from pathlib import Path
-from typing import List, Optional
-
-try:
-    from docx import Document
-    from docx.table import Table
-    from docx.text.paragraph import Paragraph
-except ImportError:
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import anyio
+from cachetools import LRUCache
+
+if importlib.util.find_spec("docx") is None:
     raise ImportError(
         "python-docx no está instalado. " "Ejecuta: pip install python-docx"
     )
 
 from fastapi import HTTPException
 
+if TYPE_CHECKING:
+    from docx.document import Document as DocxDocument
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+
+def Document(docx: Union[str, IO[bytes], None] = None) -> "DocxDocument":
+    """
+    Abre un documento con python-docx, importándolo solo en el primer uso para
+    no cargarlo al arrancar la aplicación
+
+    Args:
+        docx: Ruta o stream binario del archivo .docx
+
+    Returns:
+        DocxDocument: Documento de python-docx
+    """
+    from docx import Document as open_document
+
+    return open_document(docx)
+
+
+# Expresiones precompiladas usadas por elemento durante la paginación
+_TAG_RE = re.compile(r"<[^>]+>")
+_LIST_TYPE_RE = re.compile(r"data-list-type='(\w+)'")
+_LIST_TYPE_ATTR_RE = re.compile(r"\s*data-list-type='[^']*'")
+
+# Vistas previas ya calculadas, indexadas por la huella del archivo. Se usa desde
+# varios hilos del threadpool, por lo que el acceso va protegido con un lock.
+_PREVIEW_CACHE: "LRUCache[Tuple[Any, ...], str]" = LRUCache(maxsize=512)
+_PREVIEW_CACHE_LOCK = threading.Lock()
+
+# Bytes iniciales del archivo que se incluyen en la huella
+_FINGERPRINT_BYTES = 65536
+
+
+def _file_fingerprint(file_path: str) -> Tuple[Any, ...]:
+    """
+    Calcula una huella barata del archivo sin parsearlo
+
+    Args:
+        file_path: Ruta al archivo
+
+    Returns:
+        Tuple[Any, ...]: (ruta, mtime en ns, tamaño, SHA-1 de los primeros 64 KB)
+
+    Raises:
+        OSError: Si el archivo no existe o no se puede leer
+    """
+    with open(file_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        head = f.read(_FINGERPRINT_BYTES)
+    return (
+        file_path,
+        stat.st_mtime_ns,
+        stat.st_size,
+        hashlib.sha1(head, usedforsecurity=False).hexdigest(),
+    )
+
 
 class DocumentExtractionService:
     """Servicio para extraer contenido de documentos y convertirlo a HTML"""
@@ -100,30 +174,211 @@ class DocumentExtractionService:
             )
 
     @staticmethod
-    def _convert_document_to_html(document: Document) -> str:
+    def extract_docx_to_pages_iter(file_path: str) -> Iterator[str]:
         """
-        Convierte un objeto Document de python-docx a HTML
+        Abre un archivo .docx y devuelve un iterador que genera sus páginas HTML
+        una a una, sin mantener todas en memoria
+
+        La validación y la apertura del documento ocurren al llamar al método,
+        de modo que los errores se producen antes de empezar a iterar.
+
+        Args:
+            file_path: Ruta al archivo .docx
+
+        Returns:
+            Iterator[str]: Iterador de páginas HTML
+
+        Raises:
+            HTTPException: Si el archivo no existe o no se puede leer
+        """
+        path = Path(file_path)
+
+        if not path.exists():
+            raise HTTPException(
+                status_code=404, detail=f"Archivo no encontrado: {file_path}"
+            )
+
+        if not path.suffix.lower() == ".docx":
+            raise HTTPException(
+                status_code=400, detail="Solo se soportan archivos .docx"
+            )
+
+        try:
+            document = Document(file_path)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error al extraer contenido del documento: {str(e)}",
+            )
+
+        html_parts = (
+            html for html, _ in DocumentExtractionService._iter_body(document)
+        )
+        return DocumentExtractionService._iter_pages(html_parts)
+
+    @staticmethod
+    def extract_all(file_path: str) -> Dict[str, Any]:
+        """
+        Extrae en una sola pasada el HTML completo, las páginas HTML y el texto
+        plano de un archivo .docx
+
+        Args:
+            file_path: Ruta al archivo .docx
+
+        Returns:
+            Dict[str, Any]: {"html": str, "pages": List[str], "text": str}
+
+        Raises:
+            HTTPException: Si el archivo no existe o no se puede leer
+        """
+        path = Path(file_path)
+
+        if not path.exists():
+            raise HTTPException(
+                status_code=404, detail=f"Archivo no encontrado: {file_path}"
+            )
+
+        if not path.suffix.lower() == ".docx":
+            raise HTTPException(
+                status_code=400, detail="Solo se soportan archivos .docx"
+            )
+
+        return DocumentExtractionService._extract_all_from(file_path)
+
+    @staticmethod
+    def extract_all_from_bytes(data: bytes) -> Dict[str, Any]:
+        """
+        Igual que extract_all pero a partir del contenido ya leído del archivo,
+        para no volver a abrirlo en el proceso que hace el parseo
+
+        Args:
+            data: Contenido binario del archivo .docx
+
+        Returns:
+            Dict[str, Any]: {"html": str, "pages": List[str], "text": str}
+
+        Raises:
+            HTTPException: Si el contenido no es un .docx válido
+        """
+        return DocumentExtractionService._extract_all_from(io.BytesIO(data))
+
+    @staticmethod
+    async def read_docx_bytes(file_path: str) -> bytes:
+        """
+        Lee de forma asíncrona el contenido de un archivo .docx
+
+        Args:
+            file_path: Ruta al archivo .docx
+
+        Returns:
+            bytes: Contenido binario del archivo
+
+        Raises:
+            HTTPException: Si el archivo no existe o no es .docx
+        """
+        path = anyio.Path(file_path)
+
+        if not await path.exists():
+            raise HTTPException(
+                status_code=404, detail=f"Archivo no encontrado: {file_path}"
+            )
+
+        if not path.suffix.lower() == ".docx":
+            raise HTTPException(
+                status_code=400, detail="Solo se soportan archivos .docx"
+            )
+
+        return await path.read_bytes()
+
+    @staticmethod
+    def _extract_all_from(source: Union[str, IO[bytes]]) -> Dict[str, Any]:
+        """
+        Abre el documento y genera HTML, páginas y texto en una sola pasada
+
+        Args:
+            source: Ruta o stream binario del archivo .docx
+
+        Returns:
+            Dict[str, Any]: {"html": str, "pages": List[str], "text": str}
+
+        Raises:
+            HTTPException: Si no se puede leer el documento
+        """
+        try:
+            document = Document(source)
+            html_parts, texts = DocumentExtractionService._render_body(document)
+            return {
+                "html": DocumentExtractionService._parts_to_html(html_parts),
+                "pages": DocumentExtractionService._parts_to_pages(html_parts),
+                "text": "\n".join(texts),
+            }
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error al extraer contenido del documento: {str(e)}",
+            )
+
+    @staticmethod
+    def _render_body(document: "DocxDocument") -> Tuple[List[str], List[str]]:
+        """
+        Recorre una sola vez el cuerpo del documento generando el HTML de cada
+        elemento y el texto plano de cada párrafo
 
         Args:
             document: Objeto Document de python-docx
 
         Returns:
-            str: HTML generado
+            Tuple[List[str], List[str]]: (HTML por elemento, texto por párrafo)
         """
         html_parts = []
+        texts = []
+
+        for html, text in DocumentExtractionService._iter_body(document):
+            html_parts.append(html)
+            if text is not None:
+                texts.append(text)
+
+        return html_parts, texts
+
+    @staticmethod
+    def _iter_body(document: "DocxDocument") -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Recorre el cuerpo del documento emitiendo el HTML de cada elemento
+
+        Args:
+            document: Objeto Document de python-docx
+
+        Yields:
+            Tuple[str, Optional[str]]: (HTML del elemento, texto si es un párrafo)
+        """
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
 
         for element in document.element.body:
             # Procesar párrafos
             if element.tag.endswith("p"):
                 para = Paragraph(element, document)
-                html_parts.append(
-                    DocumentExtractionService._paragraph_to_html(para, document)
+                yield (
+                    DocumentExtractionService._paragraph_to_html(para, document),
+                    para.text,
                 )
             # Procesar tablas
             elif element.tag.endswith("tbl"):
                 table = Table(element, document)
-                html_parts.append(DocumentExtractionService._table_to_html(table))
+                yield DocumentExtractionService._table_to_html(table), None
+
+    @staticmethod
+    def _parts_to_html(html_parts: List[str]) -> str:
+        """
+        Une el HTML de los elementos del documento en un único HTML
+
+        Args:
+            html_parts: HTML de cada elemento del cuerpo
 
+        Returns:
+            str: HTML generado
+        """
         # Si no hay contenido, devolver párrafo vacío
         if not html_parts or all(part.strip() == "" for part in html_parts):
             return "<p></p>"
@@ -134,48 +389,45 @@ class DocumentExtractionService:
         return "".join(grouped_html)
 
     @staticmethod
-    def _convert_document_to_pages(document: Document) -> List[str]:
+    def _parts_to_pages(html_parts: List[str]) -> List[str]:
         """
-        Convierte un objeto Document de python-docx a lista de páginas HTML
+        Divide el HTML de los elementos del documento en páginas
 
         Args:
-            document: Objeto Document de python-docx
+            html_parts: HTML de cada elemento del cuerpo
 
         Returns:
             List[str]: Lista de páginas HTML
         """
-        all_elements = []
+        return list(DocumentExtractionService._iter_pages(html_parts))
 
-        # Recolectar todos los elementos HTML
-        for element in document.element.body:
-            # Procesar párrafos
-            if element.tag.endswith("p"):
-                para = Paragraph(element, document)
-                html = DocumentExtractionService._paragraph_to_html(para, document)
-                if html.strip():
-                    all_elements.append(html)
-            # Procesar tablas
-            elif element.tag.endswith("tbl"):
-                table = Table(element, document)
-                html = DocumentExtractionService._table_to_html(table)
-                if html.strip():
-                    all_elements.append(html)
+    @staticmethod
+    def _iter_pages(html_parts: Iterable[str]) -> Iterator[str]:
+        """
+        Divide el HTML de los elementos del documento en páginas, emitiendo cada
+        página en cuanto se completa
 
-        # Si no hay contenido, devolver una página vacía
-        if not all_elements:
-            return ["<p></p>"]
+        Args:
+            html_parts: HTML de cada elemento del cuerpo (puede ser un generador)
+
+        Yields:
+            str: Página HTML
+        """
+        all_elements = (part for part in html_parts if part.strip())
 
         # Agrupar elementos de lista consecutivos
-        grouped_elements = DocumentExtractionService._group_list_items(all_elements)
+        grouped_elements = DocumentExtractionService._iter_group_list_items(
+            all_elements
+        )
 
         # Dividir en páginas
-        pages: List[str] = []
         current_page: List[str] = []
         current_length = 0
+        has_pages = False
 
         for element_html in grouped_elements:
             # Calcular longitud de texto del elemento
-            element_text = re.sub(r"<[^>]+>", "", element_html)
+            element_text = _TAG_RE.sub("", element_html)
             element_length = len(element_text)
 
             # Si agregar este elemento excede el límite, crear nueva página
@@ -184,7 +436,8 @@ class DocumentExtractionService:
                 > DocumentExtractionService.CHARS_PER_PAGE
                 and current_page
             ):
-                pages.append("".join(current_page))
+                yield "".join(current_page)
+                has_pages = True
                 current_page = [element_html]
                 current_length = element_length
             else:
@@ -193,12 +446,43 @@ class DocumentExtractionService:
 
         # Agregar última página
         if current_page:
-            pages.append("".join(current_page))
+            yield "".join(current_page)
+            has_pages = True
+
+        # Si no hay contenido, devolver una página vacía
+        if not has_pages:
+            yield "<p></p>"
+
+    @staticmethod
+    def _convert_document_to_html(document: "DocxDocument") -> str:
+        """
+        Convierte un objeto Document de python-docx a HTML
+
+        Args:
+            document: Objeto Document de python-docx
 
-        return pages if pages else ["<p></p>"]
+        Returns:
+            str: HTML generado
+        """
+        html_parts, _ = DocumentExtractionService._render_body(document)
+        return DocumentExtractionService._parts_to_html(html_parts)
+
+    @staticmethod
+    def _convert_document_to_pages(document: "DocxDocument") -> List[str]:
+        """
+        Convierte un objeto Document de python-docx a lista de páginas HTML
+
+        Args:
+            document: Objeto Document de python-docx
+
+        Returns:
+            List[str]: Lista de páginas HTML
+        """
+        html_parts, _ = DocumentExtractionService._render_body(document)
+        return DocumentExtractionService._parts_to_pages(html_parts)
 
     @staticmethod
-    def _paragraph_to_html(paragraph: Paragraph, document: Document) -> str:
+    def _paragraph_to_html(paragraph: "Paragraph", document: "DocxDocument") -> str:
         """
         Convierte un párrafo de docx a HTML con formato
 
@@ -258,7 +542,7 @@ class DocumentExtractionService:
         return f"<p>{DocumentExtractionService._format_runs(paragraph)}</p>"
 
     @staticmethod
-    def _format_runs(paragraph: Paragraph) -> str:
+    def _format_runs(paragraph: "Paragraph") -> str:
         """
         Procesa los runs de un párrafo aplicando formato en línea
 
@@ -286,7 +570,7 @@ class DocumentExtractionService:
         return "".join(html_text)
 
     @staticmethod
-    def _table_to_html(table: Table) -> str:
+    def _table_to_html(table: "Table") -> str:
         """
         Convierte una tabla de docx a HTML
 
@@ -311,7 +595,7 @@ class DocumentExtractionService:
 
     @staticmethod
     def _detect_list_type(
-        document: Document, num_id: Optional[str], ilvl: Optional[str]
+        document: "DocxDocument", num_id: Optional[str], ilvl: Optional[str]
     ) -> str:
         """
         Detecta si una lista es ordenada (ol) o no ordenada (ul) accediendo al numbering.xml
@@ -396,7 +680,20 @@ class DocumentExtractionService:
         Returns:
             List[str]: Lista de elementos HTML con listas agrupadas
         """
-        grouped = []
+        return list(DocumentExtractionService._iter_group_list_items(html_elements))
+
+    @staticmethod
+    def _iter_group_list_items(html_elements: Iterable[str]) -> Iterator[str]:
+        """
+        Versión perezosa de _group_list_items: emite cada elemento agrupado en
+        cuanto se conoce, sin materializar la lista completa
+
+        Args:
+            html_elements: Elementos HTML (puede ser un generador)
+
+        Yields:
+            str: Elementos HTML con listas agrupadas
+        """
         current_list_items = []
         current_list_type = None
 
@@ -404,18 +701,18 @@ class DocumentExtractionService:
             # Verificar si es un elemento de lista
             if element.startswith("<li"):
                 # Extraer el tipo de lista del atributo data-list-type
-                match = re.search(r"data-list-type='(\w+)'", element)
+                match = _LIST_TYPE_RE.search(element)
                 list_type = match.group(1) if match else "ul"
 
                 # Si cambia el tipo de lista, cerrar la lista anterior
                 if current_list_type is not None and current_list_type != list_type:
                     # Cerrar lista anterior
-                    grouped.append(f"<{current_list_type}>")
+                    yield f"<{current_list_type}>"
                     for item in current_list_items:
                         # Remover el atributo data-list-type antes de agregar
-                        clean_item = re.sub(r"\s*data-list-type='[^']*'", "", item)
-                        grouped.append(clean_item)
-                    grouped.append(f"</{current_list_type}>")
+                        clean_item = _LIST_TYPE_ATTR_RE.sub("", item)
+                        yield clean_item
+                    yield f"</{current_list_type}>"
                     current_list_items = []
 
                 # Agregar item a la lista actual
@@ -425,34 +722,35 @@ class DocumentExtractionService:
                 # No es un elemento de lista
                 # Si había elementos de lista acumulados, cerrar la lista
                 if current_list_items:
-                    grouped.append(f"<{current_list_type}>")
+                    yield f"<{current_list_type}>"
                     for item in current_list_items:
                         # Remover el atributo data-list-type antes de agregar
-                        clean_item = re.sub(r"\s*data-list-type='[^']*'", "", item)
-                        grouped.append(clean_item)
-                    grouped.append(f"</{current_list_type}>")
+                        clean_item = _LIST_TYPE_ATTR_RE.sub("", item)
+                        yield clean_item
+                    yield f"</{current_list_type}>"
                     current_list_items = []
                     current_list_type = None
 
                 # Agregar el elemento normal
-                grouped.append(element)
+                yield element
 
         # Si quedan elementos de lista al final, cerrar la lista
         if current_list_items:
-            grouped.append(f"<{current_list_type}>")
+            yield f"<{current_list_type}>"
             for item in current_list_items:
                 # Remover el atributo data-list-type antes de agregar
-                clean_item = re.sub(r"\s*data-list-type='[^']*'", "", item)
-                grouped.append(clean_item)
-            grouped.append(f"</{current_list_type}>")
-
-        return grouped
+                clean_item = _LIST_TYPE_ATTR_RE.sub("", item)
+                yield clean_item
+            yield f"</{current_list_type}>"
 
     @staticmethod
     def get_document_preview(file_path: str, max_chars: int = 200) -> str:
         """
         Obtiene una vista previa del contenido del documento (texto plano)
 
+        El resultado se guarda en una caché LRU del proceso indexada por la huella
+        del archivo, de modo que un .docx sin cambios no se vuelve a parsear.
+
         Args:
             file_path: Ruta al archivo .docx
             max_chars: Número máximo de caracteres para la vista previa
@@ -461,17 +759,40 @@ class DocumentExtractionService:
             str: Vista previa del documento
         """
         try:
+            key = (_file_fingerprint(file_path), max_chars)
+            with _PREVIEW_CACHE_LOCK:
+                cached = _PREVIEW_CACHE.get(key)
+            if cached is not None:
+                return cached
+
             document = Document(file_path)
             full_text = "\n".join([para.text for para in document.paragraphs])
-
-            if len(full_text) <= max_chars:
-                return full_text
-
-            return full_text[:max_chars] + "..."
+            preview = DocumentExtractionService.build_preview(full_text, max_chars)
 
         except Exception as e:
             return f"Error al obtener vista previa: {str(e)}"
 
+        with _PREVIEW_CACHE_LOCK:
+            _PREVIEW_CACHE[key] = preview
+        return preview
+
+    @staticmethod
+    def build_preview(full_text: str, max_chars: int = 200) -> str:
+        """
+        Recorta el texto plano de un documento para usarlo como vista previa
+
+        Args:
+            full_text: Texto plano completo del documento
+            max_chars: Número máximo de caracteres para la vista previa
+
+        Returns:
+            str: Vista previa del documento
+        """
+        if len(full_text) <= max_chars:
+            return full_text
+
+        return full_text[:max_chars] + "..."
+
 
 # Instancia del servicio
 document_extraction_service = DocumentExtractionService()
@@ -13,8 +13,6 @@ if importlib.util.find_spec("docx") is None or importlib.util.find_spec("lxml")
         "Ejecuta: pip install python-docx lxml"
     )
 
-import lxml.html
-from docx import Document
 from fastapi import HTTPException
 
 
@@ -30,6 +28,10 @@ class DocumentGenerationService:
             pages: Lista de strings HTML
             output_path: Ruta de destino para guardar el .docx
         """
+        # Importación diferida: python-docx y lxml solo se cargan al generar
+        import lxml.html
+        from docx import Document
+
         try:
             document = Document()
 
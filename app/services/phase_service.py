@@ -1,3 +1,4 @@
+import logging
 from typing import List
 
 from fastapi import HTTPException, status
@@ -10,6 +11,8 @@ from app.repositories.project_repository import project_repository
 from app.schemas.phase import PhaseCreate, PhaseUpdate
 from app.services.base import BaseService
 
+logger = logging.getLogger(__name__)
+
 
 class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
     """Servicio para gestión de fases"""
@@ -32,59 +35,51 @@ class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
         Raises:
             HTTPException: Si hay error en la validación o creación
         """
-        try:
-            # Verificar que el proyecto existe y pertenece al usuario
-            project = project_repository.get_project_by_owner_and_id(
-                db=db, project_id=phase_in.project_id, owner_id=owner_id
+        # Verificar que el proyecto existe y pertenece al usuario
+        project = project_repository.get_project_by_owner_and_id(
+            db=db, project_id=phase_in.project_id, owner_id=owner_id
+        )
+        if not project:
+            logger.warning(
+                "Proyecto con ID %s no encontrado para el usuario %s",
+                phase_in.project_id,
+                owner_id,
+            )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Proyecto no encontrado o no tienes permisos para acceder a él",
             )
-            if not project:
-                print(
-                    f"Proyecto con ID {phase_in.project_id} no encontrado para el usuario {owner_id}"
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Proyecto no encontrado o no tienes permisos para acceder a él",
-                )
 
-            # Validar que el nombre no esté vacío
-            if not phase_in.name or phase_in.name.strip() == "":
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="El nombre de la fase es requerido y no puede estar vacío",
-                )
+        # Validar que el nombre no esté vacío
+        if not phase_in.name or phase_in.name.strip() == "":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El nombre de la fase es requerido y no puede estar vacío",
+            )
 
-            # Si no se especifica posición, asignar la siguiente disponible
-            if phase_in.position is None:
-                max_position = phase_repository.get_max_position_by_project(
-                    db=db, project_id=phase_in.project_id
-                )
-                phase_in.position = max_position + 1
-            else:
-                # Verificar si ya existe una fase en esa posición
-                existing_phase = phase_repository.get_phase_by_project_and_position(
-                    db=db, project_id=phase_in.project_id, position=phase_in.position
+        # Si no se especifica posición, asignar la siguiente disponible
+        if phase_in.position is None:
+            max_position = phase_repository.get_max_position_by_project(
+                db=db, project_id=phase_in.project_id
+            )
+            phase_in.position = max_position + 1
+        else:
+            # Verificar si ya existe una fase en esa posición
+            existing_phase = phase_repository.get_phase_by_project_and_position(
+                db=db, project_id=phase_in.project_id, position=phase_in.position
+            )
+            if existing_phase:
+                # Mover las fases posteriores una posición hacia adelante
+                phase_repository.update_phases_positions(
+                    db=db,
+                    project_id=phase_in.project_id,
+                    from_position=phase_in.position,
+                    increment=1,
                 )
-                if existing_phase:
-                    # Mover las fases posteriores una posición hacia adelante
-                    phase_repository.update_phases_positions(
-                        db=db,
-                        project_id=phase_in.project_id,
-                        from_position=phase_in.position,
-                        increment=1,
-                    )
 
-            # Crear la fase
-            phase = phase_repository.create_phase(db=db, phase_in=phase_in)
-            return phase
-
-        except HTTPException:
-            raise
-        except Exception as e:
-            print(f"Error al crear la fase: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ha ocurrido un error al crear la fase",
-            )
+        # Crear la fase
+        phase = phase_repository.create_phase(db=db, phase_in=phase_in)
+        return phase
 
     def get_phase_tasks(self, db: Session, phase_id: int) -> List[Task]:
         """
@@ -98,37 +93,27 @@ class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
         Returns:
             Todas las tareas de la fase
         """
-        try:
-            phase = phase_repository.get(db=db, id=phase_id)
-            if not phase:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Fase no encontrada",
-                )
-
-            # Verificar que un usuario solo pueda obtener tareas de fases de sus propios proyectos
-            phase = phase_repository.get_phase_by_project_and_id(
-                db=db,
-                phase_id=phase_id,
-                project_id=phase.project_id,  # type: ignore
+        phase = phase_repository.get(db=db, id=phase_id)
+        if not phase:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fase no encontrada",
             )
-            if not phase:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No tienes permisos para acceder a las tareas de esta fase",
-                )
 
-            return phase_repository.get_phase_tasks(db=db, phase_id=phase_id)
-        except HTTPException:
-            raise
-
-        except Exception as e:
-            print(f"Error al obtener la fase con tareas: {str(e)}")
+        # Verificar que un usuario solo pueda obtener tareas de fases de sus propios proyectos
+        phase = phase_repository.get_phase_by_project_and_id(
+            db=db,
+            phase_id=phase_id,
+            project_id=phase.project_id,  # type: ignore
+        )
+        if not phase:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ha ocurrido un error al obtener la fase con tareas",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No tienes permisos para acceder a las tareas de esta fase",
             )
 
+        return phase_repository.get_phase_tasks(db=db, phase_id=phase_id)
+
     def get_phase_by_id(self, db: Session, phase_id: int, owner_id: int) -> Phase:
         """
         Obtener una fase específica por ID.
@@ -144,37 +129,27 @@ class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
         Raises:
             HTTPException: Si la fase no existe o no pertenece al usuario
         """
-        try:
-            phase = phase_repository.get(db=db, id=phase_id)
-            if not phase:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Fase no encontrada",
-                )
-
-            # Verificar que el proyecto de la fase pertenece al usuario
-            project = project_repository.get_project_by_owner_and_id(
-                db=db,
-                project_id=phase.project_id,  # type: ignore
-                owner_id=owner_id,
+        phase = phase_repository.get(db=db, id=phase_id)
+        if not phase:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fase no encontrada",
             )
-            if not project:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Fase no encontrada o no tienes permisos para acceder a ella",
-                )
-
-            return phase
-        except HTTPException:
-            raise
 
-        except Exception as e:
-            print(f"Error al obtener la fase: {str(e)}")
+        # Verificar que el proyecto de la fase pertenece al usuario
+        project = project_repository.get_project_by_owner_and_id(
+            db=db,
+            project_id=phase.project_id,  # type: ignore
+            owner_id=owner_id,
+        )
+        if not project:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ha ocurrido un error al obtener la fase",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Fase no encontrada o no tienes permisos para acceder a ella",
             )
 
+        return phase
+
     def update_phase(
         self, db: Session, phase_id: int, phase_in: PhaseUpdate, owner_id: int
     ) -> Phase:
@@ -196,73 +171,62 @@ class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
         # Verificar que la fase existe y pertenece al usuario
         phase = self.get_phase_by_id(db=db, phase_id=phase_id, owner_id=owner_id)
 
-        try:
-            # Si se está actualizando la posición
-            if phase_in.position is not None and phase_in.position != phase.position:
-                old_position = phase.position
-                new_position = phase_in.position
+        # Si se está actualizando la posición
+        if phase_in.position is not None and phase_in.position != phase.position:
+            old_position = phase.position
+            new_position = phase_in.position
 
-                # Verificar si ya existe una fase en la nueva posición
-                existing_phase = phase_repository.get_phase_by_project_and_position(
-                    db=db,
-                    project_id=phase.project_id,  # type: ignore
-                    position=new_position,
-                )
+            # Verificar si ya existe una fase en la nueva posición
+            existing_phase = phase_repository.get_phase_by_project_and_position(
+                db=db,
+                project_id=phase.project_id,  # type: ignore
+                position=new_position,
+            )
 
-                if existing_phase and existing_phase.id != phase.id:  # type: ignore
-                    if new_position < old_position:  # type: ignore
-                        # Mover hacia arriba: incrementar posiciones entre new_position y old_position-1
-                        phase_repository.update_phases_positions(
-                            db=db,
-                            project_id=phase.project_id,  # type: ignore
-                            from_position=new_position,
-                            increment=1,
-                        )
-                        # Actualizar posiciones hasta la anterior posición de la fase actual
-                        phases_to_update = (
-                            db.query(Phase)
-                            .filter(
-                                Phase.project_id == phase.project_id,
-                                Phase.position >= new_position,
-                                Phase.position < old_position,
-                                Phase.id != phase.id,
-                            )
-                            .all()
+            if existing_phase and existing_phase.id != phase.id:  # type: ignore
+                if new_position < old_position:  # type: ignore
+                    # Mover hacia arriba: incrementar posiciones entre new_position y old_position-1
+                    phase_repository.update_phases_positions(
+                        db=db,
+                        project_id=phase.project_id,  # type: ignore
+                        from_position=new_position,
+                        increment=1,
+                    )
+                    # Actualizar posiciones hasta la anterior posición de la fase actual
+                    phases_to_update = (
+                        db.query(Phase)
+                        .filter(
+                            Phase.project_id == phase.project_id,
+                            Phase.position >= new_position,
+                            Phase.position < old_position,
+                            Phase.id != phase.id,
                         )
-                        for p in phases_to_update:
-                            p.position += 1  # type: ignore
-                    else:
-                        # Mover hacia abajo: decrementar posiciones entre old_position+1 y new_position
-                        phases_to_update = (
-                            db.query(Phase)
-                            .filter(
-                                Phase.project_id == phase.project_id,
-                                Phase.position > old_position,
-                                Phase.position <= new_position,
-                                Phase.id != phase.id,
-                            )
-                            .all()
+                        .all()
+                    )
+                    for p in phases_to_update:
+                        p.position += 1  # type: ignore
+                else:
+                    # Mover hacia abajo: decrementar posiciones entre old_position+1 y new_position
+                    phases_to_update = (
+                        db.query(Phase)
+                        .filter(
+                            Phase.project_id == phase.project_id,
+                            Phase.position > old_position,
+                            Phase.position <= new_position,
+                            Phase.id != phase.id,
                         )
-                        for p in phases_to_update:
-                            p.position -= 1  # type: ignore
-
-                    db.flush()  # Aplicar cambios antes de actualizar la fase actual
+                        .all()
+                    )
+                    for p in phases_to_update:
+                        p.position -= 1  # type: ignore
 
-            # Actualizar la fase
-            updated_phase = phase_repository.update_phase(
-                db=db, phase=phase, phase_in=phase_in
-            )
-            return updated_phase
+                db.flush()  # Aplicar cambios antes de actualizar la fase actual
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            db.rollback()
-            print(f"Error al actualizar la fase: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ha ocurrido un error al actualizar la fase",
-            )
+        # Actualizar la fase
+        updated_phase = phase_repository.update_phase(
+            db=db, phase=phase, phase_in=phase_in
+        )
+        return updated_phase
 
     def delete_phase(self, db: Session, phase_id: int, owner_id: int) -> bool:
         """
@@ -282,18 +246,9 @@ class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
         # Verificar que la fase existe y pertenece al usuario
         phase = self.get_phase_by_id(db=db, phase_id=phase_id, owner_id=owner_id)
 
-        try:
-            # Eliminar la fase y actualizar posiciones
-            phase_repository.delete_phase_and_update_positions(db=db, phase=phase)
-            return True
-
-        except Exception as e:
-            db.rollback()
-            print(f"Error al eliminar la fase: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ha ocurrido un error al eliminar la fase",
-            )
+        # Eliminar la fase y actualizar posiciones
+        phase_repository.delete_phase_and_update_positions(db=db, phase=phase)
+        return True
 
     def reorder_phases(
         self, db: Session, project_id: int, phase_orders: List[dict], owner_id: int
@@ -313,53 +268,40 @@ class PhaseService(BaseService[Phase, PhaseCreate, PhaseUpdate]):
         Raises:
             HTTPException: Si hay error en la validación o reordenamiento
         """
-        try:
-            # Verificar que el proyecto existe y pertenece al usuario
-            project = project_repository.get_project_by_owner_and_id(
-                db=db, project_id=project_id, owner_id=owner_id
+        # Verificar que el proyecto existe y pertenece al usuario
+        if not project_repository.is_owned_by(
+            db=db, project_id=project_id, owner_id=owner_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Proyecto no encontrado o no tienes permisos para acceder a él",
             )
-            if not project:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Proyecto no encontrado o no tienes permisos para acceder a él",
-                )
 
-            # Obtener todas las fases del proyecto
-            phases = phase_repository.get_phases_by_project(
-                db=db, project_id=project_id
+        # Actualizar todas las posiciones en una sola sentencia UPDATE
+        positions = {order.get("id"): order.get("position") for order in phase_orders}
+        if positions:
+            updated = phase_repository.update_positions(
+                db=db, project_id=project_id, positions=positions  # type: ignore
             )
-            phase_dict = {phase.id: phase for phase in phases}
-
-            # Validar que todas las fases en phase_orders existen
-            for order in phase_orders:
-                phase_id = order.get("id")
-                if phase_id not in phase_dict:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Fase con ID {phase_id} no encontrada en el proyecto",
+            if updated != len(positions):
+                db.rollback()
+                # Solo ante un fallo se averigua qué fase no pertenece al proyecto
+                phase_ids = {
+                    phase.id
+                    for phase in phase_repository.get_phases_by_project(
+                        db=db, project_id=project_id
                     )
+                }
+                phase_id = next(pid for pid in positions if pid not in phase_ids)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Fase con ID {phase_id} no encontrada en el proyecto",
+                )
 
-            # Actualizar las posiciones
-            for order in phase_orders:
-                phase_id = order.get("id")
-                new_position = order.get("position")
-                phase = phase_dict[phase_id]  # type: ignore
-                phase.position = new_position  # type: ignore
-
-            db.commit()
-
-            # Retornar las fases ordenadas
-            return phase_repository.get_phases_by_project(db=db, project_id=project_id)
+        db.commit()
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            db.rollback()
-            print(f"Error al reordenar las fases: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Ha ocurrido un error al reordenar las fases",
-            )
+        # Retornar las fases ordenadas
+        return phase_repository.get_phases_by_project(db=db, project_id=project_id)
 
 
 # Instancia global del servicio
@@ -0,0 +1,128 @@
+"""
+Caché en Redis de la respuesta de un proyecto con sus fases
+"""
+from typing import Any, Dict, Optional
+
+from app.core.cache import cache_get, cache_incr, cache_set
+from app.core.config import settings
+
+
+class ProjectPhasesCache:
+    """
+    Caché de GET /proyectos/{id}/phases invalidada al modificar el proyecto o sus fases
+
+    Cada proyecto tiene un contador de versión que los escritores incrementan;
+    las entradas se guardan bajo la versión leída antes de consultar la base de
+    datos. Así, una lectura que cargó datos anteriores a una escritura guarda
+    su entrada bajo una versión ya obsoleta que nadie vuelve a leer. La entrada
+    incluye el propietario, de modo que nunca se sirve a otro usuario.
+    """
+
+    @staticmethod
+    def build_version_key(project_id: int) -> str:
+        """
+        Construye la clave del contador de versión de un proyecto
+
+        Args:
+            project_id: ID del proyecto
+
+        Returns:
+            str: Clave de la forma "project:{id}:phases:v"
+        """
+        return f"project:{project_id}:phases:v"
+
+    @staticmethod
+    def build_key(project_id: int, version: int) -> str:
+        """
+        Construye la clave de caché de una versión de un proyecto
+
+        Args:
+            project_id: ID del proyecto
+            version: Versión del proyecto en la caché
+
+        Returns:
+            str: Clave de la forma "project:{id}:phases:{version}"
+        """
+        return f"project:{project_id}:phases:{version}"
+
+    async def get_version(self, project_id: int) -> int:
+        """
+        Obtiene la versión actual de un proyecto en la caché
+
+        Debe leerse antes de consultar la base de datos y usarse tanto para
+        get como para set.
+
+        Args:
+            project_id: ID del proyecto
+
+        Returns:
+            int: Versión actual (0 si el proyecto nunca se ha modificado)
+        """
+        version = await cache_get(self.build_version_key(project_id))
+        return int(version) if version is not None else 0
+
+    async def get(
+        self, project_id: int, version: int, owner_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la respuesta cacheada si pertenece al usuario
+
+        Args:
+            project_id: ID del proyecto
+            version: Versión leída con get_version
+            owner_id: ID del usuario autenticado
+
+        Returns:
+            Optional[Dict[str, Any]]: Entrada con etag, last_modified y body, o
+            None si no existe o el proyecto no es del usuario
+        """
+        entry = await cache_get(self.build_key(project_id, version))
+        if entry is None or entry.get("owner_id") != owner_id:
+            return None
+        return entry
+
+    async def set(
+        self,
+        project_id: int,
+        version: int,
+        owner_id: int,
+        etag: str,
+        last_modified: str,
+        body: Dict[str, Any],
+    ) -> None:
+        """
+        Guarda la respuesta de un proyecto con sus fases
+
+        Args:
+            project_id: ID del proyecto
+            version: Versión leída con get_version antes de consultar la BD
+            owner_id: ID del propietario del proyecto
+            etag: ETag de la respuesta (sin comillas)
+            last_modified: Valor de la cabecera Last-Modified
+            body: Cuerpo de la respuesta serializable a JSON
+        """
+        await cache_set(
+            self.build_key(project_id, version),
+            {
+                "owner_id": owner_id,
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": body,
+            },
+            settings.PROJECT_PHASES_CACHE_TTL,
+        )
+
+    async def invalidate(self, project_id: int) -> None:
+        """
+        Invalida la respuesta cacheada de un proyecto incrementando su versión
+
+        Las entradas de versiones anteriores dejan de leerse y expiran solas.
+
+        Args:
+            project_id: ID del proyecto modificado
+        """
+        await cache_incr(self.build_version_key(project_id))
+
+
+# Instancia global de la caché de proyectos con fases
+project_phases_cache = ProjectPhasesCache()
@@ -1,6 +1,9 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 from fastapi import HTTPException, status
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.project import Project
@@ -32,27 +35,41 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
         Raises:
             HTTPException: Si hay error en la validación o creación
         """
-        try:
-            # Validar que el nombre no esté vacío
-            if not project_in.name or project_in.name.strip() == "":
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="El nombre del proyecto es requerido y no puede estar vacío",
-                )
-
-            # Crear el proyecto
-            project = project_repository.create_project(
-                db=db, project_in=project_in, owner_id=owner_id
+        # Validar que el nombre no esté vacío
+        if not project_in.name or project_in.name.strip() == "":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El nombre del proyecto es requerido y no puede estar vacío",
             )
-            return project
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al crear el proyecto: {str(e)}",
+        # Crear el proyecto
+        project = project_repository.create_project(
+            db=db, project_in=project_in, owner_id=owner_id
+        )
+        return project
+
+    async def acreate_project(
+        self, db: AsyncSession, project_in: ProjectCreate, owner_id: int
+    ) -> Project:
+        """
+        Crear un nuevo proyecto usando una sesión asíncrona.
+
+        Ejecuta create_project con run_sync: la lógica es la misma y las
+        consultas no bloquean el event loop.
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            project_in: Datos del proyecto a crear
+            owner_id: ID del usuario propietario
+
+        Returns:
+            Proyecto creado
+        """
+        return await db.run_sync(
+            lambda session: self.create_project(
+                session, project_in=project_in, owner_id=owner_id
             )
+        )
 
     def get_user_projects(self, db: Session, owner_id: int) -> List[Project]:
         """
@@ -65,17 +82,8 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
         Returns:
             Lista de proyectos del usuario
         """
-        try:
-            projects = project_repository.get_projects_by_owner(
-                db=db, owner_id=owner_id
-            )
-            return projects
-
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al obtener los proyectos: {str(e)}",
-            )
+        projects = project_repository.get_projects_by_owner(db=db, owner_id=owner_id)
+        return projects
 
     def get_user_project_by_id(
         self, db: Session, project_id: int, owner_id: int
@@ -106,6 +114,84 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
 
         return project
 
+    async def aget_user_projects(
+        self, db: AsyncSession, owner_id: int
+    ) -> List[Project]:
+        """
+        Obtener todos los proyectos de un usuario usando una sesión asíncrona.
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            owner_id: ID del usuario propietario
+
+        Returns:
+            Lista de proyectos del usuario
+        """
+        return await project_repository.aget_projects_by_owner(db=db, owner_id=owner_id)
+
+    def astream_user_projects(
+        self, db: AsyncSession, owner_id: int
+    ) -> AsyncIterator[Project]:
+        """
+        Recorrer los proyectos de un usuario por lotes, sin cargarlos todos.
+
+        Args:
+            db: Sesión asíncrona de base de datos (abierta mientras se itera)
+            owner_id: ID del usuario propietario
+
+        Returns:
+            Iterador asíncrono de proyectos del usuario
+        """
+        return project_repository.astream_projects_by_owner(db=db, owner_id=owner_id)
+
+    async def aget_user_project_by_id(
+        self, db: AsyncSession, project_id: int, owner_id: int
+    ) -> Project:
+        """
+        Obtener un proyecto específico de un usuario usando una sesión asíncrona.
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            project_id: ID del proyecto
+            owner_id: ID del usuario propietario
+
+        Returns:
+            Proyecto encontrado
+
+        Raises:
+            HTTPException: Si el proyecto no existe o no pertenece al usuario
+        """
+        project = await project_repository.aget_project_by_owner_and_id(
+            db=db, project_id=project_id, owner_id=owner_id
+        )
+
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Proyecto no encontrado o no tienes permisos para acceder a él",
+            )
+
+        return project
+
+    def get_project_fields_with_owner(
+        self, db: Session, project_id: int, owner_email: str
+    ) -> Optional[Row[Any]]:
+        """
+        Obtener en una sola consulta el usuario y los campos básicos de su proyecto
+
+        Args:
+            db: Sesión de base de datos
+            project_id: ID del proyecto
+            owner_email: Email del usuario autenticado
+
+        Returns:
+            Fila con el usuario (User) y los campos del proyecto (None si el
+            proyecto no existe o no es suyo), o None si el usuario no existe
+        """
+        return project_repository.get_project_fields_with_owner(
+            db=db, project_id=project_id, owner_email=owner_email
+        )
+
     def update_user_project(
         self, db: Session, project_id: int, project_in: ProjectUpdate, owner_id: int
     ) -> Project:
@@ -129,18 +215,36 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
             db=db, project_id=project_id, owner_id=owner_id
         )
 
-        try:
-            # Actualizar el proyecto
-            updated_project = project_repository.update_project(
-                db=db, project=project, project_in=project_in
-            )
-            return updated_project
+        # Actualizar el proyecto
+        updated_project = project_repository.update_project(
+            db=db, project=project, project_in=project_in
+        )
+        return updated_project
+
+    async def aupdate_user_project(
+        self,
+        db: AsyncSession,
+        project_id: int,
+        project_in: ProjectUpdate,
+        owner_id: int,
+    ) -> Project:
+        """
+        Actualizar un proyecto de un usuario usando una sesión asíncrona.
 
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al actualizar el proyecto: {str(e)}",
+        Args:
+            db: Sesión asíncrona de base de datos
+            project_id: ID del proyecto
+            project_in: Datos a actualizar
+            owner_id: ID del usuario propietario
+
+        Returns:
+            Proyecto actualizado
+        """
+        return await db.run_sync(
+            lambda session: self.update_user_project(
+                session, project_id=project_id, project_in=project_in, owner_id=owner_id
             )
+        )
 
     def delete_user_project(self, db: Session, project_id: int, owner_id: int) -> bool:
         """
@@ -162,18 +266,58 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
             db=db, project_id=project_id, owner_id=owner_id
         )
 
-        try:
-            # Eliminar el proyecto
-            db.delete(project)
-            db.commit()
-            return True
+        # Eliminar el proyecto
+        db.delete(project)
+        db.commit()
+        return True
 
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al eliminar el proyecto: {str(e)}",
+    async def adelete_user_project(
+        self, db: AsyncSession, project_id: int, owner_id: int
+    ) -> bool:
+        """
+        Eliminar un proyecto de un usuario usando una sesión asíncrona.
+
+        Args:
+            db: Sesión asíncrona de base de datos
+            project_id: ID del proyecto
+            owner_id: ID del usuario propietario
+
+        Returns:
+            True si se eliminó correctamente
+        """
+        return await db.run_sync(
+            lambda session: self.delete_user_project(
+                session, project_id=project_id, owner_id=owner_id
             )
+        )
+
+    def get_project_phase_positions(
+        self, db: Session, project_id: int, owner_id: int
+    ) -> Optional[Tuple[datetime, List[Tuple[int, int]]]]:
+        """
+        Obtener los datos que determinan el ETag de un proyecto con fases.
+
+        Es una única consulta de columnas: permite responder 304 sin cargar el
+        proyecto ni sus fases.
+
+        Args:
+            db: Sesión de base de datos
+            project_id: ID del proyecto
+            owner_id: ID del usuario propietario
+
+        Returns:
+            (updated_at, [(id, posición), ...]) del proyecto y sus fases, o None
+            si el proyecto no existe o no pertenece al usuario
+        """
+        rows = project_repository.get_phase_positions(
+            db=db, project_id=project_id, owner_id=owner_id
+        )
+        if not rows:
+            return None
+        positions = [
+            (row.phase_id, row.position) for row in rows if row.phase_id is not None
+        ]
+        return rows[0].updated_at, positions
 
     def get_project_with_phases(
         self, db: Session, project_id: int, owner_id: int
@@ -193,36 +337,22 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
             HTTPException: Si el proyecto no existe o no pertenece al usuario
         """
 
-        try:
-            project = project_repository.get(db=db, id=project_id)
-            if not project:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Proyecto no encontrado",
-                )
-
-            # Verificar que el proyecto pertenece al usuario
-            project = project_repository.get_project_by_owner_and_id(
-                db=db, project_id=project_id, owner_id=owner_id
-            )
-            if not project:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Proyecto no encontrado o no tienes permisos para acceder a él",
-                )
-
-            phases = project_repository.get_project_with_phases(
-                db=db, project_id=project_id
-            )
-            return phases
-        except HTTPException:
-            raise
+        project = project_repository.get_project_with_phases(
+            db=db, project_id=project_id, owner_id=owner_id
+        )
+        if project:
+            return project
 
-        except Exception as e:
+        # Solo ante un fallo se distingue si el proyecto existe
+        if not project_repository.get(db=db, id=project_id):
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al obtener las fases del proyecto: {str(e)}",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Proyecto no encontrado",
             )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Proyecto no encontrado o no tienes permisos para acceder a él",
+        )
 
     def search_user_projects_by_name(
         self, db: Session, query: str, owner_id: int
@@ -238,18 +368,10 @@ class ProjectService(BaseService[Project, ProjectCreate, ProjectUpdate]):
         Returns:
             Lista de proyectos que coinciden con la búsqueda
         """
-        try:
-            projects = project_repository.search_projects_by_name(
-                db=db, query=query, owner_id=owner_id
-            )
-            return projects
-
-        except Exception as e:
-            print(f"Error al buscar los proyectos: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error al buscar los proyectos",
-            )
+        projects = project_repository.search_projects_by_name(
+            db=db, query=query, owner_id=owner_id
+        )
+        return projects
 
 
 # Instancia global del servicio
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Any, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.user import User
@@ -40,6 +42,18 @@ class UserService:
         """Obtener un usuario por email"""
         return user_repository.get_by_email(db, email=email)
 
+    def get_user_id_and_status_by_email(
+        self, db: Session, *, email: str
+    ) -> Optional[Row[Any]]:
+        """Obtener el id y el estado de un usuario por email sin cargar la entidad"""
+        return user_repository.get_id_and_status_by_email(db, email=email)
+
+    async def aget_user_id_and_status_by_email(
+        self, db: AsyncSession, *, email: str
+    ) -> Optional[Row[Any]]:
+        """Obtener el id y el estado de un usuario por email (sesión asíncrona)"""
+        return await user_repository.aget_id_and_status_by_email(db, email=email)
+
     def get_user_by_id(self, db: Session, *, user_id: int) -> Optional[User]:
         """Obtener un usuario por ID"""
         return user_repository.get_by_id(db, user_id=user_id)
@@ -94,6 +108,14 @@ class UserService:
         """Autenticar un usuario usando email como identificador"""
         return user_repository.authenticate(db, email=identifier, password=password)
 
+    async def aauthenticate_user_by_identifier(
+        self, db: AsyncSession, *, identifier: str, password: str
+    ) -> Optional[User]:
+        """Autenticar un usuario usando email como identificador (sesión asíncrona)"""
+        return await user_repository.aauthenticate(
+            db, email=identifier, password=password
+        )
+
 
 # Instancia global del servicio
 user_service = UserService()
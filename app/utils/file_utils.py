@@ -1,9 +1,16 @@
+import os
+import shutil
+import tempfile
 import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
+from urllib.parse import quote
 
-from fastapi import UploadFile
+from fastapi import UploadFile, status
+from fastapi.responses import FileResponse, Response
 
+from app.core.config import settings
 from app.models.attachment import FileType
 
 
@@ -26,6 +33,16 @@ class FileUtils:
         ],
     }
     ALLOWED_EXTENSIONS = {FileType.PDF: [".pdf"], FileType.DOCX: [".docx", ".doc"]}
+    # Primeros bytes de cada formato: PDF y contenedor ZIP (DOCX)
+    MAGIC_NUMBERS = {FileType.PDF: b"%PDF-", FileType.DOCX: b"PK\x03\x04"}
+    DOWNLOAD_MEDIA_TYPES = {
+        ".pdf": "application/pdf",
+        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ".doc": "application/msword",
+    }
+    # Descargas privadas: el navegador puede guardarlas pero debe revalidar
+    # con If-None-Match antes de reutilizarlas
+    DOWNLOAD_CACHE_CONTROL = "private, max-age=0, must-revalidate"
 
     @staticmethod
     def generate_unique_filename(original_filename: str) -> str:
@@ -109,6 +126,32 @@ class FileUtils:
                 f"El archivo es demasiado grande. Tamaño máximo: {max_size_mb}MB"
             )
 
+    @staticmethod
+    def validate_file_signature(file: UploadFile) -> FileType:
+        """
+        Validar el tipo de archivo por sus primeros bytes (magic number)
+
+        A diferencia del Content-Type, los bytes no los decide el cliente.
+
+        Args:
+            file: Archivo subido
+
+        Returns:
+            FileType: Tipo de archivo detectado
+
+        Raises:
+            FileValidationError: Si el contenido no es un PDF ni un DOCX
+        """
+        file.file.seek(0)
+        head = file.file.read(8)
+        file.file.seek(0)
+
+        for file_type, magic in FileUtils.MAGIC_NUMBERS.items():
+            if head.startswith(magic):
+                return file_type
+
+        raise FileValidationError("El contenido del archivo no es un PDF ni un DOCX")
+
     @staticmethod
     def create_directory_structure(
         base_path: str, parent_type: str, parent_id: int
@@ -151,6 +194,97 @@ class FileUtils:
         )
         return str(Path(directory) / filename)
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def build_content_disposition(filename: str) -> str:
+        """
+        Construir la cabecera Content-Disposition de una descarga
+
+        Incluye ambos formatos para máxima compatibilidad; filename* es el
+        estándar RFC 5987 para caracteres no-ASCII. El resultado solo depende
+        del nombre, así que se memoriza para descargas repetidas.
+
+        Args:
+            filename: Nombre original con el que se descargará
+
+        Returns:
+            str: Valor de la cabecera Content-Disposition
+        """
+        ascii_filename = filename.encode("ascii", "ignore").decode("ascii")
+        return (
+            f'attachment; filename="{ascii_filename}"; '
+            f"filename*=UTF-8''{quote(filename)}"
+        )
+
+    @staticmethod
+    def build_download_response(
+        file_path: str, filename: str, if_none_match: Optional[str] = None
+    ) -> Response:
+        """
+        Construir la respuesta de descarga de un archivo adjunto
+
+        Un único stat del archivo alimenta Content-Length, Last-Modified y ETag,
+        de modo que FileResponse no vuelve a consultarlo y el navegador puede
+        revalidar con If-None-Match (304). Si DOWNLOAD_ACCEL_REDIRECT_PREFIX está
+        configurado, el cuerpo lo envía nginx mediante X-Accel-Redirect.
+
+        Args:
+            file_path: Ruta del archivo en el sistema
+            filename: Nombre original con el que se descargará
+            if_none_match: Valor de la cabecera If-None-Match de la petición
+
+        Returns:
+            Response: Archivo para descargar, 304 o redirección interna de nginx
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe en el sistema
+        """
+        path = Path(file_path)
+        stat_result = path.stat()
+        media_type = FileUtils.DOWNLOAD_MEDIA_TYPES.get(
+            path.suffix.lower(), "application/octet-stream"
+        )
+
+        content_disposition = FileUtils.build_content_disposition(filename)
+
+        if settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX:
+            return Response(
+                media_type=media_type,
+                headers={
+                    "Content-Disposition": content_disposition,
+                    "X-Accel-Redirect": (
+                        f"{settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX.rstrip('/')}/"
+                        f"{quote(path.as_posix().lstrip('/'))}"
+                    ),
+                },
+            )
+
+        response = FileResponse(
+            path=path,
+            filename=filename,
+            media_type=media_type,
+            headers={
+                "Content-Disposition": content_disposition,
+                "Cache-Control": FileUtils.DOWNLOAD_CACHE_CONTROL,
+            },
+            stat_result=stat_result,
+        )
+        etag = response.headers["etag"]
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in {tag.strip() for tag in if_none_match.split(",")}
+        ):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={
+                    "ETag": etag,
+                    "Last-Modified": response.headers["last-modified"],
+                    "Cache-Control": FileUtils.DOWNLOAD_CACHE_CONTROL,
+                },
+            )
+
+        return response
+
     @staticmethod
     def delete_file(file_path: str) -> bool:
         """
@@ -198,6 +332,116 @@ class FileUtils:
 
         return file.filename or "unknown", file_size, file.content_type
 
+    @staticmethod
+    def _disk_fileno(fileobj: Any) -> Optional[int]:
+        """
+        Obtener el descriptor del archivo subido si su contenido ya está en disco
+
+        Un SpooledTemporaryFile que sigue en memoria devuelve None: pedir su
+        fileno() lo volcaría a disco.
+        """
+        if isinstance(fileobj, tempfile.SpooledTemporaryFile):
+            if not fileobj._rolled:  # type: ignore[attr-defined]
+                return None
+            fileobj = fileobj._file  # type: ignore[attr-defined]
+        try:
+            return fileobj.fileno()
+        except (AttributeError, OSError):
+            return None
+
+    @staticmethod
+    def _copy_in_kernel(src_fd: int, dst_fd: int, size: int) -> bool:
+        """
+        Copiar entre descriptores sin pasar los datos por Python
+
+        Usa copy_file_range (que permite reflink en XFS/btrfs) o, si no existe,
+        sendfile.
+
+        Returns:
+            bool: False si el sistema no admite la copia en el kernel y no se ha
+            escrito nada, para que se use la copia normal
+        """
+        copy_file_range = getattr(os, "copy_file_range", None)
+        if copy_file_range is None and not hasattr(os, "sendfile"):
+            return False
+
+        offset = 0
+        try:
+            while offset < size:
+                if copy_file_range is not None:
+                    copied = copy_file_range(
+                        src_fd, dst_fd, size - offset, offset, offset
+                    )
+                else:
+                    copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            if offset:
+                raise
+            return False
+        return True
+
+    @staticmethod
+    def save_upload(
+        file: UploadFile,
+        file_path: str,
+        chunk_size: int = 1024 * 1024,
+        max_size: Optional[int] = None,
+    ) -> None:
+        """
+        Guardar un archivo subido copiándolo por bloques hasta su destino
+
+        Si el archivo temporal ya está en disco, la copia la hace el kernel
+        (copy_file_range/sendfile). Si no, se copia por bloques sin cargarlo
+        completo en memoria; los bloques de 1 MiB reducen las llamadas al
+        sistema frente al tamaño por defecto de shutil (64 KiB).
+
+        Args:
+            file: Archivo subido
+            file_path: Ruta de destino
+            chunk_size: Tamaño de los bloques de copia en bytes
+            max_size: Tamaño máximo en bytes; None = sin límite
+
+        Raises:
+            FileValidationError: Si el archivo supera max_size (no queda en disco)
+        """
+        file.file.seek(0)  # Asegurar que estamos al inicio del archivo
+
+        src_fd = FileUtils._disk_fileno(file.file)
+        if src_fd is not None:
+            size = os.fstat(src_fd).st_size
+            if max_size is not None and size > max_size:
+                FileUtils._raise_too_large(max_size)
+            with open(file_path, "wb") as buffer:
+                if FileUtils._copy_in_kernel(src_fd, buffer.fileno(), size):
+                    return
+
+        if max_size is None:
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer, chunk_size)
+            return
+
+        total = 0
+        with open(file_path, "wb") as buffer:
+            while chunk := file.file.read(chunk_size):
+                total += len(chunk)
+                if total > max_size:
+                    break
+                buffer.write(chunk)
+
+        if total > max_size:
+            Path(file_path).unlink(missing_ok=True)
+            FileUtils._raise_too_large(max_size)
+
+    @staticmethod
+    def _raise_too_large(max_size: int) -> None:
+        max_size_mb = max_size / (1024 * 1024)
+        raise FileValidationError(
+            f"El archivo es demasiado grande. Tamaño máximo: {max_size_mb}MB"
+        )
+
     @staticmethod
     def ensure_upload_directory() -> None:
         """
@@ -205,3 +449,20 @@ class FileUtils:
         """
         upload_dir = Path("uploads/documents")
         upload_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Obtener la firma (mtime en ns, tamaño) de un archivo para detectar cambios
+
+        Args:
+            file_path: Ruta al archivo
+
+        Returns:
+            Optional[Tuple[int, int]]: Firma del archivo o None si no existe
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
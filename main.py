@@ -1,15 +1,94 @@
-from typing import Dict
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict
 
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.api.api_v1.api import api_router
+from app.api.api_v1.endpoints.bibliography import UPLOAD_DIR as BIBLIOGRAPHY_UPLOAD_DIR
 from app.core.config import settings
+from app.core.executors import shutdown_docx_pool
+from app.database import check_pool_capacity
+
+
+def _route_app_logs_through_uvicorn() -> None:
+    """
+    Registrar los logs del paquete app con los handlers de uvicorn
+
+    uvicorn solo configura sus propios loggers; sin esto los mensajes de
+    logging.getLogger(__name__) de nivel INFO se descartan y los errores salen
+    sin formato por el handler de último recurso.
+    """
+    app_logger = logging.getLogger("app")
+    uvicorn_logger = logging.getLogger("uvicorn.error")
+    if app_logger.handlers or not uvicorn_logger.handlers:
+        return
+    app_logger.handlers = list(uvicorn_logger.handlers)
+    app_logger.setLevel(uvicorn_logger.level)
+    app_logger.propagate = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Acotar el threadpool (endpoints/dependencias síncronas y run_in_threadpool)
+    # al tamaño del pool síncrono de la BD: con más hilos que conexiones, las
+    # peticiones se quedan esperando una conexión libre mientras ocupan un hilo
+    to_thread.current_default_thread_limiter().total_tokens = (
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    )
+    # Bajo uvicorn, enviar los logs de la aplicación a sus mismos handlers
+    _route_app_logs_through_uvicorn()
+    # Comprobar que los pools caben en el límite de conexiones del servidor
+    await to_thread.run_sync(check_pool_capacity)
+    # Crear el directorio de subidas una vez al arrancar, no al importar
+    os.makedirs(BIBLIOGRAPHY_UPLOAD_DIR, exist_ok=True)
+    yield
+    # Liberar los procesos de extracción de documentos al apagar
+    shutdown_docx_pool()
+
 
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
+    # Serializar todas las respuestas con orjson en lugar de json.dumps
+    default_response_class=ORJSONResponse,
 )
 
+# Los logs del paquete app se envían a los handlers de uvicorn al arrancar
+logger = logging.getLogger("app.main")
+
+
+# Registrado antes que CORS para quedar dentro de él: add_middleware coloca el
+# último middleware añadido en la capa más externa, así que los 500 de esta
+# capa también reciben las cabeceras Access-Control-Allow-Origin
+@app.middleware("http")
+async def unhandled_exception_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    Responder con un 500 genérico ante cualquier error no controlado
+
+    Sustituye a los try/except por endpoint que convertían la excepción en un
+    HTTPException con el mensaje interno. La traza se registra aquí y el
+    cliente solo recibe un mensaje genérico.
+    """
+    try:
+        return await call_next(request)
+    except Exception:
+        logger.exception(
+            "Error no controlado en %s %s", request.method, request.url.path
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": "Error interno del servidor"},
+        )
+
+
 # Configurar CORS
 if settings.BACKEND_CORS_ORIGIN:
     app.add_middleware(
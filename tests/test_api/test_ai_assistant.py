@@ -1,11 +1,28 @@
 """Tests para los endpoints del asistente de IA"""
 
-from unittest.mock import patch
+import asyncio
+import io
+import json
+import logging
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from docx import Document
 from fastapi import status
-
+from sqlalchemy import event
+
+from app.api.api_v1.endpoints import ai_assistant
+from app.api.api_v1.endpoints.ai_assistant import (
+    _HISTORY_CACHE,
+    _PROJECT_CONTEXT_CACHE,
+)
+from app.core import dependencies
+from app.core.ai_config import UserPlan
+from app.core.dependencies import get_user_plan
 from app.database import Base
+from app.repositories.bibliography_repository import bibliography_repository
+from app.schemas.conversation import ChatWithHistoryRequest
 from app.services.ai_service import AIServiceError, ModelNotAvailableError
 from tests.test_db_config import client, engine
 
@@ -16,6 +33,8 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    _PROJECT_CONTEXT_CACHE.clear()
+    _HISTORY_CACHE.clear()
 
 
 def create_test_user_and_login():
@@ -143,6 +162,28 @@ class TestSuggestions:
         assert "detail" in data
         assert data["detail"]["error"] == "ai_service_error"
 
+    @patch("app.services.ai_service.ai_service.suggest_text")
+    def test_generate_suggestion_unexpected_errors_throttle_tracebacks(
+        self, mock_suggest_text, caplog, monkeypatch
+    ):
+        """Probar que una ráfaga de errores inesperados no registra cada traceback"""
+        headers, _ = create_test_user_and_login()
+        monkeypatch.setattr(ai_assistant, "_last_traceback_logged", 0.0)
+        mock_suggest_text.side_effect = RuntimeError("fallo inesperado")
+
+        with caplog.at_level(logging.ERROR, logger=ai_assistant.logger.name):
+            for _ in range(3):
+                response = client.post(
+                    "/api/v1/ia/sugerencias",
+                    json={"text": "Test", "document_content": "Test document"},
+                    headers=headers,
+                )
+                assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        records = [r for r in caplog.records if "Error inesperado" in r.getMessage()]
+        assert len(records) == 3
+        assert [bool(r.exc_info) for r in records] == [True, False, False]
+
     def test_generate_suggestion_unauthorized(self):
         """Probar acceso sin autenticación"""
         response = client.post(
@@ -188,6 +229,10 @@ class TestCitations:
         assert "model_used" in data
         assert data["model_used"] == "gemini-1.5-flash"
         mock_format_citation.assert_called_once()
+        citation_data = mock_format_citation.call_args.kwargs["citation_data"]
+        assert citation_data["autores"] == [{"nombre": "John", "apellido": "Smith"}]
+        assert citation_data["editorial"] == "Editorial Académica"
+        assert "project_bibliography" not in citation_data
 
     def test_format_citation_project_not_found(self):
         """Probar formateo de cita con proyecto no encontrado"""
@@ -299,6 +344,78 @@ class TestBibliography:
         assert data["model_used"] == "gemini-1.5-pro"
         assert data["total_found"] == 1
 
+    @patch("app.services.ai_service.ai_service.search_bibliography")
+    def test_search_bibliography_decodes_token_once(self, mock_search_bib):
+        """Probar que el plan y el proyecto comparten el email del token"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+        mock_search_bib.return_value = ([], "gemini-1.5-pro")
+
+        with patch(
+            "app.core.dependencies.verify_token", wraps=dependencies.verify_token
+        ) as mock_verify:
+            response = client.post(
+                f"/api/v1/proyectos/{project_id}/ia/bibliografias",
+                json={"query": "machine learning", "max_results": 5},
+                headers=headers,
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_verify.assert_called_once()
+
+    @patch("app.services.ai_service.ai_service.search_bibliography")
+    def test_search_bibliography_skips_invalid_sources(self, mock_search_bib):
+        """Probar que se descartan solo las fuentes que no cumplen el schema"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+
+        mock_search_bib.return_value = (
+            [
+                {"titulo": "Fuente incompleta", "autores": ["Pérez"]},
+                {"titulo": "Relevancia fuera de rango", "relevancia": 9},
+            ],
+            "gemini-1.5-pro",
+        )
+
+        response = client.post(
+            f"/api/v1/proyectos/{project_id}/ia/bibliografias",
+            json={"query": "metodología", "max_results": 10},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_found"] == 1
+        assert data["sources"][0]["titulo"] == "Fuente incompleta"
+        assert data["sources"][0]["relevancia"] == 3
+
+    @patch("app.services.ai_service.ai_service.search_bibliography")
+    def test_search_bibliography_uses_cached_response(self, mock_search_bib):
+        """Probar que una búsqueda idéntica cacheada no llama al servicio de IA"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+
+        cached_source = {
+            "titulo": "Fuente cacheada",
+            "autores": ["Pérez"],
+            "anio": 2021,
+            "tipo": "articulo",
+            "relevancia": 4,
+        }
+        with patch(
+            "app.api.api_v1.endpoints.ai_assistant.ai_cache.get",
+            new=AsyncMock(return_value=[[cached_source], "gemini-1.5-pro"]),
+        ):
+            response = client.post(
+                f"/api/v1/proyectos/{project_id}/ia/bibliografias",
+                json={"query": "aprendizaje automático", "max_results": 5},
+                headers=headers,
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["sources"][0]["titulo"] == "Fuente cacheada"
+        mock_search_bib.assert_not_called()
+
     def test_search_bibliography_project_not_found(self):
         """Probar búsqueda con proyecto no encontrado"""
         headers, _ = create_test_user_and_login()
@@ -338,6 +455,52 @@ class TestBibliography:
         assert "detail" in data
         assert data["detail"]["error"] == "feature_not_available"
 
+    @patch("app.services.ai_service.ai_service.search_bibliography")
+    def test_search_bibliography_plan_check_skips_full_user_load(self, mock_search_bib):
+        """Probar que la comprobación del plan no carga la entidad User completa"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+        mock_search_bib.return_value = ([], "gemini-1.5-pro")
+
+        with patch.object(
+            dependencies.user_service,
+            "get_user_by_email",
+            wraps=dependencies.user_service.get_user_by_email,
+        ) as mock_full_user:
+            response = client.post(
+                f"/api/v1/proyectos/{project_id}/ia/bibliografias",
+                json={"query": "test query", "max_results": 5},
+                headers=headers,
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_full_user.assert_not_called()
+
+    @patch("app.services.project_service.project_service.get_project_fields_with_owner")
+    @patch("app.services.ai_service.ai_service.search_bibliography")
+    def test_search_bibliography_plan_rejected_before_project_lookup(
+        self, mock_search_bib, mock_get_project
+    ):
+        """Probar que un plan sin bibliografía se rechaza sin consultar el proyecto"""
+        headers, _ = create_test_user_and_login()
+
+        client.app.dependency_overrides[get_user_plan] = lambda: UserPlan.ESTUDIANTE
+        try:
+            response = client.post(
+                "/api/v1/proyectos/1/ia/bibliografias",
+                json={"query": "test query", "max_results": 5},
+                headers=headers,
+            )
+        finally:
+            client.app.dependency_overrides.pop(get_user_plan)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        data = response.json()
+        assert data["detail"]["error"] == "feature_not_available"
+        assert data["detail"]["details"]["plan"] == "estudiante"
+        mock_get_project.assert_not_called()
+        mock_search_bib.assert_not_called()
+
     @patch("app.services.ai_service.ai_service.search_bibliography")
     def test_search_bibliography_empty_results(self, mock_search_bib):
         """Probar búsqueda sin resultados"""
@@ -421,6 +584,52 @@ class TestConversations:
         assert data["model_used"] == "gemini-1.5-pro"
         assert isinstance(data["conversation_id"], int)
 
+    @patch("app.services.ai_service.ai_service.generate_conversation_title")
+    @patch("app.services.ai_service.ai_service.chat")
+    def test_chat_saves_generated_title_with_response(self, mock_chat, mock_title):
+        """Probar que el título generado se guarda junto con la respuesta"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+        mock_chat.return_value = ("Respuesta", "gemini-1.5-pro")
+        mock_title.return_value = "Título generado"
+
+        response = client.post(
+            f"/api/v1/proyectos/{project_id}/chat",
+            json={"message": "Hola"},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        conversation = client.get(
+            f"/api/v1/proyectos/{project_id}/conversaciones/{data['conversation_id']}",
+            headers=headers,
+        ).json()
+        assert conversation["title"] == "Título generado"
+        assert [m["role"] for m in conversation["messages"]] == ["user", "model"]
+        assert conversation["messages"][-1]["id"] == data["message_id"]
+
+    @patch("app.services.ai_service.ai_service.chat")
+    def test_chat_keeps_user_message_when_ai_fails(self, mock_chat):
+        """Probar que el mensaje del usuario se guarda aunque falle la IA"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+        mock_chat.side_effect = AIServiceError("Error del servicio")
+
+        response = client.post(
+            f"/api/v1/proyectos/{project_id}/chat",
+            json={"message": "Mensaje sin respuesta", "title": "Fallida"},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        conversations = client.get(
+            f"/api/v1/proyectos/{project_id}/conversaciones", headers=headers
+        ).json()
+        assert len(conversations) == 1
+        assert conversations[0]["message_count"] == 1
+        assert conversations[0]["last_message_preview"] == "Mensaje sin respuesta"
+
     @patch("app.services.ai_service.ai_service.chat")
     def test_chat_continue_existing_conversation(self, mock_chat):
         """Probar continuar una conversación existente"""
@@ -448,6 +657,23 @@ class TestConversations:
         data = response2.json()
         assert data["conversation_id"] == conversation_id
         assert data["response"] == "Segunda respuesta"
+        assert mock_chat.call_args.kwargs["history"] == [
+            {"role": "user", "content": "Primer mensaje"},
+            {"role": "model", "content": "Primera respuesta"},
+        ]
+
+        # El tercer turno incluye el historial previo más el turno anterior
+        client.post(
+            f"/api/v1/proyectos/{project_id}/chat",
+            json={"message": "Tercer mensaje", "conversation_id": conversation_id},
+            headers=headers,
+        )
+        assert [m["content"] for m in mock_chat.call_args.kwargs["history"]] == [
+            "Primer mensaje",
+            "Primera respuesta",
+            "Segundo mensaje",
+            "Segunda respuesta",
+        ]
 
     @patch("app.services.ai_service.ai_service.chat")
     def test_list_conversations_after_creation(self, mock_chat):
@@ -479,6 +705,228 @@ class TestConversations:
         assert len(data) == 2
         assert all("title" in conv for conv in data)
         assert all("message_count" in conv for conv in data)
+        # Cada conversación tiene el mensaje del usuario y la respuesta del modelo
+        assert all(conv["message_count"] == 2 for conv in data)
+        assert all(conv["last_message_preview"] == "Respuesta" for conv in data)
+
+    @patch("app.services.ai_service.ai_service.chat")
+    def test_list_conversations_paginated_with_cursor(self, mock_chat):
+        """Probar el listado paginado con limit y cursor"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+
+        mock_chat.return_value = ("Respuesta", "gemini-1.5-pro")
+        for i in range(3):
+            client.post(
+                f"/api/v1/proyectos/{project_id}/chat",
+                json={"message": f"Mensaje {i}", "title": f"Conversación {i}"},
+                headers=headers,
+            )
+
+        url = f"/api/v1/proyectos/{project_id}/conversaciones"
+        first_page = client.get(url, params={"limit": 2}, headers=headers).json()
+        assert [c["title"] for c in first_page] == ["Conversación 2", "Conversación 1"]
+
+        second_page = client.get(
+            url,
+            params={"limit": 2, "cursor": first_page[-1]["updated_at"]},
+            headers=headers,
+        ).json()
+        assert [c["title"] for c in second_page] == ["Conversación 0"]
+
+        response = client.get(url, params={"limit": 500}, headers=headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @patch("app.services.ai_service.ai_service.chat")
+    def test_chat_reuses_project_context_until_bibliography_changes(self, mock_chat):
+        """Probar que el contexto del proyecto se reutiliza y se invalida"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+        mock_chat.return_value = ("Respuesta", "gemini-1.5-pro")
+
+        def send(message):
+            response = client.post(
+                f"/api/v1/proyectos/{project_id}/chat",
+                json={"message": message, "title": "Contexto"},
+                headers=headers,
+            )
+            assert response.status_code == status.HTTP_200_OK
+            return mock_chat.call_args.kwargs["project_context"]
+
+        with patch(
+            "app.api.api_v1.endpoints.ai_assistant.bibliography_repository"
+            ".get_by_project",
+            wraps=bibliography_repository.get_by_project,
+        ) as mock_get_by_project:
+            first_context = send("Hola")
+            assert send("Hola otra vez") == first_context
+            assert mock_get_by_project.call_count == 1
+
+            client.post(
+                f"/api/v1/proyectos/{project_id}/bibliografias",
+                json={"type": "libro", "author": "García", "title": "Metodología"},
+                headers=headers,
+            )
+            new_context = send("¿Y ahora?")
+
+        assert mock_get_by_project.call_count == 2
+        assert "Metodología" in new_context
+        assert "Metodología" not in first_context
+
+    @patch("app.services.ai_service.ai_service.chat")
+    def test_chat_uses_precomputed_document_text(self, mock_chat):
+        """Probar que el chat usa el texto precalculado del .docx sin parsearlo"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+
+        document = Document()
+        document.add_paragraph("Contenido del documento para el chat")
+        buffer = io.BytesIO()
+        document.save(buffer)
+        upload_response = client.post(
+            f"/api/v1/proyectos/{project_id}/documentos",
+            headers=headers,
+            files={
+                "file": (
+                    "proyecto.docx",
+                    io.BytesIO(buffer.getvalue()),
+                    "application/vnd.openxmlformats-officedocument."
+                    "wordprocessingml.document",
+                )
+            },
+        )
+        assert upload_response.status_code == 201
+
+        # El texto precalculado (columna diferida) debe leerse fuera del event loop
+        text_queries_in_loop = []
+
+        def track_text_queries(conn, cursor, statement, *args):
+            if "text_content" in statement:
+                try:
+                    asyncio.get_running_loop()
+                    text_queries_in_loop.append(True)
+                except RuntimeError:
+                    text_queries_in_loop.append(False)
+
+        mock_chat.return_value = ("Respuesta", "gemini-1.5-pro")
+        event.listen(engine, "before_cursor_execute", track_text_queries)
+        try:
+            with patch(
+                "app.api.api_v1.endpoints.ai_assistant.document_extraction_service"
+                ".get_document_preview"
+            ) as mock_preview:
+                response = client.post(
+                    f"/api/v1/proyectos/{project_id}/chat",
+                    json={"message": "Hola", "title": "Con documento"},
+                    headers=headers,
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", track_text_queries)
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_preview.assert_not_called()
+        assert text_queries_in_loop == [False]
+        project_context = mock_chat.call_args.kwargs["project_context"]
+        assert "Contenido del documento para el chat" in project_context
+
+    @patch("app.services.ai_service.ai_service.chat_stream")
+    def test_chat_stream_sends_deltas_and_saves_response(self, mock_chat_stream):
+        """Probar chat en streaming: eventos SSE y respuesta guardada en historial"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+
+        async def deltas():
+            for delta in ("Hola, ", "¿en qué ", "te ayudo?"):
+                yield delta
+
+        mock_chat_stream.return_value = (deltas(), "gemini-1.5-pro")
+
+        response = client.post(
+            f"/api/v1/proyectos/{project_id}/chat/stream",
+            json={"message": "Hola", "title": "Streaming"},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: ") :])
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        assert [e["delta"] for e in events[:-1]] == ["Hola, ", "¿en qué ", "te ayudo?"]
+        assert events[-1]["done"] is True
+
+        conversation = client.get(
+            f"/api/v1/proyectos/{project_id}/conversaciones/"
+            f"{events[-1]['conversation_id']}",
+            headers=headers,
+        ).json()
+        assert [m["role"] for m in conversation["messages"]] == ["user", "model"]
+        assert conversation["messages"][-1]["content"] == "Hola, ¿en qué te ayudo?"
+        assert conversation["messages"][-1]["id"] == events[-1]["message_id"]
+
+    async def test_chat_stream_saves_partial_reply_off_loop_on_disconnect(self):
+        """Probar que al desconectarse el cliente se guarda lo generado en un hilo"""
+        saved = []
+
+        def tracking_save(conversation_id, content, model_used):
+            try:
+                asyncio.get_running_loop()
+                saved.append((content, True))
+            except RuntimeError:
+                saved.append((content, False))
+            return 1
+
+        async def deltas():
+            yield "Hola, "
+            await asyncio.sleep(3600)  # El cliente se desconecta antes
+            yield "nunca"
+
+        with patch.object(
+            ai_assistant,
+            "_prepare_chat",
+            AsyncMock(return_value=(SimpleNamespace(id=7), [], "Contexto")),
+        ), patch.object(ai_assistant, "_save_user_message", AsyncMock()), patch.object(
+            ai_assistant.ai_service,
+            "chat_stream",
+            AsyncMock(return_value=(deltas(), "gemini-1.5-pro")),
+        ), patch.object(
+            ai_assistant, "_save_assistant_message", side_effect=tracking_save
+        ):
+            response = await ai_assistant.chat_with_persistent_history_stream(
+                project_id=1,
+                request=ChatWithHistoryRequest(message="Hola"),
+                current_user=SimpleNamespace(email="testuser@example.com"),
+                project=SimpleNamespace(id=1),
+                db=Mock(),
+            )
+            received = []
+
+            async def consume():
+                async for chunk in response.body_iterator:
+                    received.append(chunk)
+
+            consumer = asyncio.create_task(consume())
+            while not received:
+                await asyncio.sleep(0)
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+
+        assert saved == [("Hola, ", False)]
+
+    def test_chat_stream_project_not_found(self):
+        """Probar chat en streaming con proyecto no encontrado"""
+        headers, _ = create_test_user_and_login()
+
+        response = client.post(
+            "/api/v1/proyectos/99999/chat/stream",
+            json={"message": "Test message"},
+            headers=headers,
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
 
     def test_chat_project_not_found(self):
         """Probar chat con proyecto no encontrado"""
@@ -492,6 +940,36 @@ class TestConversations:
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+    def test_conversations_other_user_project(self):
+        """Probar que no se accede a las conversaciones de un proyecto ajeno"""
+        headers, _ = create_test_user_and_login()
+        project_id = create_test_project(headers)
+
+        other_user = {
+            "email": "otheruser@example.com",
+            "full_name": "Other User",
+            "password": "Test123456",
+            "phone_number": "+573009876543",
+        }
+        assert client.post("/api/v1/auth/register", json=other_user).status_code == 201
+        login_response = client.post(
+            "/api/v1/auth/login",
+            data={"username": other_user["email"], "password": "Test123456"},
+        )
+        other_headers = {
+            "Authorization": f"Bearer {login_response.json()['access_token']}"
+        }
+
+        response = client.get(
+            f"/api/v1/proyectos/{project_id}/conversaciones", headers=other_headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = client.get(
+            f"/api/v1/proyectos/{project_id}/conversaciones", headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+
     def test_chat_unauthorized(self):
         """Probar chat sin autenticación"""
         response = client.post(
@@ -554,6 +1032,7 @@ class TestConversations:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data["title"] == "Título Actualizado"
+        assert [m["role"] for m in data["messages"]] == ["user", "model"]
 
     @patch("app.services.ai_service.ai_service.chat")
     def test_delete_conversation(self, mock_chat):
@@ -1,10 +1,13 @@
+import asyncio
 import io
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import event
 
 from app.database import Base
-from tests.test_db_config import client, engine
+from app.utils.file_utils import FileUtils
+from tests.test_db_config import async_engine, client, engine
 
 
 @pytest.fixture(autouse=True)
@@ -397,6 +400,39 @@ class TestAttachmentEndpoints:
         assert data["project_id"] is None
         assert data["phase_id"] is None
 
+    def test_upload_document_writes_file_off_event_loop(self):
+        """Probar que el archivo subido se copia a disco fuera del event loop"""
+        headers, user_id = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+        phase = self.create_test_phase(headers, project["id"])
+        task = self.create_test_task(headers, phase["id"])
+
+        in_event_loop = []
+        save_upload = FileUtils.save_upload
+
+        def tracking_save(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                in_event_loop.append(True)
+            except RuntimeError:
+                in_event_loop.append(False)
+            return save_upload(*args, **kwargs)
+
+        with patch.object(FileUtils, "save_upload", new=tracking_save):
+            for url in (
+                f"/api/v1/proyectos/{project['id']}/documentos",
+                f"/api/v1/fases/{phase['id']}/documentos",
+                f"/api/v1/tareas/{task['id']}/documentos",
+            ):
+                response = client.post(
+                    url,
+                    headers=headers,
+                    files={"file": self.create_test_pdf_file()},
+                )
+                assert response.status_code == 201
+
+        assert in_event_loop == [False, False, False]
+
     def test_get_document_from_task_success(self):
         """Probar obtención exitosa de documento de tarea"""
         headers, user_id = self.create_test_user_and_login()
@@ -424,6 +460,39 @@ class TestAttachmentEndpoints:
         assert data["task_id"] == task["id"]
 
     # Tests para validaciones de autorización
+    def test_get_task_document_resolves_owner_in_one_query(self):
+        """Probar que tarea, fase, proyecto y adjunto se resuelven en una consulta"""
+        headers, user_id = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+        phase = self.create_test_phase(headers, project["id"])
+        task = self.create_test_task(headers, phase["id"])
+        client.post(
+            f"/api/v1/tareas/{task['id']}/documentos",
+            headers=headers,
+            files={"file": self.create_test_pdf_file("task_document.pdf")},
+        )
+
+        statements = []
+
+        def count_selects(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_selects)
+        try:
+            response = client.get(
+                f"/api/v1/tareas/{task['id']}/documentos", headers=headers
+            )
+        finally:
+            event.remove(
+                async_engine.sync_engine, "before_cursor_execute", count_selects
+            )
+
+        assert response.status_code == 200
+        assert response.json()["file_name"] == "task_document.pdf"
+        # Una consulta para el usuario autenticado y otra para el adjunto
+        assert len(statements) == 2
+
     def test_upload_document_authorization_validation(self):
         """Probar que solo el propietario puede subir documentos"""
         # Usuario 1 crea proyecto
@@ -554,12 +623,14 @@ class TestAttachmentEndpoints:
         file_data = self.create_test_pdf_file("empty.pdf", b"")
 
         # El archivo vacío debería causar un error interno por validación de esquema
-        with pytest.raises(Exception):  # Capturar la excepción de validación
-            client.post(
-                f"/api/v1/proyectos/{project['id']}/documentos",
-                headers=headers,
-                files={"file": file_data},
-            )
+        response = client.post(
+            f"/api/v1/proyectos/{project['id']}/documentos",
+            headers=headers,
+            files={"file": file_data},
+        )
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Error interno del servidor"}
 
     def test_cross_entity_document_isolation(self):
         """Probar que los documentos están aislados entre entidades"""
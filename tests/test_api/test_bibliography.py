@@ -1,9 +1,12 @@
+import json
 import os
 
 import pytest
 
+from app.api.api_v1.endpoints.bibliography import UPLOAD_DIR
 from app.database import Base
-from tests.test_db_config import client, engine
+from app.models.user import User
+from tests.test_db_config import TestingSessionLocal, client, engine
 
 
 @pytest.fixture(autouse=True)
@@ -60,6 +63,22 @@ class TestBibliographyEndpoints:
         assert response.status_code == 201
         return response.json()["id"]
 
+    def test_inactive_user_cannot_list_bibliographies(self):
+        """Probar que la dependencia de ID de usuario rechaza usuarios inactivos"""
+        headers, user_id = self.create_test_user_and_login()
+        project_id = self.create_test_project(headers)
+
+        with TestingSessionLocal() as db:
+            db.query(User).filter(User.id == user_id).update({"is_active": False})
+            db.commit()
+
+        response = client.get(
+            f"/api/v1/proyectos/{project_id}/bibliografias", headers=headers
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Usuario inactivo"
+
     def test_create_bibliography_success(self):
         """Probar creación exitosa de bibliografía"""
         headers, _ = self.create_test_user_and_login()
@@ -129,6 +148,25 @@ class TestBibliographyEndpoints:
         assert data[0]["title"] == "Libro 1"
         assert data[1]["title"] == "Articulo 1"
 
+    def test_list_bibliographies_ndjson_stream(self):
+        """Probar el listado de bibliografías en streaming NDJSON"""
+        headers, _ = self.create_test_user_and_login()
+        project_id = self.create_test_project(headers)
+        for i in range(3):
+            client.post(
+                f"/api/v1/proyectos/{project_id}/bibliografias",
+                json={"type": "libro", "author": "Autor", "title": f"Titulo {i}"},
+                headers=headers,
+            )
+
+        url = f"/api/v1/proyectos/{project_id}/bibliografias"
+        response = client.get(f"{url}?format=ndjson", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == client.get(url, headers=headers).json()
+
     def test_update_bibliography(self):
         """Probar actualización de bibliografía"""
         headers, _ = self.create_test_user_and_login()
@@ -221,3 +259,61 @@ class TestBibliographyEndpoints:
         assert (
             response.status_code == 404
         )  # O 403 dependiendo de la implementación de verify_project_access
+
+    def test_update_bibliography_wrong_project_or_missing(self):
+        """Probar referencia de otro proyecto (400) e inexistente (404)"""
+        headers, _ = self.create_test_user_and_login()
+        project_id = self.create_test_project(headers)
+        other_project_id = self.create_test_project(headers)
+
+        create_res = client.post(
+            f"/api/v1/proyectos/{project_id}/bibliografias",
+            json={"type": "libro", "author": "Autor", "title": "Titulo", "year": 2020},
+            headers=headers,
+        )
+        bib_id = create_res.json()["id"]
+
+        response = client.put(
+            f"/api/v1/proyectos/{other_project_id}/bibliografias/{bib_id}",
+            json={"title": "Otro"},
+            headers=headers,
+        )
+        assert response.status_code == 400
+
+        response = client.delete(
+            f"/api/v1/proyectos/{project_id}/bibliografias/99999", headers=headers
+        )
+        assert response.status_code == 404
+
+    def test_upload_document_checks_content_signature(self):
+        """Probar que se valida el contenido real del archivo y no solo su tipo"""
+        headers, _ = self.create_test_user_and_login()
+        project_id = self.create_test_project(headers)
+        create_res = client.post(
+            f"/api/v1/proyectos/{project_id}/bibliografias",
+            json={"type": "libro", "author": "Autor", "title": "Titulo", "year": 2020},
+            headers=headers,
+        )
+        bib_id = create_res.json()["id"]
+        url = f"/api/v1/proyectos/{project_id}/bibliografias/{bib_id}/upload"
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+        response = client.post(
+            url,
+            files={"file": ("falso.pdf", b"MZ ejecutable", "application/pdf")},
+            headers=headers,
+        )
+        assert response.status_code == 400
+
+        response = client.post(
+            url,
+            files={"file": ("real.pdf", b"%PDF-1.7 contenido", "application/pdf")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        file_path = response.json()["file_path"]
+        try:
+            with open(file_path, "rb") as f:
+                assert f.read() == b"%PDF-1.7 contenido"
+        finally:
+            os.remove(file_path)
@@ -0,0 +1,467 @@
+import io
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from docx import Document
+from sqlalchemy.orm import undefer
+
+from app.api.api_v1.documentos import _extract_docx
+from app.database import Base
+from app.models.attachment import Attachment
+from app.services.attachment_service import attachment_service
+from tests.test_db_config import TestingSessionLocal, client, engine
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class TestDocumentosEndpoints:
+    """Pruebas para los endpoints de extracción de contenido de documentos"""
+
+    _phone_counter = 0
+
+    def create_test_user_and_login(self, email="docsuser@example.com"):
+        """Helper para crear un usuario de prueba y hacer login"""
+        TestDocumentosEndpoints._phone_counter += 1
+        user_data = {
+            "email": email,
+            "full_name": "Docs User",
+            "password": "Test123456",
+            "phone_number": f"+57300555{TestDocumentosEndpoints._phone_counter:04d}",
+        }
+        register_response = client.post("/api/v1/auth/register", json=user_data)
+        assert register_response.status_code == 201
+
+        login_data = {"username": email, "password": "Test123456"}
+        login_response = client.post("/api/v1/auth/login", data=login_data)
+        assert login_response.status_code == 200
+
+        token = login_response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def create_docx_bytes(self, paragraphs=("Introducción", "Contenido de prueba")):
+        """Helper para generar un archivo .docx real en memoria"""
+        document = Document()
+        for text in paragraphs:
+            document.add_paragraph(text)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+
+    def upload_project_document(
+        self, headers, filename, content, mime, precompute=True
+    ):
+        """
+        Helper para crear un proyecto y subirle un documento.
+
+        Con precompute=False se omite la extracción en segundo plano, de modo que
+        las lecturas tengan que extraer el contenido del archivo.
+        """
+        project_response = client.post(
+            "/api/v1/proyectos/",
+            json={"name": "Proyecto Docs", "description": "Proyecto de prueba"},
+            headers=headers,
+        )
+        assert project_response.status_code == 201
+        project_id = project_response.json()["id"]
+
+        with patch.object(
+            attachment_service,
+            "extract_and_store_content",
+            wraps=attachment_service.extract_and_store_content,
+        ) as mock_extract:
+            if not precompute:
+                mock_extract.side_effect = lambda attachment_id: None
+            upload_response = client.post(
+                f"/api/v1/proyectos/{project_id}/documentos",
+                headers=headers,
+                files={"file": (filename, io.BytesIO(content), mime)},
+            )
+        assert upload_response.status_code == 201
+        return upload_response.json()
+
+    def test_extract_content_success(self):
+        """Probar extracción exitosa de contenido HTML de un .docx"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-content", headers=headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == attachment["id"]
+        assert "Contenido de prueba" in data["html_content"]
+
+    def test_extract_pages_success(self):
+        """Probar extracción paginada de un .docx"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-pages", headers=headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_pages"] == len(data["pages"]) >= 1
+
+    def test_preview_success(self):
+        """Probar vista previa de texto de un .docx"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/preview", headers=headers
+        )
+
+        assert response.status_code == 200
+        assert "Introducción" in response.json()["preview"]
+
+    def test_extract_content_not_found(self):
+        """Probar extracción de un documento inexistente"""
+        headers = self.create_test_user_and_login()
+
+        response = client.get(
+            "/api/v1/documentos/9999/extract-content", headers=headers
+        )
+
+        assert response.status_code == 404
+
+    def test_extract_content_other_user(self):
+        """Probar que un usuario no puede extraer documentos ajenos"""
+        owner_headers = self.create_test_user_and_login("owner@example.com")
+        attachment = self.upload_project_document(
+            owner_headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+        other_headers = self.create_test_user_and_login("other@example.com")
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-content",
+            headers=other_headers,
+        )
+
+        assert response.status_code == 403
+
+    def test_extract_content_pdf_not_supported(self):
+        """Probar que los PDF no se pueden extraer como HTML"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.pdf", b"%PDF-1.4 fake pdf", "application/pdf"
+        )
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-content", headers=headers
+        )
+
+        assert response.status_code == 400
+
+    def test_extract_content_missing_file_returns_404(self):
+        """Probar que un archivo físico inexistente devuelve 404"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers,
+            "informe.docx",
+            self.create_docx_bytes(),
+            DOCX_MIME,
+            precompute=False,
+        )
+        os.remove(attachment["file_path"])
+
+        with patch("app.api.api_v1.documentos.run_in_docx_pool") as mock_pool:
+            response = client.get(
+                f"/api/v1/documentos/{attachment['id']}/extract-content",
+                headers=headers,
+            )
+            stream_response = client.get(
+                f"/api/v1/documentos/{attachment['id']}/extract-pages-stream",
+                headers=headers,
+            )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Archivo físico no encontrado"
+        assert stream_response.status_code == 404
+        mock_pool.assert_not_called()
+
+    def test_extract_content_uses_cache_hit(self):
+        """Probar que un acierto en la caché evita volver a parsear el documento"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers,
+            "informe.docx",
+            self.create_docx_bytes(),
+            DOCX_MIME,
+            precompute=False,
+        )
+
+        with patch(
+            "app.api.api_v1.documentos.cache_get",
+            new=AsyncMock(
+                return_value={"html": "<p>Desde caché</p>", "pages": [], "text": ""}
+            ),
+        ), patch("app.api.api_v1.documentos.run_in_docx_pool") as mock_pool:
+            response = client.get(
+                f"/api/v1/documentos/{attachment['id']}/extract-content",
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.json()["html_content"] == "<p>Desde caché</p>"
+        mock_pool.assert_not_called()
+
+    async def test_extract_docx_memory_cache_skips_redis(self, tmp_path):
+        """Probar que la segunda extracción del mismo archivo se sirve desde memoria"""
+        test_file = tmp_path / "informe.docx"
+        test_file.write_bytes(self.create_docx_bytes())
+
+        first = await _extract_docx(str(test_file))
+        with patch(
+            "app.api.api_v1.documentos.cache_get", new=AsyncMock(return_value=None)
+        ) as mock_cache_get:
+            second = await _extract_docx(str(test_file))
+
+        assert first == second
+        mock_cache_get.assert_not_called()
+
+    def test_preview_pdf_returns_error_message(self):
+        """Probar que la vista previa de un archivo no .docx devuelve el mensaje de error"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.pdf", b"%PDF-1.4 fake pdf", "application/pdf"
+        )
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/preview", headers=headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["preview"].startswith("Error al obtener vista previa")
+
+    def test_task_document_resolves_owner_through_phase_and_project(self):
+        """Probar que los permisos de un documento de tarea se resuelven vía fase y proyecto"""
+        headers = self.create_test_user_and_login()
+        project = client.post(
+            "/api/v1/proyectos/",
+            json={"name": "Proyecto Docs", "description": "Proyecto de prueba"},
+            headers=headers,
+        ).json()
+        phase = client.post(
+            "/api/v1/fases/",
+            json={"name": "Fase Docs", "project_id": project["id"], "position": 1},
+            headers=headers,
+        ).json()
+        task = client.post(
+            "/api/v1/tareas/",
+            json={"title": "Tarea Docs", "phase_id": phase["id"], "position": 1},
+            headers=headers,
+        ).json()
+        upload_response = client.post(
+            f"/api/v1/tareas/{task['id']}/documentos",
+            headers=headers,
+            files={
+                "file": ("tarea.docx", io.BytesIO(self.create_docx_bytes()), DOCX_MIME)
+            },
+        )
+        assert upload_response.status_code == 201
+        attachment_id = upload_response.json()["id"]
+
+        owner_response = client.get(
+            f"/api/v1/documentos/{attachment_id}/extract-content", headers=headers
+        )
+        other_headers = self.create_test_user_and_login("intruso@example.com")
+        other_response = client.get(
+            f"/api/v1/documentos/{attachment_id}/extract-content",
+            headers=other_headers,
+        )
+
+        assert owner_response.status_code == 200
+        assert other_response.status_code == 403
+
+    def test_extract_pages_stream_ndjson(self):
+        """Probar streaming NDJSON de páginas con el mismo contenido que extract-pages"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers,
+            "informe.docx",
+            self.create_docx_bytes([f"Párrafo {i} " + "x" * 500 for i in range(20)]),
+            DOCX_MIME,
+        )
+
+        stream_response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-pages-stream",
+            headers=headers,
+        )
+        pages_response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-pages", headers=headers
+        )
+
+        assert stream_response.status_code == 200
+        assert stream_response.headers["content-type"].startswith(
+            "application/x-ndjson"
+        )
+        lines = [json.loads(line) for line in stream_response.text.splitlines()]
+        assert [line["page_index"] for line in lines] == list(range(len(lines)))
+        assert [line["html"] for line in lines] == pages_response.json()["pages"]
+        assert len(lines) > 1
+
+    def test_upload_precomputes_content(self):
+        """Probar que al subir un .docx su contenido se guarda en el adjunto"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+
+        db = TestingSessionLocal()
+        try:
+            stored = db.get(
+                Attachment,
+                attachment["id"],
+                options=[
+                    undefer(Attachment.html_content),
+                    undefer(Attachment.pages_json),
+                    undefer(Attachment.text_content),
+                ],
+            )
+            assert "Contenido de prueba" in stored.html_content
+            assert len(stored.pages_json) == 1
+            assert stored.text_content == "Introducción\nContenido de prueba"
+        finally:
+            db.close()
+
+    def test_extract_content_uses_precomputed_content(self):
+        """Probar que las lecturas usan el contenido precalculado sin parsear"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+
+        with patch("app.api.api_v1.documentos.run_in_docx_pool") as mock_pool:
+            content = client.get(
+                f"/api/v1/documentos/{attachment['id']}/extract-content",
+                headers=headers,
+            )
+            preview = client.get(
+                f"/api/v1/documentos/{attachment['id']}/preview", headers=headers
+            )
+
+        assert content.status_code == preview.status_code == 200
+        assert "Contenido de prueba" in content.json()["html_content"]
+        assert preview.json()["preview"] == "Introducción\nContenido de prueba"
+        mock_pool.assert_not_called()
+
+    def test_update_content_refreshes_precomputed_content(self):
+        """Probar que al editar el documento se regenera el contenido guardado"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", self.create_docx_bytes(), DOCX_MIME
+        )
+
+        update_response = client.put(
+            f"/api/v1/documentos/{attachment['id']}/content",
+            json={"pages": ["<p>Texto editado</p>"]},
+            headers=headers,
+        )
+        content = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-content", headers=headers
+        )
+
+        assert update_response.status_code == 200
+        assert "Texto editado" in content.json()["html_content"]
+        assert "Contenido de prueba" not in content.json()["html_content"]
+
+    def _extract_and_capture_save(self, headers, attachment_id):
+        """Leer el contenido sin precalcular y devolver el guardado pendiente"""
+        with patch.object(attachment_service, "save_extracted_content") as mock_save:
+            response = client.get(
+                f"/api/v1/documentos/{attachment_id}/extract-content",
+                headers=headers,
+            )
+        assert response.status_code == 200
+        mock_save.assert_called_once()
+        return mock_save.call_args.args
+
+    def test_stale_extraction_does_not_overwrite_edited_content(self):
+        """Probar que una extracción previa a una edición no pisa el contenido nuevo"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers,
+            "informe.docx",
+            self.create_docx_bytes(),
+            DOCX_MIME,
+            precompute=False,
+        )
+        pending_save = self._extract_and_capture_save(headers, attachment["id"])
+
+        client.put(
+            f"/api/v1/documentos/{attachment['id']}/content",
+            json={"pages": ["<p>Texto editado</p>"]},
+            headers=headers,
+        )
+        # El guardado de la lectura anterior termina después de la edición
+        attachment_service.save_extracted_content(*pending_save)
+
+        content = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-content", headers=headers
+        )
+        assert "Texto editado" in content.json()["html_content"]
+        assert "Contenido de prueba" not in content.json()["html_content"]
+
+    def test_stale_extraction_skipped_when_file_changed(self):
+        """Probar que no se guarda una extracción si el archivo cambió desde entonces"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers,
+            "informe.docx",
+            self.create_docx_bytes(),
+            DOCX_MIME,
+            precompute=False,
+        )
+        pending_save = self._extract_and_capture_save(headers, attachment["id"])
+
+        # Edición cuya regeneración en segundo plano aún no se ha ejecutado
+        with patch.object(attachment_service, "extract_and_store_content"):
+            client.put(
+                f"/api/v1/documentos/{attachment['id']}/content",
+                json={"pages": ["<p>Texto editado</p>"]},
+                headers=headers,
+            )
+        attachment_service.save_extracted_content(*pending_save)
+
+        db = TestingSessionLocal()
+        try:
+            stored = db.get(
+                Attachment, attachment["id"], options=[undefer(Attachment.html_content)]
+            )
+            assert stored.html_content is None
+        finally:
+            db.close()
+
+    def test_extract_content_corrupt_docx_returns_500(self):
+        """Probar que los errores HTTP del pool de procesos llegan al cliente"""
+        headers = self.create_test_user_and_login()
+        attachment = self.upload_project_document(
+            headers, "informe.docx", b"no es un docx", DOCX_MIME, precompute=False
+        )
+
+        response = client.get(
+            f"/api/v1/documentos/{attachment['id']}/extract-content", headers=headers
+        )
+
+        assert response.status_code == 500
+        assert "Error al extraer contenido" in response.json()["detail"]
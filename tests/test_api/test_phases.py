@@ -1,6 +1,16 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, patch
+
+import anyio
 import pytest
 
+from app.api.api_v1.endpoints.projects import _http_date, _project_phases_etag
 from app.database import Base
+from app.services.phase_service import phase_service
+from app.services.project_cache import ProjectPhasesCache, project_phases_cache
+from app.services.project_service import project_service
 from tests.test_db_config import client, engine
 
 
@@ -501,6 +511,41 @@ class TestPhaseEndpoints:
         assert response.status_code == 200
         # El endpoint debería retornar la fase con sus tareas
 
+    def test_phase_database_calls_run_off_event_loop(self):
+        """Probar que las consultas síncronas de fases no bloquean el event loop"""
+        headers, user_id = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+
+        in_event_loop = []
+
+        def tracking(method):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    in_event_loop.append(True)
+                except RuntimeError:
+                    in_event_loop.append(False)
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        with patch.object(
+            phase_service, "create_phase", new=tracking(phase_service.create_phase)
+        ), patch.object(
+            phase_service,
+            "get_phase_tasks",
+            new=tracking(phase_service.get_phase_tasks),
+        ):
+            phase_id = client.post(
+                "/api/v1/fases/",
+                json={"name": "Fase Uno", "position": 0, "project_id": project["id"]},
+                headers=headers,
+            ).json()["id"]
+            response = client.get(f"/api/v1/fases/{phase_id}/tareas", headers=headers)
+
+        assert response.status_code == 200
+        assert in_event_loop == [False, False]
+
     def test_reorder_phases_success(self):
         """Probar reordenamiento exitoso de fases"""
         headers, user_id = self.create_test_user_and_login()
@@ -727,6 +772,198 @@ class TestPhaseEndpoints:
 
         assert etag2 != etag1
 
+    def test_get_project_with_phases_etag_revalidation_and_reorder(self):
+        """Verificar el 304 con el ETag vigente y que reordenar fases lo invalide"""
+        headers, _ = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+        url = f"/api/v1/proyectos/{project['id']}/phases"
+
+        phase_ids = [
+            client.post(
+                "/api/v1/fases/",
+                json={"name": f"Fase {i}", "position": i, "project_id": project["id"]},
+                headers=headers,
+            ).json()["id"]
+            for i in range(2)
+        ]
+
+        fresh = client.get(url, headers=headers)
+        etag = fresh.headers["ETag"]
+        assert fresh.headers["Cache-Control"] == (
+            "private, max-age=0, stale-while-revalidate=60"
+        )
+        assert fresh.headers["Vary"] == "Authorization"
+
+        cached = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        assert cached.headers["Cache-Control"] == fresh.headers["Cache-Control"]
+        assert cached.headers["Last-Modified"] == fresh.headers["Last-Modified"]
+
+        client.put(
+            f"/api/v1/fases/project/{project['id']}/reorder",
+            json=[
+                {"id": phase_ids[1], "position": 0},
+                {"id": phase_ids[0], "position": 1},
+            ],
+            headers=headers,
+        )
+
+        refreshed = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["ETag"] != etag
+
+    def test_get_project_with_phases_revalidates_without_loading_phases(self):
+        """Verificar que sin caché el 304 se resuelve sin cargar el proyecto completo"""
+        headers, _ = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+        url = f"/api/v1/proyectos/{project['id']}/phases"
+        client.post(
+            "/api/v1/fases/",
+            json={"name": "Fase Uno", "position": 0, "project_id": project["id"]},
+            headers=headers,
+        )
+        etag = client.get(url, headers=headers).headers["ETag"]
+
+        with patch.object(
+            project_service,
+            "get_project_with_phases",
+            wraps=project_service.get_project_with_phases,
+        ) as mock_full_load:
+            cached = client.get(url, headers={**headers, "If-None-Match": etag})
+            stale = client.get(url, headers={**headers, "If-None-Match": '"stale"'})
+
+        assert cached.status_code == 304
+        assert stale.status_code == 200
+        assert stale.headers["ETag"] == etag
+        assert mock_full_load.call_count == 1
+
+    def test_project_phases_etag_uses_exact_timestamp_and_phase_order(self):
+        """Verificar que el ETag distingue microsegundos y no depende del orden de carga"""
+        positions = [(2, 0), (1, 1)]
+        updated_at = datetime(2026, 10, 16, 12, 0, 0, 1)
+
+        etag = _project_phases_etag(1, updated_at, positions)
+
+        assert etag == _project_phases_etag(1, updated_at, positions[::-1])
+        assert etag != _project_phases_etag(
+            1, updated_at.replace(microsecond=2), positions
+        )
+        assert len(etag) == 32
+
+    def test_http_date_matches_rfc_format(self):
+        """Verificar el formato de Last-Modified para fechas naive y con zona horaria"""
+        for value in (
+            datetime(2026, 1, 4, 7, 5, 9),
+            datetime(2026, 10, 16, 23, 59, 59, 999999),
+            datetime(2024, 2, 29, 0, 0, 0),
+        ):
+            assert _http_date(value) == format_datetime(
+                value.replace(tzinfo=timezone.utc), usegmt=True
+            )
+
+        bogota = timezone(timedelta(hours=-5))
+        assert (
+            _http_date(datetime(2026, 10, 16, 21, 30, tzinfo=bogota))
+            == "Sat, 17 Oct 2026 02:30:00 GMT"
+        )
+
+    def test_get_project_with_phases_served_from_cache_until_invalidated(self):
+        """Verificar que la respuesta se sirve desde Redis hasta modificar las fases"""
+        headers, _ = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+        url = f"/api/v1/proyectos/{project['id']}/phases"
+
+        store = {}
+
+        async def fake_get(key):
+            return store.get(key)
+
+        async def fake_set(key, value, ttl):
+            store[key] = value
+
+        async def fake_incr(key):
+            store[key] = store.get(key, 0) + 1
+
+        with patch(
+            "app.services.project_cache.cache_get", new=AsyncMock(side_effect=fake_get)
+        ), patch(
+            "app.services.project_cache.cache_set", new=AsyncMock(side_effect=fake_set)
+        ), patch(
+            "app.services.project_cache.cache_incr",
+            new=AsyncMock(side_effect=fake_incr),
+        ), patch.object(
+            project_service,
+            "get_project_with_phases",
+            wraps=project_service.get_project_with_phases,
+        ) as mock_db_lookup:
+            first = client.get(url, headers=headers)
+            second = client.get(url, headers=headers)
+
+            assert first.status_code == second.status_code == 200
+            assert second.json() == first.json()
+            assert second.headers["ETag"] == first.headers["ETag"]
+            assert mock_db_lookup.call_count == 1
+
+            client.post(
+                "/api/v1/fases/",
+                json={"name": "Fase Nueva", "position": 0, "project_id": project["id"]},
+                headers=headers,
+            )
+            third = client.get(url, headers=headers)
+
+            assert mock_db_lookup.call_count == 2
+            assert [phase["name"] for phase in third.json()["phases"]] == ["Fase Nueva"]
+
+    def test_get_project_with_phases_discards_fill_raced_by_a_write(self):
+        """Verificar que una escritura durante la lectura impide cachear datos viejos"""
+        headers, _ = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+        url = f"/api/v1/proyectos/{project['id']}/phases"
+
+        store = {}
+
+        async def fake_get(key):
+            return store.get(key)
+
+        async def fake_set(key, value, ttl):
+            store[key] = value
+
+        async def fake_incr(key):
+            store[key] = store.get(key, 0) + 1
+
+        load = project_service.get_project_with_phases
+        raced = []
+
+        def load_then_concurrent_write(*args, **kwargs):
+            # Una escritura confirma e invalida entre la lectura y el guardado
+            data = load(*args, **kwargs)
+            if not raced:
+                raced.append(True)
+                anyio.from_thread.run(project_phases_cache.invalidate, project["id"])
+            return data
+
+        with patch(
+            "app.services.project_cache.cache_get", new=AsyncMock(side_effect=fake_get)
+        ), patch(
+            "app.services.project_cache.cache_set", new=AsyncMock(side_effect=fake_set)
+        ), patch(
+            "app.services.project_cache.cache_incr",
+            new=AsyncMock(side_effect=fake_incr),
+        ), patch.object(
+            project_service,
+            "get_project_with_phases",
+            side_effect=load_then_concurrent_write,
+        ) as mock_db_lookup:
+            client.get(url, headers=headers)
+            client.get(url, headers=headers)
+            client.get(url, headers=headers)
+
+        # La primera respuesta quedó bajo una versión obsoleta: la segunda
+        # vuelve a la BD y la tercera ya se sirve desde la caché
+        assert mock_db_lookup.call_count == 2
+        assert store[ProjectPhasesCache.build_version_key(project["id"])] == 1
+
     def test_phases_are_sorted_by_position(self):
         """Verificar que las fases se retornen ordenadas por posición"""
         headers, _ = self.create_test_user_and_login()
@@ -1,3 +1,4 @@
+import asyncio
 import io
 from pathlib import Path
 from unittest.mock import patch
@@ -5,6 +6,7 @@ from unittest.mock import patch
 import pytest
 
 from app.database import Base
+from app.utils.file_utils import FileUtils
 from tests.test_db_config import client, engine
 
 
@@ -255,8 +257,7 @@ class TestProjectDocumentDownload:
             == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         )
 
-    @patch("pathlib.Path.exists")
-    def test_download_project_document_file_not_found_in_filesystem(self, mock_exists):
+    def test_download_project_document_file_not_found_in_filesystem(self):
         """Probar descarga cuando el archivo está en BD pero no en el sistema de archivos"""
         headers, user_id = self.create_test_user_and_login()
         project = self.create_test_project(headers)
@@ -270,8 +271,8 @@ class TestProjectDocumentDownload:
         )
         assert upload_response.status_code == 201
 
-        # Simular que el archivo no existe en el sistema
-        mock_exists.return_value = False
+        # Eliminar el archivo del sistema manteniendo el registro en BD
+        Path(upload_response.json()["file_path"]).unlink()
 
         # Intentar descargar
         response = client.get(
@@ -282,6 +283,98 @@ class TestProjectDocumentDownload:
         assert response.status_code == 404
         assert "no se encuentra en el sistema" in response.json()["detail"]
 
+    def test_download_project_document_not_modified(self):
+        """Probar que un ETag vigente en If-None-Match devuelve 304 sin cuerpo"""
+        headers, user_id = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+
+        file_data = self.create_test_pdf_file("documento.pdf")
+        client.post(
+            f"/api/v1/proyectos/{project['id']}/documentos",
+            headers=headers,
+            files={"file": file_data},
+        )
+
+        url = f"/api/v1/proyectos/{project['id']}/descargar-documento"
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"]
+        assert response.headers["content-length"] == str(len(response.content))
+        assert (
+            response.headers["cache-control"] == "private, max-age=0, must-revalidate"
+        )
+
+        cached = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.headers["cache-control"] == response.headers["cache-control"]
+        assert cached.content == b""
+
+        any_tag = client.get(url, headers={**headers, "If-None-Match": "*"})
+        assert any_tag.status_code == 304
+
+        stale = client.get(url, headers={**headers, "If-None-Match": '"stale"'})
+        assert stale.status_code == 200
+
+    def test_download_project_document_stats_file_off_event_loop(self):
+        """Probar que la respuesta de descarga se construye fuera del event loop"""
+        headers, user_id = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+
+        client.post(
+            f"/api/v1/proyectos/{project['id']}/documentos",
+            headers=headers,
+            files={"file": self.create_test_pdf_file("documento.pdf")},
+        )
+
+        in_event_loop = []
+        build_download_response = FileUtils.build_download_response
+
+        def tracking_build(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                in_event_loop.append(True)
+            except RuntimeError:
+                in_event_loop.append(False)
+            return build_download_response(*args, **kwargs)
+
+        with patch.object(FileUtils, "build_download_response", new=tracking_build):
+            response = client.get(
+                f"/api/v1/proyectos/{project['id']}/descargar-documento",
+                headers=headers,
+            )
+
+        assert response.status_code == 200
+        assert response.content == b"fake pdf content"
+        assert in_event_loop == [False]
+
+    @patch("app.utils.file_utils.settings.DOWNLOAD_ACCEL_REDIRECT_PREFIX", "/protected")
+    def test_download_project_document_accel_redirect(self):
+        """Probar que con el prefijo configurado nginx envía el archivo"""
+        headers, user_id = self.create_test_user_and_login()
+        project = self.create_test_project(headers)
+
+        file_data = self.create_test_pdf_file("documento.pdf")
+        upload_response = client.post(
+            f"/api/v1/proyectos/{project['id']}/documentos",
+            headers=headers,
+            files={"file": file_data},
+        )
+
+        response = client.get(
+            f"/api/v1/proyectos/{project['id']}/descargar-documento",
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == (
+            f"/protected/{upload_response.json()['file_path']}"
+        )
+        assert response.headers["content-type"] == "application/pdf"
+        assert "documento.pdf" in response.headers["content-disposition"]
+
     def test_download_multiple_times_same_document(self):
         """Probar que se puede descargar el mismo documento múltiples veces"""
         headers, user_id = self.create_test_user_and_login()
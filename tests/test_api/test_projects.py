@@ -1,7 +1,15 @@
+import json
+import logging
+from unittest.mock import patch
+
 import pytest
 
+from app.core.config import settings
 from app.database import Base
-from tests.test_db_config import client, engine
+from app.models.user import User
+from app.schemas.project import ProjectListResponse
+from app.services.project_service import project_service
+from tests.test_db_config import TestingSessionLocal, client, engine
 
 
 @pytest.fixture(autouse=True)
@@ -68,6 +76,24 @@ class TestProjectEndpoints:
         assert "created_at" in data
         assert "updated_at" in data
 
+    def test_inactive_user_cannot_create_or_list_projects(self):
+        """Probar que las dependencias de ID de usuario rechazan usuarios inactivos"""
+        headers, user_id = self.create_test_user_and_login()
+
+        with TestingSessionLocal() as db:
+            db.query(User).filter(User.id == user_id).update({"is_active": False})
+            db.commit()
+
+        create_response = client.post(
+            "/api/v1/proyectos/", json={"name": "Proyecto"}, headers=headers
+        )
+        list_response = client.get("/api/v1/proyectos/", headers=headers)
+
+        assert create_response.status_code == 400
+        assert create_response.json()["detail"] == "Usuario inactivo"
+        assert list_response.status_code == 400
+        assert list_response.json()["detail"] == "Usuario inactivo"
+
     def test_create_project_minimal_data(self):
         """Probar creación de proyecto con datos mínimos"""
         headers, user_id = self.create_test_user_and_login()
@@ -175,9 +201,42 @@ class TestProjectEndpoints:
         # Verificar que todos los proyectos pertenecen al usuario
         for project in data:
             assert project["id"] in [p["id"] for p in created_projects]
-            assert "name" in project
-            assert "status" in project
-            assert "created_at" in project
+            assert set(project) == set(ProjectListResponse.model_fields)
+
+    def test_list_and_search_projects_newest_first(self):
+        """Probar que el listado y la búsqueda devuelven primero los más recientes"""
+        headers, _ = self.create_test_user_and_login()
+        created_ids = [
+            client.post(
+                "/api/v1/proyectos/",
+                json={"name": f"Proyecto Orden {i}"},
+                headers=headers,
+            ).json()["id"]
+            for i in range(3)
+        ]
+
+        listed = client.get("/api/v1/proyectos/", headers=headers).json()
+        searched = client.get(
+            "/api/v1/proyectos/search?query=Orden", headers=headers
+        ).json()
+
+        assert [project["id"] for project in listed] == created_ids[::-1]
+        assert [project["id"] for project in searched] == created_ids[::-1]
+
+    def test_list_projects_ndjson_stream(self):
+        """Probar el listado de proyectos en streaming NDJSON"""
+        headers, _ = self.create_test_user_and_login()
+        for i in range(3):
+            client.post(
+                "/api/v1/proyectos/", json={"name": f"Proyecto {i}"}, headers=headers
+            )
+
+        response = client.get("/api/v1/proyectos/?format=ndjson", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == client.get("/api/v1/proyectos/", headers=headers).json()
 
     def test_list_projects_without_authentication(self):
         """Probar listado de proyectos sin autenticación"""
@@ -212,6 +271,30 @@ class TestProjectEndpoints:
         assert data["description"] == project_data["description"]
         assert data["research_type"] == project_data["research_type"]
 
+    def test_unexpected_error_returns_generic_500(self, caplog):
+        """Probar que un error no controlado no expone el mensaje interno"""
+        headers, _ = self.create_test_user_and_login()
+        origin = settings.BACKEND_CORS_ORIGIN
+
+        with patch.object(
+            project_service,
+            "create_project",
+            side_effect=RuntimeError("detalle interno"),
+        ), caplog.at_level(logging.ERROR, logger="app.main"):
+            response = client.post(
+                "/api/v1/proyectos/",
+                json={"name": "Proyecto"},
+                headers={**headers, "Origin": origin},
+            )
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Error interno del servidor"}
+        # El 500 pasa por CORS: el frontend puede leer el cuerpo del error
+        assert response.headers["access-control-allow-origin"] == origin
+        record = caplog.records[-1]
+        assert record.getMessage() == "Error no controlado en POST /api/v1/proyectos/"
+        assert record.exc_info[0] is RuntimeError
+
     def test_get_project_not_found(self):
         """Probar obtener proyecto que no existe"""
         headers, _ = self.create_test_user_and_login()
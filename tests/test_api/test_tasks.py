@@ -1,8 +1,11 @@
+import logging
 from datetime import datetime, timezone
 from io import BytesIO
+from unittest.mock import patch
 
 import pytest
 
+from app.core.config import settings
 from app.database import Base
 from tests.test_db_config import client, engine
 
@@ -316,6 +319,24 @@ class TestTaskEndpoints:
         data = response.json()
         assert len(data) == 0
 
+    def test_get_tasks_by_phase_unexpected_error(self, caplog):
+        """Probar que un error del servicio llega al manejador global con CORS"""
+        headers, user_id = self.create_test_user_and_login()
+        origin = settings.BACKEND_CORS_ORIGIN
+
+        with patch(
+            "app.services.task_service.phase_repository.get",
+            side_effect=RuntimeError("fallo de conexión"),
+        ), caplog.at_level(logging.ERROR, logger="app.main"):
+            response = client.get(
+                "/api/v1/tareas/?phase_id=1", headers={**headers, "Origin": origin}
+            )
+
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Error interno del servidor"}
+        assert response.headers["access-control-allow-origin"] == origin
+        assert caplog.records[-1].exc_info[0] is RuntimeError
+
     def test_get_tasks_by_phase_without_authentication(self):
         """Probar obtener tareas sin autenticación"""
         response = client.get("/api/v1/tareas/?phase_id=1")
@@ -1,13 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
-
 # Importar todos los modelos para que SQLAlchemy los reconozca
+from app.api.api_v1.endpoints import ai_assistant as ai_assistant_module
+from app.api.api_v1.endpoints import bibliography as bibliography_module
+from app.api.api_v1.endpoints import projects as projects_module
+from app.database import Base, get_async_db, get_db
 from app.models import *  # noqa: F403, F401
+from app.services import attachment_service as attachment_service_module
 from main import app
 
 # Configuración de testing (similar a test_auth.py)
@@ -20,6 +24,11 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 def override_get_db():
     db = TestingSessionLocal()
@@ -29,7 +38,20 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# Las tareas en segundo plano y las respuestas en streaming abren su propia
+# sesión fuera de las dependencias
+attachment_service_module.SessionLocal = TestingSessionLocal
+ai_assistant_module.SessionLocal = TestingSessionLocal
+bibliography_module.SessionLocal = TestingSessionLocal
+projects_module.AsyncSessionLocal = TestingAsyncSessionLocal
 client = TestClient(app)
 
 
@@ -0,0 +1,59 @@
+"""Tests para la caché de respuestas de IA"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.ai_cache import AICache
+
+
+class TestAICache:
+    """Pruebas para la caché de respuestas de IA"""
+
+    def test_build_key_ignores_key_order(self):
+        """Probar que la clave no depende del orden de los parámetros"""
+        key_a = AICache.build_key("chat", {"message": "Hola", "plan": "profesional"})
+        key_b = AICache.build_key("chat", {"plan": "profesional", "message": "Hola"})
+
+        assert key_a == key_b
+        assert key_a.startswith("ai:chat:")
+
+    def test_build_key_depends_on_namespace_and_data(self):
+        """Probar que peticiones distintas generan claves distintas"""
+        key = AICache.build_key("chat", {"message": "Hola"})
+
+        assert key != AICache.build_key("bibliography", {"message": "Hola"})
+        assert key != AICache.build_key("chat", {"message": "Adiós"})
+
+    @pytest.mark.asyncio
+    async def test_get_counts_hits_and_misses(self):
+        """Probar que get devuelve el valor cacheado y contabiliza aciertos"""
+        cache = AICache()
+
+        with patch(
+            "app.services.ai_cache.cache_get",
+            new=AsyncMock(side_effect=[None, ["respuesta", "modelo"]]),
+        ):
+            assert await cache.get("chat", {"message": "Hola"}) is None
+            assert await cache.get("chat", {"message": "Hola"}) == [
+                "respuesta",
+                "modelo",
+            ]
+
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_set_uses_default_ttl(self):
+        """Probar que set guarda con el TTL configurado por defecto"""
+        cache = AICache()
+
+        with patch("app.services.ai_cache.cache_set", new=AsyncMock()) as mock_set:
+            await cache.set("chat", {"message": "Hola"}, ["respuesta", "modelo"])
+
+        mock_set.assert_awaited_once_with(
+            AICache.build_key("chat", {"message": "Hola"}),
+            ["respuesta", "modelo"],
+            settings.AI_CACHE_TTL,
+        )
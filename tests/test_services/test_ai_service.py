@@ -1,6 +1,7 @@
 """Tests para el servicio de IA con mocks"""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -13,6 +14,7 @@ def mock_genai_client():
     """Mock del cliente de Google Genai"""
     with patch("app.services.ai_service.genai.Client") as mock_client:
         mock_instance = MagicMock()
+        mock_instance.aio.models.generate_content = AsyncMock()
         mock_client.return_value = mock_instance
         yield mock_instance
 
@@ -36,6 +38,17 @@ class TestAIService:
             assert service.safety_settings is not None
             assert len(service.safety_settings) == 4
 
+    def test_init_configures_connection_pool(self, mock_genai_client):
+        """Probar que el cliente async de Gemini reutiliza un pool de conexiones amplio"""
+        with patch("app.core.config.settings.GOOGLE_AI_API_KEY", "test_api_key"):
+            with patch("app.services.ai_service.genai.Client") as mock_client:
+                AIService()
+
+        http_options = mock_client.call_args.kwargs["http_options"]
+        limits = http_options.async_client_args["limits"]
+        assert limits.max_keepalive_connections == 100
+        assert limits.max_connections == 100
+
     def test_init_missing_api_key(self):
         """Probar inicialización sin API key"""
         with patch("app.core.config.settings.GOOGLE_AI_API_KEY", None):
@@ -100,7 +113,7 @@ class TestAIService:
         # Mock de la respuesta
         mock_response = MagicMock()
         mock_response.text = "Esta es una respuesta de prueba"
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         message = "¿Cómo puedo mejorar mi investigación?"
         history = []
@@ -112,7 +125,59 @@ class TestAIService:
 
         assert response_text == "Esta es una respuesta de prueba"
         assert model_used is not None
-        assert mock_genai_client.models.generate_content.called
+        assert mock_genai_client.aio.models.generate_content.called
+
+    @pytest.mark.asyncio
+    async def test_chat_requests_run_concurrently(
+        self, ai_service_instance, mock_genai_client
+    ):
+        """Probar que varias conversaciones simultáneas no se serializan"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def generate_content(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MagicMock(text="Respuesta")
+
+        mock_genai_client.aio.models.generate_content.side_effect = generate_content
+
+        results = await asyncio.gather(
+            *(
+                ai_service_instance.chat(message=f"Mensaje {i}", history=[])
+                for i in range(3)
+            )
+        )
+
+        assert [text for text, _ in results] == ["Respuesta"] * 3
+        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_chat_stream_yields_text_chunks(
+        self, ai_service_instance, mock_genai_client
+    ):
+        """Probar que chat_stream devuelve los fragmentos de texto del modelo"""
+
+        async def stream():
+            for text in ("Primera parte. ", None, "Segunda parte."):
+                chunk = MagicMock()
+                chunk.text = text
+                yield chunk
+
+        mock_genai_client.aio.models.generate_content_stream = AsyncMock(
+            return_value=stream()
+        )
+
+        deltas, model_used = await ai_service_instance.chat_stream(
+            message="Hola", history=[], project_context="Proyecto de prueba"
+        )
+        chunks = [delta async for delta in deltas]
+
+        assert chunks == ["Primera parte. ", "Segunda parte."]
+        assert model_used is not None
 
     @pytest.mark.asyncio
     async def test_chat_with_history_includes_system_instruction(
@@ -122,7 +187,7 @@ class TestAIService:
         # Mock de la respuesta
         mock_response = MagicMock()
         mock_response.text = "Respuesta basada en el contexto del proyecto"
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         message = "¿De qué trata este proyecto?"
         history = [
@@ -139,10 +204,10 @@ class TestAIService:
         assert model_used is not None
 
         # Verificar que generate_content fue llamado
-        assert mock_genai_client.models.generate_content.called
+        assert mock_genai_client.aio.models.generate_content.called
 
         # Verificar que el config tiene system_instruction
-        call_args = mock_genai_client.models.generate_content.call_args
+        call_args = mock_genai_client.aio.models.generate_content.call_args
         config = call_args.kwargs.get("config")
 
         assert config is not None
@@ -159,7 +224,7 @@ class TestAIService:
         # Mock de respuesta sin texto
         mock_response = MagicMock()
         mock_response.text = None
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         message = "Test message"
         history = []
@@ -177,7 +242,7 @@ class TestAIService:
         # Mock de la respuesta
         mock_response = MagicMock()
         mock_response.text = "Esta es una sugerencia de autocompletado"
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         text = "La investigación demuestra que"
         document_content = "Contenido del documento..."
@@ -193,7 +258,7 @@ class TestAIService:
 
         assert suggestion == "Esta es una sugerencia de autocompletado"
         assert model_used is not None
-        assert mock_genai_client.models.generate_content.called
+        assert mock_genai_client.aio.models.generate_content.called
 
     @pytest.mark.asyncio
     async def test_suggest_text_no_response(
@@ -203,7 +268,7 @@ class TestAIService:
         # Mock de respuesta sin texto
         mock_response = MagicMock()
         mock_response.text = None
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         with pytest.raises(AIServiceError) as exc_info:
             await ai_service_instance.suggest_text(
@@ -222,7 +287,7 @@ class TestAIService:
         mock_response.text = (
             "Smith, J. (2020). Título del artículo. Revista, 10(2), 123-145."
         )
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         citation_data = {
             "tipo": "articulo",
@@ -239,7 +304,7 @@ class TestAIService:
 
         assert "Smith, J." in citation
         assert model_used is not None
-        assert mock_genai_client.models.generate_content.called
+        assert mock_genai_client.aio.models.generate_content.called
 
     @pytest.mark.asyncio
     async def test_format_citation_no_response(
@@ -249,7 +314,7 @@ class TestAIService:
         # Mock de respuesta sin texto
         mock_response = MagicMock()
         mock_response.text = None
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         citation_data = {"tipo": "articulo", "autores": [], "anio": 2020}
 
@@ -280,7 +345,7 @@ class TestAIService:
 
         mock_response.candidates = [MagicMock()]
         mock_response.candidates[0].grounding_metadata = mock_grounding_support
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         query = "machine learning in education"
         sources, model_used = await ai_service_instance.search_bibliography(
@@ -291,7 +356,7 @@ class TestAIService:
         # El mock debe devolver al menos una fuente
         assert len(sources) >= 0
         assert model_used is not None
-        assert mock_genai_client.models.generate_content.called
+        assert mock_genai_client.aio.models.generate_content.called
 
     @pytest.mark.asyncio
     async def test_search_bibliography_no_response(
@@ -301,13 +366,56 @@ class TestAIService:
         # Mock de respuesta sin texto
         mock_response = MagicMock()
         mock_response.text = None
-        mock_genai_client.models.generate_content.return_value = mock_response
+        mock_genai_client.aio.models.generate_content.return_value = mock_response
 
         with pytest.raises(AIServiceError) as exc_info:
             await ai_service_instance.search_bibliography(query="test query")
 
         assert "No se recibió respuesta" in str(exc_info.value)
 
+    @pytest.mark.asyncio
+    async def test_search_bibliography_coalesces_concurrent_requests(
+        self, ai_service_instance, mock_genai_client
+    ):
+        """Probar que búsquedas idénticas simultáneas comparten una llamada al modelo"""
+
+        async def generate_content(**kwargs):
+            await asyncio.sleep(0.01)
+            return MagicMock(
+                text='[{"titulo": "Artículo 1", "autores": ["Smith"]}]',
+                grounding_metadata=None,
+            )
+
+        mock_genai_client.aio.models.generate_content.side_effect = generate_content
+
+        results = await asyncio.gather(
+            *(ai_service_instance.search_bibliography(query="tema") for _ in range(3)),
+            ai_service_instance.search_bibliography(query="otro tema"),
+        )
+
+        # Una llamada para "tema" y otra para "otro tema"
+        assert mock_genai_client.aio.models.generate_content.await_count == 2
+        assert results[0] == results[1] == results[2]
+        assert len(results[0][0]) == 1
+        assert results[0][0] is not results[1][0]
+        assert ai_service_instance._bibliography_inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_search_bibliography_text_fallback_skips_non_object_items(
+        self, ai_service_instance, mock_genai_client
+    ):
+        """Probar que el fallback de texto descarta elementos que no son objetos"""
+        mock_genai_client.aio.models.generate_content.return_value = MagicMock(
+            text='["a", 1, {"titulo": "Artículo 1"}, null, {"titulo": "Artículo 2"}]',
+            grounding_metadata=None,
+        )
+
+        sources, _ = await ai_service_instance.search_bibliography(
+            query="tema", max_results=2
+        )
+
+        assert sources == [{"titulo": "Artículo 1"}, {"titulo": "Artículo 2"}]
+
     def test_parse_grounding_sources_success(self, ai_service_instance):
         """Probar parseo de fuentes desde grounding metadata"""
         # Mock de grounding metadata
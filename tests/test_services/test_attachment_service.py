@@ -345,6 +345,27 @@ class TestAttachmentService:
 
         assert exc_info.value.status_code == 403
 
+    def test_get_text_preview_truncates_prefix_from_database(self):
+        """Probar que la vista previa se construye con un prefijo recortado en BD"""
+        self.service.attachment_repository.get_text_content_prefix = Mock(
+            return_value="a" * 11
+        )
+
+        result = self.service.get_text_preview(self.mock_db, 1, max_chars=10)
+
+        assert result == "a" * 10 + "..."
+        self.service.attachment_repository.get_text_content_prefix.assert_called_once_with(
+            self.mock_db, 1, 11
+        )
+
+    def test_get_text_preview_not_precomputed(self):
+        """Probar que sin texto precalculado no hay vista previa"""
+        self.service.attachment_repository.get_text_content_prefix = Mock(
+            return_value=None
+        )
+
+        assert self.service.get_text_preview(self.mock_db, 1, max_chars=10) is None
+
     def test_update_attachment_success(self):
         """Probar actualización exitosa de adjunto"""
         mock_attachment = self.create_mock_attachment()
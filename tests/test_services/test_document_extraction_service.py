@@ -370,3 +370,113 @@ class TestDocumentExtractionService:
             result = DocumentExtractionService.get_document_preview(str(test_file))
 
             assert "Error al obtener vista previa" in result
+
+    def test_get_document_preview_cached_until_file_changes(self, tmp_path):
+        """Probar que la vista previa no se vuelve a parsear si el archivo no cambia"""
+        test_file = tmp_path / "test.docx"
+        test_file.write_text("dummy content")
+
+        mock_doc = MagicMock()
+        mock_para = MagicMock()
+        mock_para.text = "Contenido"
+        mock_doc.paragraphs = [mock_para]
+
+        with patch(
+            "app.services.document_extraction_service.Document"
+        ) as mock_doc_class:
+            mock_doc_class.return_value = mock_doc
+
+            first = DocumentExtractionService.get_document_preview(str(test_file))
+            second = DocumentExtractionService.get_document_preview(str(test_file))
+            assert first == second == "Contenido"
+            assert mock_doc_class.call_count == 1
+
+            test_file.write_text("contenido modificado")
+            DocumentExtractionService.get_document_preview(str(test_file))
+            assert mock_doc_class.call_count == 2
+
+    def test_extract_all_matches_individual_extractions(self, tmp_path):
+        """Probar que la extracción combinada coincide con las extracciones separadas"""
+        from docx import Document
+
+        test_file = tmp_path / "test.docx"
+        document = Document()
+        document.add_heading("Título Principal", level=1)
+        document.add_paragraph("Primer párrafo")
+        table = document.add_table(rows=2, cols=1)
+        table.cell(0, 0).text = "Encabezado"
+        table.cell(1, 0).text = "Dato"
+        document.add_paragraph("Último párrafo")
+        document.save(str(test_file))
+
+        result = DocumentExtractionService.extract_all(str(test_file))
+
+        assert result["html"] == DocumentExtractionService.extract_docx_to_html(
+            str(test_file)
+        )
+        assert result["pages"] == DocumentExtractionService.extract_docx_to_pages(
+            str(test_file)
+        )
+        assert result["text"] == "Título Principal\nPrimer párrafo\nÚltimo párrafo"
+
+    def test_extract_all_file_not_found(self):
+        """Probar extracción combinada con archivo que no existe"""
+        with pytest.raises(HTTPException) as exc_info:
+            DocumentExtractionService.extract_all("/path/to/nonexistent.docx")
+
+        assert exc_info.value.status_code == 404
+
+    def test_build_preview_truncates(self):
+        """Probar que la vista previa se recorta al máximo de caracteres"""
+        assert DocumentExtractionService.build_preview("corto", 10) == "corto"
+        assert DocumentExtractionService.build_preview("A" * 20, 10) == "A" * 10 + "..."
+
+    def test_extract_docx_to_pages_iter_is_lazy_and_complete(self, tmp_path):
+        """Probar que el iterador de páginas produce las mismas páginas que la lista"""
+        from docx import Document
+
+        test_file = tmp_path / "test.docx"
+        document = Document()
+        for i in range(10):
+            document.add_paragraph(f"Párrafo {i} " + "x" * 1000)
+        document.save(str(test_file))
+
+        pages_iter = DocumentExtractionService.extract_docx_to_pages_iter(
+            str(test_file)
+        )
+
+        assert not isinstance(pages_iter, list)
+        assert list(pages_iter) == DocumentExtractionService.extract_docx_to_pages(
+            str(test_file)
+        )
+
+    def test_extract_docx_to_pages_iter_file_not_found(self):
+        """Probar que el iterador valida el archivo antes de empezar a iterar"""
+        with pytest.raises(HTTPException) as exc_info:
+            DocumentExtractionService.extract_docx_to_pages_iter(
+                "/path/to/nonexistent.docx"
+            )
+
+        assert exc_info.value.status_code == 404
+
+    def test_extract_all_from_bytes_matches_path(self, tmp_path):
+        """Probar que extraer desde bytes equivale a extraer desde la ruta"""
+        from docx import Document
+
+        test_file = tmp_path / "test.docx"
+        document = Document()
+        document.add_paragraph("Contenido en memoria")
+        document.save(str(test_file))
+
+        result = DocumentExtractionService.extract_all_from_bytes(
+            test_file.read_bytes()
+        )
+
+        assert result == DocumentExtractionService.extract_all(str(test_file))
+
+    async def test_read_docx_bytes_file_not_found(self):
+        """Probar lectura asíncrona de un archivo que no existe"""
+        with pytest.raises(HTTPException) as exc_info:
+            await DocumentExtractionService.read_docx_bytes("/path/to/missing.docx")
+
+        assert exc_info.value.status_code == 404
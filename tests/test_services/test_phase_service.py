@@ -234,6 +234,34 @@ class TestPhaseService:
         )
 
         assert len(result) == 3
+        assert [phase.id for phase in result] == [
+            phases[2].id,
+            phases[0].id,
+            phases[1].id,
+        ]
+
+    def test_reorder_phases_unknown_phase_changes_nothing(
+        self, db_session, test_user, test_project, test_phase
+    ):
+        """Probar que una fase ajena al proyecto rechaza todo el reordenamiento"""
+        original_position = test_phase.position
+        phase_orders = [
+            {"id": test_phase.id, "position": original_position + 5},
+            {"id": 999999, "position": 0},
+        ]
+
+        with pytest.raises(HTTPException) as exc_info:
+            phase_service.reorder_phases(
+                db=db_session,
+                project_id=test_project.id,
+                phase_orders=phase_orders,
+                owner_id=test_user.id,
+            )
+
+        assert exc_info.value.status_code == 400
+        assert "Fase con ID 999999" in exc_info.value.detail
+        db_session.refresh(test_phase)
+        assert test_phase.position == original_position
 
     def test_reorder_phases_project_not_found(self, db_session, test_user):
         """Probar reordenamiento con proyecto inexistente"""
@@ -0,0 +1,62 @@
+"""Tests para la caché de proyectos con fases"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.project_cache import ProjectPhasesCache
+
+
+class TestProjectPhasesCache:
+    """Pruebas para la caché de proyectos con fases"""
+
+    @pytest.mark.asyncio
+    async def test_get_only_returns_entries_of_the_owner(self):
+        """Probar que una entrada no se sirve a un usuario distinto del propietario"""
+        cache = ProjectPhasesCache()
+        entry = {"owner_id": 1, "etag": "abc", "last_modified": "x", "body": {}}
+
+        with patch(
+            "app.services.project_cache.cache_get", new=AsyncMock(return_value=entry)
+        ) as mock_get:
+            assert await cache.get(7, 3, owner_id=1) == entry
+            assert await cache.get(7, 3, owner_id=2) is None
+
+        mock_get.assert_awaited_with("project:7:phases:3")
+
+    @pytest.mark.asyncio
+    async def test_get_version_defaults_to_zero(self):
+        """Probar que un proyecto nunca modificado está en la versión 0"""
+        cache = ProjectPhasesCache()
+
+        with patch(
+            "app.services.project_cache.cache_get",
+            new=AsyncMock(side_effect=[None, 4]),
+        ) as mock_get:
+            assert await cache.get_version(7) == 0
+            assert await cache.get_version(7) == 4
+
+        mock_get.assert_awaited_with("project:7:phases:v")
+
+    @pytest.mark.asyncio
+    async def test_set_uses_the_version_and_invalidate_bumps_it(self):
+        """Probar que se guarda bajo la versión leída e invalidar la incrementa"""
+        cache = ProjectPhasesCache()
+
+        with patch(
+            "app.services.project_cache.cache_set", new=AsyncMock()
+        ) as mock_set, patch(
+            "app.services.project_cache.cache_incr", new=AsyncMock()
+        ) as mock_incr:
+            await cache.set(
+                7, 3, owner_id=1, etag="abc", last_modified="x", body={"id": 7}
+            )
+            await cache.invalidate(7)
+
+        mock_set.assert_awaited_once_with(
+            "project:7:phases:3",
+            {"owner_id": 1, "etag": "abc", "last_modified": "x", "body": {"id": 7}},
+            settings.PROJECT_PHASES_CACHE_TTL,
+        )
+        mock_incr.assert_awaited_once_with("project:7:phases:v")
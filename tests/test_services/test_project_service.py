@@ -1,15 +1,20 @@
 """Tests para el servicio de proyectos"""
 
+from unittest.mock import patch
+
 import pytest
 from fastapi import HTTPException
 from pydantic import ValidationError
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
 
 from app.database import Base
+from app.models.phase import Phase
 from app.models.project import Project, ProjectStatus, ResearchType
 from app.models.user import User
 from app.schemas.project import ProjectCreate, ProjectUpdate
 from app.services.project_service import project_service
-from tests.test_db_config import TestingSessionLocal, engine
+from tests.test_db_config import TestingAsyncSessionLocal, TestingSessionLocal, engine
 
 
 @pytest.fixture(autouse=True)
@@ -191,6 +196,64 @@ class TestProjectService:
         assert exc_info.value.status_code == 404
         assert "Proyecto no encontrado" in exc_info.value.detail
 
+    @pytest.mark.asyncio
+    async def test_aget_user_projects(self, test_user, test_project):
+        """Probar obtener proyectos del usuario con la sesión asíncrona"""
+        async with TestingAsyncSessionLocal() as db:
+            result = await project_service.aget_user_projects(
+                db=db, owner_id=test_user.id
+            )
+
+        assert [project.id for project in result] == [test_project.id]
+
+    @pytest.mark.asyncio
+    async def test_aget_user_project_by_id(self, test_user, test_project):
+        """Probar obtener y rechazar proyectos por ID con la sesión asíncrona"""
+        async with TestingAsyncSessionLocal() as db:
+            result = await project_service.aget_user_project_by_id(
+                db=db, project_id=test_project.id, owner_id=test_user.id
+            )
+            assert result.name == test_project.name
+
+            with pytest.raises(HTTPException) as exc_info:
+                await project_service.aget_user_project_by_id(
+                    db=db, project_id=test_project.id, owner_id=test_user.id + 1
+                )
+
+        assert exc_info.value.status_code == 404
+        assert "Proyecto no encontrado" in exc_info.value.detail
+
+    def test_get_project_fields_with_owner(self, db_session, test_user, test_project):
+        """Probar obtener usuario y campos básicos del proyecto en una consulta"""
+        result = project_service.get_project_fields_with_owner(
+            db=db_session, project_id=test_project.id, owner_email=test_user.email
+        )
+
+        assert result.User.id == test_user.id
+        assert result.id == test_project.id
+        assert result.name == test_project.name
+        assert result.description == test_project.description
+        assert result.research_type == test_project.research_type
+
+    def test_get_project_fields_with_owner_not_found(
+        self, db_session, test_user, test_project
+    ):
+        """Probar usuario existente con proyecto inexistente y usuario inexistente"""
+        result = project_service.get_project_fields_with_owner(
+            db=db_session, project_id=99999, owner_email=test_user.email
+        )
+        assert result.User.id == test_user.id
+        assert result.id is None
+
+        assert (
+            project_service.get_project_fields_with_owner(
+                db=db_session,
+                project_id=test_project.id,
+                owner_email="nadie@example.com",
+            )
+            is None
+        )
+
     def test_update_user_project_success(self, db_session, test_user, test_project):
         """Probar actualización exitosa de proyecto"""
         update_data = ProjectUpdate(
@@ -276,6 +339,39 @@ class TestProjectService:
         # Verificar que tiene la relación de fases (aunque esté vacía)
         assert hasattr(result, "phases")
 
+    def test_get_project_with_phases_eager_loads_phases(self, test_user, test_project):
+        """Probar que las fases llegan precargadas y no hay cargas perezosas"""
+        with TestingSessionLocal() as session:
+            session.add_all(
+                [
+                    Phase(name=f"Fase {i}", position=i, project_id=test_project.id)
+                    for i in (2, 1)
+                ]
+            )
+            session.commit()
+
+        project_id, owner_id = test_project.id, test_user.id
+        statements = []
+
+        def count_select(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count_select)
+        try:
+            with TestingSessionLocal() as session:
+                result = project_service.get_project_with_phases(
+                    db=session, project_id=project_id, owner_id=owner_id
+                )
+                assert [phase.position for phase in result.phases] == [1, 2]
+                # Una consulta para el proyecto y otra (IN) para todas sus fases
+                assert len(statements) == 2
+
+                with pytest.raises(InvalidRequestError):
+                    result.attachment
+        finally:
+            event.remove(engine, "before_cursor_execute", count_select)
+
     def test_get_project_with_phases_not_found(self, db_session, test_user):
         """Probar obtener fases de proyecto que no existe"""
         with pytest.raises(HTTPException) as exc_info:
@@ -360,3 +456,38 @@ class TestProjectService:
         assert len(result_lower) == 1
         assert len(result_upper) == 1
         assert len(result_mixed) == 1
+
+    def test_search_user_projects_by_name_rebinds_cached_statement(
+        self, db_session, test_user
+    ):
+        """Probar que la sentencia cacheada usa los parámetros de cada llamada"""
+        for name in ["Machine Learning", "Deep Learning", "Data Mining"]:
+            db_session.add(Project(name=name, owner_id=test_user.id, status="planning"))
+        db_session.commit()
+
+        learning = project_service.search_user_projects_by_name(
+            db=db_session, query="Learning", owner_id=test_user.id
+        )
+        mining = project_service.search_user_projects_by_name(
+            db=db_session, query="Mining", owner_id=test_user.id
+        )
+        other_owner = project_service.search_user_projects_by_name(
+            db=db_session, query="Mining", owner_id=test_user.id + 1
+        )
+
+        assert {p.name for p in learning} == {"Machine Learning", "Deep Learning"}
+        assert [p.name for p in mining] == ["Data Mining"]
+        assert other_owner == []
+
+    def test_search_user_projects_by_name_propagates_unexpected_error(
+        self, db_session, test_user
+    ):
+        """Probar que un error inesperado llega intacto al manejador global"""
+        with patch(
+            "app.services.project_service.project_repository.search_projects_by_name",
+            side_effect=RuntimeError("fallo de conexión"),
+        ):
+            with pytest.raises(RuntimeError, match="fallo de conexión"):
+                project_service.search_user_projects_by_name(
+                    db=db_session, query="Machine", owner_id=test_user.id
+                )
@@ -7,7 +7,7 @@ from app.models.task import Task
 from app.models.user import User
 from app.schemas.task import TaskCreate, TaskStatus, TaskUpdate
 from app.services.task_service import task_service
-from tests.test_db_config import TestingSessionLocal, engine
+from tests.test_db_config import TestingAsyncSessionLocal, TestingSessionLocal, engine
 
 
 @pytest.fixture(autouse=True)
@@ -119,6 +119,45 @@ class TestTaskService:
         assert result.position == 0  # type: ignore
         assert result.phase_id == test_phase.id
 
+    @pytest.mark.asyncio
+    async def test_async_task_lifecycle(self, test_user, test_phase):
+        """Probar crear, listar y eliminar tareas con la sesión asíncrona"""
+        task_data = TaskCreate(
+            title="Tarea Asíncrona",
+            description=None,
+            position=0,
+            phase_id=test_phase.id,
+            start_date=None,
+            end_date=None,
+            status=TaskStatus.PENDING,
+            completed=False,
+        )
+
+        async with TestingAsyncSessionLocal() as db:
+            created = await task_service.acreate_task(
+                db=db, task_in=task_data, owner_id=test_user.id
+            )
+            tasks = await task_service.aget_phase_tasks(
+                db=db, phase_id=test_phase.id, owner_id=test_user.id
+            )
+            assert [task.id for task in tasks] == [created.id]
+
+            with pytest.raises(HTTPException) as exc_info:
+                await task_service.adelete_task(
+                    db=db, task_id=created.id, owner_id=test_user.id + 1
+                )
+            assert exc_info.value.status_code == 404
+
+            assert await task_service.adelete_task(
+                db=db, task_id=created.id, owner_id=test_user.id
+            )
+            assert (
+                await task_service.aget_phase_tasks(
+                    db=db, phase_id=test_phase.id, owner_id=test_user.id
+                )
+                == []
+            )
+
     def test_create_task_phase_not_found(self, db_session, test_user):
         """Probar creación de tarea con fase inválida"""
         task_data = TaskCreate(
@@ -0,0 +1,51 @@
+"""Tests para la caché compartida en Redis"""
+
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+
+from app.core import cache
+
+
+@pytest.mark.asyncio
+async def test_cache_round_trips_values_as_orjson_bytes():
+    """Probar que los valores se guardan con orjson y se recuperan intactos"""
+    store = {}
+    client = AsyncMock()
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    client.get.side_effect = lambda key: store.get(key)
+    value = {"etag": "abc", "body": {"name": "Proyecto", "phases": [1, 2]}}
+
+    with patch.object(cache, "_get_client", return_value=client):
+        await cache.cache_set("clave", value, 60)
+        cached = await cache.cache_get("clave")
+
+    assert store["clave"] == orjson.dumps(value)
+    assert cached == value
+    client.setex.assert_awaited_once_with("clave", 60, orjson.dumps(value))
+
+
+@pytest.mark.asyncio
+async def test_cache_get_returns_none_without_redis():
+    """Probar que sin Redis configurado la caché no devuelve nada"""
+    with patch.object(cache, "_get_client", return_value=None):
+        assert await cache.cache_get("clave") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_incr_counter_reads_back_as_int():
+    """Probar que un contador incrementado se lee como entero con cache_get"""
+    store = {}
+
+    async def incr(key):
+        store[key] = str(int(store.get(key, b"0")) + 1).encode()
+
+    client = AsyncMock()
+    client.incr.side_effect = incr
+    client.get.side_effect = lambda key: store.get(key)
+
+    with patch.object(cache, "_get_client", return_value=client):
+        await cache.cache_incr("contador")
+        await cache.cache_incr("contador")
+        assert await cache.cache_get("contador") == 2
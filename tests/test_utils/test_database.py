@@ -0,0 +1,80 @@
+"""Tests para la configuración de los pools de la base de datos"""
+
+import logging
+from unittest.mock import MagicMock, patch
+
+from app import database
+
+
+def _engine_reporting(max_connections: int) -> MagicMock:
+    """Engine simulado cuyo servidor reporta el max_connections indicado"""
+    engine = MagicMock()
+    conn = engine.connect.return_value.__enter__.return_value
+    conn.exec_driver_sql.return_value.scalar_one.return_value = str(max_connections)
+    return engine
+
+
+def test_check_pool_capacity_skips_non_postgres_backends():
+    """Probar que con SQLite no se consulta el servidor"""
+    engine = _engine_reporting(10)
+    with patch.object(database, "_backend_name", "sqlite"), patch.object(
+        database, "engine", engine
+    ):
+        database.check_pool_capacity()
+
+    engine.connect.assert_not_called()
+
+
+def test_check_pool_capacity_warns_when_pools_exceed_server_limit(caplog):
+    """Probar el aviso cuando los pools superan max_connections"""
+    with patch.object(database, "_backend_name", "postgresql"), patch.object(
+        database, "engine", _engine_reporting(30)
+    ), patch.object(database.settings, "DB_POOL_SIZE", 10), patch.object(
+        database.settings, "DB_MAX_OVERFLOW", 10
+    ), patch.object(
+        database.settings, "WEB_CONCURRENCY", 1
+    ), caplog.at_level(
+        logging.WARNING, logger="app.database"
+    ):
+        database.check_pool_capacity()
+
+    assert "40 conexiones" in caplog.text
+
+
+def test_check_pool_capacity_silent_when_pools_fit(caplog):
+    """Probar que no hay aviso si los pools caben en max_connections"""
+    with patch.object(database, "_backend_name", "postgresql"), patch.object(
+        database, "engine", _engine_reporting(100)
+    ), patch.object(database.settings, "DB_POOL_SIZE", 10), patch.object(
+        database.settings, "DB_MAX_OVERFLOW", 10
+    ), patch.object(
+        database.settings, "WEB_CONCURRENCY", 2
+    ), caplog.at_level(
+        logging.WARNING, logger="app.database"
+    ):
+        database.check_pool_capacity()
+
+    assert caplog.text == ""
+
+
+def test_build_async_url_disables_prepared_statement_caches_behind_pgbouncer():
+    """Probar los connect_args de asyncpg para PgBouncer en modo transaction"""
+    url, connect_args = database._build_async_url(
+        "postgresql://user:pw@pgbouncer:6432/db?sslmode=require",
+        behind_pgbouncer=True,
+    )
+
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.port == 6432
+    assert connect_args["ssl"] == "require"
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_build_async_url_keeps_caches_without_pgbouncer():
+    """Probar que sin PgBouncer se conservan las cachés de sentencias"""
+    _, connect_args = database._build_async_url("postgresql://user:pw@db:5432/db")
+
+    assert connect_args == {}
@@ -372,3 +372,119 @@ class TestFileUtils:
         # Verificar que el tamaño máximo es 50MB
         expected_size = 50 * 1024 * 1024  # 50MB en bytes
         assert FileUtils.MAX_FILE_SIZE == expected_size
+
+    def test_build_content_disposition_is_memoized(self):
+        """Probar la cabecera Content-Disposition y su memorización por nombre"""
+        FileUtils.build_content_disposition.cache_clear()
+
+        header = FileUtils.build_content_disposition("Investigación.pdf")
+        again = FileUtils.build_content_disposition("Investigación.pdf")
+
+        assert header == (
+            'attachment; filename="Investigacin.pdf"; '
+            "filename*=UTF-8''Investigaci%C3%B3n.pdf"
+        )
+        assert again is header
+        assert FileUtils.build_content_disposition.cache_info().hits == 1
+
+    def test_save_upload_copies_in_chunks(self):
+        """Probar que el archivo subido se guarda completo al copiar por bloques"""
+        content = os.urandom(3 * 1024 + 17)
+        upload = UploadFile(filename="documento.pdf", file=io.BytesIO(content))
+        upload.file.read(10)  # El guardado debe empezar desde el inicio
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "documento.pdf")
+            FileUtils.save_upload(upload, file_path, chunk_size=1024)
+
+            with open(file_path, "rb") as f:
+                assert f.read() == content
+
+    def test_save_upload_never_reads_whole_file(self):
+        """Probar que la copia en memoria lee solo bloques acotados del temporal"""
+        content = os.urandom(5 * 1024)
+        upload = UploadFile(filename="documento.pdf", file=io.BytesIO(content))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "documento.pdf")
+            with patch.object(upload.file, "read", wraps=upload.file.read) as mock:
+                FileUtils.save_upload(upload, file_path, chunk_size=1024)
+
+            sizes = [c.args[0] if c.args else -1 for c in mock.call_args_list]
+            assert sizes and all(0 < size <= 1024 for size in sizes)
+            with open(file_path, "rb") as f:
+                assert f.read() == content
+
+    def test_save_upload_rejects_oversized_file(self):
+        """Probar que un archivo mayor que el límite se corta y no queda en disco"""
+        upload = UploadFile(filename="grande.pdf", file=io.BytesIO(b"x" * 5000))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "grande.pdf")
+            with pytest.raises(FileValidationError):
+                FileUtils.save_upload(upload, file_path, chunk_size=1024, max_size=4096)
+
+            assert not os.path.exists(file_path)
+
+    def test_validate_file_signature(self):
+        """Probar la detección del tipo por los primeros bytes"""
+        pdf = UploadFile(filename="a.docx", file=io.BytesIO(b"%PDF-1.4 ..."))
+        docx = UploadFile(filename="b.pdf", file=io.BytesIO(b"PK\x03\x04 ..."))
+        other = UploadFile(filename="c.pdf", file=io.BytesIO(b"<html>"))
+
+        assert FileUtils.validate_file_signature(pdf) == FileType.PDF
+        assert pdf.file.tell() == 0
+        assert FileUtils.validate_file_signature(docx) == FileType.DOCX
+        with pytest.raises(FileValidationError):
+            FileUtils.validate_file_signature(other)
+
+    def _rolled_upload(self, content):
+        """Crear un UploadFile cuyo temporal ya se ha volcado a disco"""
+        spooled = tempfile.SpooledTemporaryFile(max_size=1024)
+        spooled.write(content)
+        assert spooled._rolled
+        return UploadFile(filename="documento.pdf", file=spooled)
+
+    def test_save_upload_copies_rolled_file_in_kernel(self):
+        """Probar que un temporal en disco se copia con el kernel y llega completo"""
+        content = os.urandom(5000)
+        upload = self._rolled_upload(content)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "documento.pdf")
+            with patch.object(
+                FileUtils, "_copy_in_kernel", wraps=FileUtils._copy_in_kernel
+            ) as mock_copy:
+                FileUtils.save_upload(upload, file_path)
+
+            mock_copy.assert_called_once()
+            with open(file_path, "rb") as f:
+                assert f.read() == content
+
+    def test_save_upload_falls_back_when_kernel_copy_unsupported(self):
+        """Probar la copia normal si copy_file_range/sendfile no están disponibles"""
+        content = os.urandom(5000)
+        upload = self._rolled_upload(content)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "documento.pdf")
+            with patch(
+                "app.utils.file_utils.os.copy_file_range",
+                side_effect=OSError(38, "Function not implemented"),
+                create=True,
+            ):
+                FileUtils.save_upload(upload, file_path)
+
+            with open(file_path, "rb") as f:
+                assert f.read() == content
+
+    def test_save_upload_rejects_oversized_rolled_file_before_writing(self):
+        """Probar que el límite se aplica con el tamaño del temporal en disco"""
+        upload = self._rolled_upload(b"x" * 5000)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "grande.pdf")
+            with pytest.raises(FileValidationError):
+                FileUtils.save_upload(upload, file_path, max_size=4096)
+
+            assert not os.path.exists(file_path)